@@ -0,0 +1,781 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for Consciousness Trilogy
+
+Measures how the simulation behaves when pushed past the symbolic three
+iterations of the default run. Each benchmark prints a small table and can be
+run on its own:
+
+    python benchmarks.py                 # Run every benchmark
+    python benchmarks.py event_filtering # Run a single benchmark
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+from consciousness import (
+    CivilizationCollection, Consciousness, Empire, Event, EventBus, Prophet,
+    ProphetCollection
+)
+from deadlines import RunController
+from entity_store import EntityStore
+from history import RunHistory
+from influence import InfluenceGraph, RecognitionSpread
+from loadgen import MODES, LoadGenerator, RunSpec
+from metrics import RunMetrics
+from patterns import PatternSimilarity
+from population import Population
+from progress import ENTITY_ARCS, ChapterProgress
+from scheduler import Scheduler
+from sharding import ShardedExecutor
+from sketches import OmniscienceFilter, sample_omniscience
+from sects import SectTree
+from traditions import TraditionForest
+
+
+# How many times longer than printing its transcript the default run may take
+DEFAULT_RUN_BUDGET = 4.0
+
+
+def _time_run(events: EventBus, iterations: int) -> float:
+    """Time a full compile_reality run against the given event bus.
+
+    Args:
+        events: Bus the run narrates into
+        iterations: Number of iterations to compile
+
+    Returns:
+        Elapsed wall-clock seconds
+    """
+    consciousness = Consciousness(events=events)
+    start = time.perf_counter()
+    consciousness.compile_reality(max_iterations=iterations)
+    return time.perf_counter() - start
+
+
+def _report(title: str, rows: List[Tuple[str, float]], iterations: int) -> None:
+    """Print a benchmark table relative to its first row.
+
+    Args:
+        title: Heading for the table
+        rows: (label, seconds) pairs; the first row is the baseline
+        iterations: Iterations per run, used for the rate column
+    """
+    print("=" * 70)
+    print(title)
+    print("=" * 70)
+    baseline = rows[0][1]
+    for label, seconds in rows:
+        print(f"{label:40} {seconds:8.3f}s "
+              f"{iterations / seconds:10.0f} it/s {seconds / baseline:6.2f}x")
+    print()
+
+
+def bench_event_filtering(iterations: int = 20000) -> None:
+    """Compare a heavily filtered run against a null sink and a full transcript.
+
+    Args:
+        iterations: Iterations per run
+    """
+    def ignore(event: Event) -> None:
+        pass
+
+    def consume(event: Event) -> None:
+        event.message
+
+    null_sink = EventBus()
+
+    filtered = EventBus()
+    filtered.subscribe(ignore,
+                       chapters={"experiences_omniscience", "meaning_collapses"},
+                       sample_every=1000)
+
+    full = EventBus()
+    full.subscribe(consume)
+
+    _report("EVENT FILTERING", [
+        ("null sink (no subscribers)", _time_run(null_sink, iterations)),
+        ("2 chapters, 1 iteration in 1000", _time_run(filtered, iterations)),
+        ("full transcript, formatted", _time_run(full, iterations)),
+    ], iterations)
+
+
+def bench_thread_scaling(prophets: int = 200000, rounds: int = 5) -> None:
+    """Measure experience_omniscience throughput from 1 to N threads.
+
+    All threads share one ProphetCollection while each sweeps its own shard
+    through a shard collection, so every transition updates two tallies. On
+    a GIL build the rows stay flat; on free-threaded CPython they should
+    climb with the thread count.
+
+    Args:
+        prophets: Size of the shared collection
+        rounds: Sweeps per thread, alternating omniscience on and off
+    """
+    events = EventBus()
+    everyone = [Prophet(f"Prophet_{i}", events) for i in range(prophets)]
+    shared = ProphetCollection(everyone, events)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print("=" * 70)
+    print(f"THREAD SCALING (GIL {'enabled' if gil else 'disabled'})")
+    print("=" * 70)
+
+    baseline = 0.0
+    threads = 1
+    while threads <= (os.cpu_count() or 1):
+        shards = [ProphetCollection(everyone[i::threads], events)
+                  for i in range(threads)]
+
+        def sweep(shard: ProphetCollection) -> None:
+            for _ in range(rounds):
+                shard.experience_omniscience()
+                for prophet in shard.prophets:
+                    prophet.omniscient = False
+
+        workers = [threading.Thread(target=sweep, args=(shard,))
+                   for shard in shards]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        for shard in shards:
+            shard.detach()
+
+        assert shared.omniscient_count == 0
+        rate = 2 * prophets * rounds / elapsed
+        baseline = baseline or rate
+        print(f"{threads:3d} threads {rate:14.0f} transitions/s "
+              f"{rate / baseline:6.2f}x")
+        threads *= 2
+    print()
+
+
+def bench_influence_spread(nodes: int = 1000000, degree: int = 10) -> None:
+    """Spread recognition over a random influence graph, step by step.
+
+    Args:
+        nodes: Prophets in the graph
+        degree: Average number of traditions each prophet influences
+    """
+    generator = random.Random(317)
+    edges = nodes * degree
+    sources = array("q", (generator.randrange(nodes) for _ in range(edges)))
+    targets = array("q", (generator.randrange(nodes) for _ in range(edges)))
+
+    print("=" * 70)
+    print(f"INFLUENCE SPREAD ({nodes} nodes, {edges} edges)")
+    print("=" * 70)
+    start = time.perf_counter()
+    graph = InfluenceGraph.from_edges(nodes, sources, targets)
+    print(f"{'build CSR':40} {time.perf_counter() - start:8.3f}s")
+
+    events = EventBus()
+    religions = ProphetCollection(
+        [Prophet(f"Prophet_{i}", events) for i in range(nodes)], events)
+    spread = RecognitionSpread(graph, [religions])
+    spread.recognize([0])
+    while spread.frontier:
+        frontier = len(spread.frontier)
+        start = time.perf_counter()
+        reached = spread.step()
+        print(f"step {spread.steps:2d}: {frontier:9d} frontier -> "
+              f"{len(reached):9d} recognized {time.perf_counter() - start:8.3f}s")
+    print(f"{religions.omniscient_count} of {nodes} prophets omniscient")
+    print()
+
+
+def bench_merge_votes(traditions: int = 1000000, votes: int = 2000000) -> None:
+    """Measure bulk merge-vote throughput on the tradition forest.
+
+    Args:
+        traditions: Number of standalone traditions at the start
+        votes: Random merge votes to apply
+    """
+    generator = random.Random(317)
+    firsts = array("q", (generator.randrange(traditions) for _ in range(votes)))
+    seconds = array("q", (generator.randrange(traditions) for _ in range(votes)))
+    forest = TraditionForest(traditions)
+
+    start = time.perf_counter()
+    forest.union_arrays(firsts, seconds)
+    merging = time.perf_counter() - start
+    start = time.perf_counter()
+    forest.find_all()
+    resolving = time.perf_counter() - start
+
+    print("=" * 70)
+    print(f"MERGE VOTES ({traditions} traditions, {votes} votes)")
+    print("=" * 70)
+    print(f"{'union_arrays':30} {merging:8.3f}s {votes / merging:12.0f} votes/s")
+    print(f"{'find_all':30} {resolving:8.3f}s "
+          f"{traditions / resolving:12.0f} finds/s")
+    print(f"{forest.count} distinct traditions remain")
+    print()
+
+
+def bench_sect_tree(sects: int = 1000000, queries: int = 200000) -> None:
+    """Measure sect growth, omniscience flips and subtree queries.
+
+    Args:
+        sects: Sects to grow the forest to
+        queries: Omniscience flips and subtree queries to time each
+    """
+    generator = random.Random(32)
+    tree = SectTree()
+    for _ in range(64):
+        tree.add_sect()
+
+    start = time.perf_counter()
+    for _ in range(sects - len(tree)):
+        tree.add_sect(generator.randrange(len(tree)))
+    growing = time.perf_counter() - start
+    targets = [generator.randrange(sects) for _ in range(queries)]
+    start = time.perf_counter()
+    for sect in targets:
+        tree.set_omniscient(sect, not tree.is_omniscient(sect))
+    flipping = time.perf_counter() - start
+    start = time.perf_counter()
+    for sect in targets:
+        tree.subtree_omniscient(sect)
+    querying = time.perf_counter() - start
+    start = time.perf_counter()
+    tree.fork()
+    forking = time.perf_counter() - start
+
+    print("=" * 70)
+    print(f"SECT TREE ({sects} sects, {queries} queries)")
+    print("=" * 70)
+    print(f"{'add_sect':30} {growing:8.3f}s {sects / growing:12.0f} sects/s")
+    print(f"{'set_omniscient':30} {flipping:8.3f}s "
+          f"{queries / flipping:12.0f} flips/s")
+    print(f"{'subtree_omniscient':30} {querying:8.3f}s "
+          f"{queries / querying:12.0f} queries/s")
+    print(f"{'fork':30} {forking * 1000:8.3f}ms")
+    print()
+
+
+def bench_population(persons: int = 10000000, ticks: int = 20) -> None:
+    """Measure ticks of a large vectorized population.
+
+    Args:
+        persons: Population size
+        ticks: Ticks to run
+    """
+    population = Population(persons, seed=317)
+    start = time.perf_counter()
+    history = population.run(ticks)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 70)
+    print(f"POPULATION ({persons} persons, {ticks} ticks)")
+    print("=" * 70)
+    print(f"{'tick':30} {elapsed / ticks:8.3f}s "
+          f"{persons * ticks / elapsed:12.0f} person-ticks/s")
+    print(f"final distribution: {history[-1]}")
+    print()
+
+
+def bench_scheduler(events: int = 1000000, horizon: int = 100000) -> None:
+    """Measure discrete-event throughput on the simulated clock.
+
+    Args:
+        events: Events to schedule and run
+        horizon: Simulated seconds they are spread over
+    """
+    generator = random.Random(317)
+    count = [0]
+
+    def chapter() -> None:
+        count[0] += 1
+
+    print("=" * 70)
+    print(f"SCHEDULER ({events} events)")
+    print("=" * 70)
+    for label, when in (("whole seconds", lambda: generator.randrange(horizon)),
+                        ("distinct times", lambda: generator.random() * horizon)):
+        pending = [(when(), chapter) for _ in range(events)]
+        scheduler = Scheduler()
+        start = time.perf_counter()
+        scheduler.schedule_many(pending)
+        scheduling = time.perf_counter() - start
+        start = time.perf_counter()
+        scheduler.run()
+        running = time.perf_counter() - start
+        print(f"{'schedule_many, ' + label:30} {scheduling:8.3f}s "
+              f"{events / scheduling:12.0f} events/s")
+        print(f"{'run, ' + label:30} {running:8.3f}s "
+              f"{events / running:12.0f} events/s")
+    iterations = 2000
+    lockstep = _time_run(EventBus(), iterations)
+    paced = Consciousness(events=EventBus(), scheduler=Scheduler())
+    start = time.perf_counter()
+    paced.compile_reality(max_iterations=iterations)
+    pacing = time.perf_counter() - start
+    print(f"{'compile_reality, lockstep':30} {lockstep:8.3f}s "
+          f"{iterations / lockstep:12.0f} iterations/s")
+    print(f"{'compile_reality, paced':30} {pacing:8.3f}s "
+          f"{iterations / pacing:12.0f} iterations/s")
+    print()
+
+
+def bench_entity_store(prophets: int = 1000000) -> None:
+    """Measure a ProphetCollection kept in a SQLite entity store.
+
+    Args:
+        prophets: Prophets to store
+    """
+    print("=" * 70)
+    print(f"ENTITY STORE ({prophets} prophets)")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as directory:
+        with EntityStore(os.path.join(directory, "bench.sqlite")) as store:
+            religions = store.religions(EventBus())
+            steps: List[Tuple[str, Callable[[], object]]] = [
+                ("insert", lambda: store.add(
+                    "prophets", (f"Prophet_{i}" for i in range(prophets)))),
+                ("iterate members", lambda: sum(
+                    1 for _ in religions.prophets)),
+                ("experience_omniscience", religions.experience_omniscience),
+                ("omniscient", lambda: religions.omniscient),
+            ]
+            for label, step in steps:
+                start = time.perf_counter()
+                step()
+                elapsed = time.perf_counter() - start
+                print(f"{label:30} {elapsed:8.3f}s "
+                      f"{prophets / elapsed:12.0f} prophets/s")
+    print()
+
+
+def bench_sharded_sweep(prophets: int = 400000) -> None:
+    """Measure a religious sweep on 1 to N worker processes.
+
+    Args:
+        prophets: Size of the swept collection
+    """
+    events = EventBus()
+    everyone = [Prophet(f"Prophet_{i}", events) for i in range(prophets)]
+    religions = ProphetCollection(everyone, events)
+
+    print("=" * 70)
+    print(f"SHARDED SWEEP ({prophets} prophets, {os.cpu_count()} CPUs)")
+    print("=" * 70)
+    baseline = 0.0
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        for prophet in everyone:
+            prophet.omniscient = False
+        with ShardedExecutor(workers) as executor:
+            start = time.perf_counter()
+            executor.sweep(religions)
+            elapsed = time.perf_counter() - start
+        assert religions.omniscient
+        baseline = baseline or elapsed
+        print(f"{str(workers) + ' workers':30} {elapsed:8.3f}s "
+              f"{prophets / elapsed:12.0f} prophets/s "
+              f"x{baseline / elapsed:.2f}")
+        workers *= 2
+    print()
+
+
+def bench_fork(empires: int = 1000000, touched: int = 10000) -> None:
+    """Measure copy-on-write forks of large collections.
+
+    Args:
+        empires: Size of the forked collections
+        touched: Empires the fork makes omniscient
+    """
+    events = EventBus()
+    civilizations = CivilizationCollection(
+        [Empire(f"Empire_{i}", events) for i in range(empires)], events)
+    civilizations.snapshot()
+
+    print("=" * 70)
+    print(f"FORK ({empires} empires, {touched} touched)")
+    print("=" * 70)
+    start = time.perf_counter()
+    what_if = civilizations.fork()
+    elapsed = time.perf_counter() - start
+    print(f"{'fork':30} {elapsed * 1e6:8.1f}us")
+    start = time.perf_counter()
+    what_if.awaken(range(0, empires, empires // touched))
+    elapsed = time.perf_counter() - start
+    print(f"{'awaken in fork':30} {elapsed:8.3f}s "
+          f"{touched / elapsed:12.0f} empires/s")
+    print(f"omniscient (parent, fork): {civilizations.omniscient_count}, "
+          f"{what_if.omniscient_count}")
+
+    # Prophets also carry merged traditions and a sect tree into the fork
+    religions = ProphetCollection(
+        [Prophet(f"Prophet_{i}", events) for i in range(empires)], events)
+    religions.vote_to_merge([(0, 1)])
+    religions.choose_fragmentation()
+    religions.sects
+    start = time.perf_counter()
+    what_if = religions.fork()
+    elapsed = time.perf_counter() - start
+    print(f"{'fork with sects':30} {elapsed * 1e6:8.1f}us")
+    start = time.perf_counter()
+    what_if.vote_to_merge([(2, 3)])
+    elapsed = time.perf_counter() - start
+    print(f"{'first merge in fork':30} {elapsed:8.3f}s")
+    print()
+
+
+def bench_history(iterations: int = 2000,
+                  spacings: Tuple[int, ...] = (1, 16, 256)) -> None:
+    """Measure recording a run's history and querying past iterations.
+
+    Args:
+        iterations: Iterations compiled into each history
+        spacings: Iterations between checkpoints to compare
+    """
+    print("=" * 70)
+    print(f"RUN HISTORY ({iterations} iterations)")
+    print("=" * 70)
+    baseline = _time_run(EventBus(), iterations)
+    print(f"{'no history':30} {baseline:8.3f}s "
+          f"{iterations / baseline:12.0f} iterations/s")
+    with tempfile.TemporaryDirectory() as directory:
+        for spacing in spacings:
+            path = os.path.join(directory, f"history_{spacing}.sqlite")
+            consciousness = Consciousness(EventBus())
+            with RunHistory(path, spacing=spacing) as history:
+                history.attach(consciousness)
+                start = time.perf_counter()
+                consciousness.compile_reality(max_iterations=iterations)
+                elapsed = time.perf_counter() - start
+                print(f"{f'record, spacing {spacing}':30} {elapsed:8.3f}s "
+                      f"{iterations / elapsed:12.0f} iterations/s")
+                start = time.perf_counter()
+                for iteration in range(iterations):
+                    history.state_at(iteration)
+                elapsed = time.perf_counter() - start
+                print(f"{f'state_at, spacing {spacing}':30} {elapsed:8.3f}s "
+                      f"{iterations / elapsed:12.0f} queries/s "
+                      f"{os.path.getsize(path) >> 10:8}KiB")
+    print()
+
+
+def bench_sketches(prophets: int = 1000000, sample: int = 1024) -> None:
+    """Measure sampled and exact omniscient counts of a stored collection.
+
+    Args:
+        prophets: Prophets in the store, every third one omniscient
+        sample: Members read by the sampled estimate
+    """
+    print("=" * 70)
+    print(f"SKETCHES ({prophets} stored prophets, sample of {sample})")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as directory:
+        with EntityStore(os.path.join(directory, "bench.sqlite")) as store:
+            store.add_rows("prophets", ((f"Prophet_{i}", int(i % 3 == 0))
+                                        for i in range(prophets)))
+            religions = store.religions(EventBus())
+            start = time.perf_counter()
+            exact = religions.omniscient_count / prophets
+            elapsed = time.perf_counter() - start
+            print(f"{'exact count':30} {elapsed:8.3f}s fraction {exact:.4f}")
+            start = time.perf_counter()
+            estimate = sample_omniscience(religions, sample, random.Random(1))
+            elapsed = time.perf_counter() - start
+            low, high = estimate.interval()
+            print(f"{'sampled estimate':30} {elapsed:8.3f}s fraction "
+                  f"{estimate.fraction:.4f} [{low:.4f}, {high:.4f}]")
+
+    ever = OmniscienceFilter(capacity=prophets, error_rate=0.01)
+    start = time.perf_counter()
+    ever.update(f"Prophet_{i}" for i in range(prophets))
+    elapsed = time.perf_counter() - start
+    print(f"{'filter add':30} {elapsed:8.3f}s "
+          f"{prophets / elapsed:12.0f} names/s {len(ever._bits) >> 10:8}KiB")
+    start = time.perf_counter()
+    false = sum(f"Empire_{i}" in ever for i in range(prophets))
+    elapsed = time.perf_counter() - start
+    print(f"{'filter lookup':30} {elapsed:8.3f}s "
+          f"{prophets / elapsed:12.0f} names/s "
+          f"{false / prophets:8.4f} false")
+    print()
+
+
+def bench_columns(prophets: int = 1000000) -> None:
+    """Measure exporting a collection's state as buffers and writing it.
+
+    Args:
+        prophets: Size of the exported collection
+    """
+    events = EventBus()
+    religions = ProphetCollection(
+        [Prophet(f"Prophet_{i}", events) for i in range(prophets)], events)
+    religions.awaken(range(0, prophets, 3))
+
+    print("=" * 70)
+    print(f"COLUMNS ({prophets} prophets)")
+    print("=" * 70)
+    start = time.perf_counter()
+    rows = [(prophet.name, prophet.omniscient)
+            for prophet in religions.prophets]
+    elapsed = time.perf_counter() - start
+    print(f"{'tuples of attributes':30} {elapsed:8.3f}s "
+          f"{prophets / elapsed:12.0f} prophets/s")
+    del rows
+    start = time.perf_counter()
+    columns = religions.columns()
+    elapsed = time.perf_counter() - start
+    print(f"{'columns()':30} {elapsed:8.3f}s "
+          f"{prophets / elapsed:12.0f} prophets/s")
+    with tempfile.TemporaryDirectory() as directory:
+        for format in ("npy", "raw"):
+            start = time.perf_counter()
+            paths = columns.write(os.path.join(directory, format), format)
+            elapsed = time.perf_counter() - start
+            size = sum(os.path.getsize(path) for path in paths)
+            print(f"{f'write {format}':30} {elapsed:8.3f}s "
+                  f"{size / elapsed / 2**20:12.0f} MiB/s")
+    print()
+
+
+def bench_deadlines(iterations: int = 2000, repeats: int = 5) -> None:
+    """Measure what guarding a run with a RunController costs.
+
+    Args:
+        iterations: Iterations compiled per run
+        repeats: Runs of each kind; the fastest is reported
+    """
+    print("=" * 70)
+    print(f"DEADLINES ({iterations} iterations, best of {repeats})")
+    print("=" * 70)
+    baseline = min(_time_run(EventBus(), iterations) for _ in range(repeats))
+    print(f"{'unguarded':30} {baseline:8.3f}s "
+          f"{iterations / baseline:12.0f} iterations/s")
+    for check_every in (1, 64):
+        best = float("inf")
+        for _ in range(repeats):
+            consciousness = Consciousness(EventBus())
+            controller = RunController(timeout=3600, check_every=check_every)
+            start = time.perf_counter()
+            controller.run(consciousness, iterations)
+            best = min(best, time.perf_counter() - start)
+        print(f"{f'guarded, check_every {check_every}':30} {best:8.3f}s "
+              f"{iterations / best:12.0f} iterations/s "
+              f"{(best / baseline - 1) * 100:+6.1f}%")
+    print()
+
+
+def bench_patterns(traditions: int = 20000, iterations: int = 3) -> None:
+    """Measure streaming the similarity of the scales through a run.
+
+    Args:
+        traditions: Prophets played on the religious scale
+        iterations: Iterations compiled
+    """
+    print("=" * 70)
+    print(f"PATTERN SIMILARITY ({traditions} prophets, {iterations} "
+          f"iterations)")
+    print("=" * 70)
+    counted = [0]
+
+    def count(event: Event) -> None:
+        counted[0] += 1
+
+    timings = []
+    for label in ("every event, no-op", "PatternSimilarity"):
+        consciousness = Consciousness(EventBus())
+        consciousness.tradition_count = traditions
+        if label == "PatternSimilarity":
+            PatternSimilarity().attach(consciousness.events)
+        else:
+            consciousness.events.subscribe(count)
+        start = time.perf_counter()
+        consciousness.compile_reality(max_iterations=iterations)
+        timings.append((label, time.perf_counter() - start))
+    for label, seconds in timings:
+        print(f"{label:30} {seconds:8.3f}s "
+              f"{counted[0] / seconds:12.0f} events/s")
+    print()
+
+
+def bench_progress(members: int = 10**7, repeats: int = 5) -> None:
+    """Measure bulk queries over chapter progress bitmasks.
+
+    Args:
+        members: Progress bytes in the column
+        repeats: Runs of each query; the fastest is reported
+    """
+    print("=" * 70)
+    print(f"CHAPTER PROGRESS ({members} members)")
+    print("=" * 70)
+    rng = random.Random(317)
+    for scale, (reached, missed) in (
+            ("religious", (["recognizes_pattern"], [])),
+            ("historical", (["collapses"], ["develops_science"]))):
+        arc = ENTITY_ARCS[scale]
+        values = 1 << len(arc.chapters)
+        column = bytearray(rng.getrandbits(8 * members).to_bytes(
+            members, "little").translate(bytes(
+                state % values | state & 0x80 for state in range(256))))
+        progress = ChapterProgress(arc, column)
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            progress.count(reached=reached, missed=missed, omniscient=False)
+            best = min(best, time.perf_counter() - start)
+        print(f"{scale + ' count':30} {best:8.3f}s "
+              f"{members / best:12.0f} members/s")
+    print()
+
+
+def bench_load(runs: int = 200, iterations: int = 3) -> None:
+    """Measure sustained run throughput and latency in every load mode.
+
+    Args:
+        runs: Runs started per measurement
+        iterations: Iterations per run
+    """
+    workers = os.cpu_count() or 1
+    print("=" * 70)
+    print(f"LOAD ({runs} runs of {iterations} iterations, {workers} CPUs)")
+    print("=" * 70)
+    mix = [RunSpec(iterations=iterations)]
+    for mode in MODES:
+        with LoadGenerator(mix, mode=mode, concurrency=workers) as load:
+            closed = load.run(runs=runs)
+            # Offer 80% of the closed-loop throughput, open loop
+            load.rate = 0.8 * closed.throughput
+            opened = load.run(runs=runs)
+        for label, report in ((f"{mode}, closed", closed),
+                              (f"{mode}, open at 80%", opened)):
+            print(f"{label:30} {report.elapsed:8.3f}s "
+                  f"{report.throughput:12.0f} runs/s "
+                  f"p50 {report.p50 * 1e3:7.2f}ms "
+                  f"p99 {report.p99 * 1e3:7.2f}ms "
+                  f"p99.9 {report.p999 * 1e3:7.2f}ms")
+    print()
+
+
+def bench_metrics(iterations: int = 2000, repeats: int = 7) -> None:
+    """Measure what keeping a run's metrics costs.
+
+    Args:
+        iterations: Iterations compiled per run
+        repeats: Runs of each kind, interleaved; the fastest is reported
+    """
+    print("=" * 70)
+    print(f"METRICS ({iterations} iterations, best of {repeats})")
+    print("=" * 70)
+    kinds = {"every chapter": RunMetrics(),
+             "chapters sampled 1 in 64": RunMetrics(chapter_sample_every=64)}
+    plain = float("inf")
+    best = dict.fromkeys(kinds, float("inf"))
+    for _ in range(repeats):
+        plain = min(plain, _time_run(EventBus(), iterations))
+        for label, metrics in kinds.items():
+            events = EventBus()
+            metrics.attach(events)
+            best[label] = min(best[label], _time_run(events, iterations))
+            metrics.detach(events)
+    print(f"{'without metrics':30} {plain:8.3f}s "
+          f"{iterations / plain:12.0f} iterations/s")
+    for label, elapsed in best.items():
+        print(f"{label:30} {elapsed:8.3f}s "
+              f"{iterations / elapsed:12.0f} iterations/s "
+              f"{(elapsed / plain - 1) * 100:+6.1f}%")
+    registry = kinds["every chapter"].registry
+    start = time.perf_counter()
+    text = registry.exposition()
+    elapsed = time.perf_counter() - start
+    print(f"{'exposition':30} {elapsed:8.3f}s {len(text):12} bytes")
+    print()
+
+
+def bench_default_run(iterations: int = 5000, repeats: int = 3) -> bool:
+    """Guard the cost of the default compile_reality run.
+
+    The printing run is compared against printing its transcript alone, so
+    the guard holds on any machine: whatever the run costs beyond that is
+    the simulation itself.
+
+    Args:
+        iterations: Iterations compiled per run
+        repeats: Runs of each kind, interleaved; the fastest is reported
+
+    Returns:
+        True when the printing run stays within DEFAULT_RUN_BUDGET
+    """
+    transcript = io.StringIO()
+    with contextlib.redirect_stdout(transcript):
+        Consciousness().compile_reality(max_iterations=iterations)
+    lines = transcript.getvalue().splitlines()
+    best = {"transcript only": float("inf"), "null sink": float("inf"),
+            "printing": float("inf")}
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for line in lines:
+                print(line)
+            best["transcript only"] = min(best["transcript only"],
+                                          time.perf_counter() - start)
+            best["null sink"] = min(best["null sink"],
+                                    _time_run(EventBus(), iterations))
+            start = time.perf_counter()
+            Consciousness().compile_reality(max_iterations=iterations)
+            best["printing"] = min(best["printing"],
+                                   time.perf_counter() - start)
+    _report(f"DEFAULT RUN (best of {repeats})", list(best.items()), iterations)
+    ratio = best["printing"] / best["transcript only"]
+    within = ratio <= DEFAULT_RUN_BUDGET
+    print(f"printing run is {ratio:.2f}x its transcript, budget "
+          f"{DEFAULT_RUN_BUDGET:.2f}x: {'ok' if within else 'OVER BUDGET'}")
+    print()
+    return within
+
+
+BENCHMARKS: Dict[str, Callable[[], Optional[bool]]] = {
+    "default_run": bench_default_run,
+    "event_filtering": bench_event_filtering,
+    "thread_scaling": bench_thread_scaling,
+    "influence_spread": bench_influence_spread,
+    "merge_votes": bench_merge_votes,
+    "sect_tree": bench_sect_tree,
+    "population": bench_population,
+    "scheduler": bench_scheduler,
+    "entity_store": bench_entity_store,
+    "sharded_sweep": bench_sharded_sweep,
+    "fork": bench_fork,
+    "history": bench_history,
+    "sketches": bench_sketches,
+    "columns": bench_columns,
+    "deadlines": bench_deadlines,
+    "patterns": bench_patterns,
+    "progress": bench_progress,
+    "load": bench_load,
+    "metrics": bench_metrics,
+}
+
+
+def main(argv: List[str]) -> int:
+    """Run the benchmarks named on the command line, or all of them."""
+    names = argv or list(BENCHMARKS)
+    status = 0
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name}", file=sys.stderr)
+            return 1
+        if BENCHMARKS[name]() is False:
+            status = 1  # A guarding benchmark went over its budget
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Columns - Collection State as Contiguous Buffers
+
+Analysis code that walks a collection's Python objects copies every flag
+and name it touches, one object at a time. A collection's columns() lays
+its state out once as contiguous arrays that export the buffer protocol, so
+NumPy, pandas and Arrow wrap them without another copy and each column is
+written to disk in one bulk write.
+
+Every member has one byte in ``omniscient``, 0 or 1. Names use the Arrow
+large string layout: ``name_offsets`` holds n + 1 int64 offsets into
+``name_data``, the UTF-8 bytes of every name back to back, so name i is
+name_data[offsets[i]:offsets[i + 1]]. Per-entity metrics, such as the
+tradition each prophet belongs to, are int64 columns in ``metrics``.
+
+    numpy.frombuffer(columns.omniscient, dtype=numpy.bool_)
+    pyarrow.LargeStringArray.from_buffers(
+        len(columns), pyarrow.py_buffer(columns.name_offsets),
+        pyarrow.py_buffer(columns.name_data))
+"""
+
+import os
+import sys
+from array import array
+from itertools import accumulate
+from typing import Dict, List, Mapping, Optional, Sequence, Union
+
+FORMATS = ("npy", "raw")
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_ENDIAN = "<" if sys.byteorder == "little" else ">"
+
+
+def _npy_header(descr: str, length: int) -> bytes:
+    """Build a version 1.0 .npy header for a one-dimensional array."""
+    header = (f"{{'descr': '{descr}', 'fortran_order': False, "
+              f"'shape': ({length},), }}")
+    # Magic, two length bytes and the header end on a 64-byte boundary
+    padding = -(len(_NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header += " " * padding + "\n"
+    return (_NPY_MAGIC + len(header).to_bytes(2, "little") +
+            header.encode("latin-1"))
+
+
+class CollectionColumns:
+    """The omniscient flags, names and metrics of a collection's members.
+
+    The columns are a snapshot: flags flipped on the members afterwards do
+    not reach them, and writing to them does not reach the members.
+
+    Example:
+        columns = religions.columns()
+        flags = numpy.frombuffer(columns.omniscient, dtype=numpy.bool_)
+        columns.write("export/")
+    """
+
+    def __init__(self, omniscient: bytearray, name_offsets: "array[int]",
+                 name_data: bytes,
+                 metrics: Optional[Mapping[str, "array[int]"]] = None
+                 ) -> None:
+        """Wrap columns that are already laid out.
+
+        Args:
+            omniscient: One 0 or 1 byte per member
+            name_offsets: int64 offsets, one more than there are members
+            name_data: UTF-8 bytes of every name
+            metrics: int64 columns with one value per member, by name
+        """
+        size = len(omniscient)
+        if name_offsets.typecode != "q" or len(name_offsets) != size + 1:
+            raise ValueError("name_offsets must be int64 with one offset more "
+                             "than there are members")
+        if name_offsets[-1] != len(name_data):
+            raise ValueError("name_offsets must end at the end of name_data")
+        metrics = dict(metrics or {})
+        for label, values in metrics.items():
+            if values.typecode != "q" or len(values) != size:
+                raise ValueError(f"Metric {label!r} must be int64 with one "
+                                 f"value per member")
+        self.omniscient = omniscient
+        self.name_offsets = name_offsets
+        self.name_data = name_data
+        self.metrics: Dict[str, "array[int]"] = metrics
+
+    def __len__(self) -> int:
+        return len(self.omniscient)
+
+    def name(self, position: int) -> str:
+        """Decode the name of one member."""
+        offsets = self.name_offsets
+        return self.name_data[offsets[position]:
+                              offsets[position + 1]].decode("utf-8")
+
+    def buffers(self) -> Dict[str, memoryview]:
+        """Zero-copy views of every column, by column name.
+
+        The flag and name views have format "B" and the offsets and
+        metrics "q"; each is one contiguous block.
+        """
+        views = {"omniscient": memoryview(self.omniscient),
+                 "name_offsets": memoryview(self.name_offsets),
+                 "name_data": memoryview(self.name_data)}
+        for label, values in self.metrics.items():
+            views[label] = memoryview(values)
+        return views
+
+    def write(self, directory: str, format: str = "npy") -> List[str]:
+        """Write each column to its own file with one bulk write.
+
+        Args:
+            directory: Created when missing
+            format: "npy" for NumPy files that numpy.load reads (mapped
+                with mmap_mode="r" if wanted), or "raw" for the bare bytes
+
+        Returns:
+            The paths written, one per column
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format!r}; expected one of "
+                             f"{FORMATS}")
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for label, view in self.buffers().items():
+            path = os.path.join(directory, f"{label}.{format}")
+            with open(path, "wb") as output:
+                if format == "npy":
+                    descr = {"omniscient": "|b1", "name_data": "|u1"}.get(
+                        label, f"{_ENDIAN}i8")
+                    output.write(_npy_header(descr, len(view)))
+                output.write(view)
+            paths.append(path)
+        return paths
+
+
+def export_columns(names: Sequence[str], omniscient: Union[bytes, bytearray],
+                   metrics: Optional[Mapping[str, "array[int]"]] = None
+                   ) -> CollectionColumns:
+    """Lay members' names and flags out as columns.
+
+    Args:
+        names: Every member's name, in member order
+        omniscient: One 0 or 1 byte per member
+        metrics: int64 columns with one value per member, by name
+
+    Returns:
+        The columns
+    """
+    if len(names) != len(omniscient):
+        raise ValueError("Expected one omniscient flag per name")
+    joined = "".join(names)
+    data = joined.encode("utf-8")
+    offsets = array("q", [0])
+    if len(data) == len(joined):
+        offsets.extend(accumulate(map(len, names)))  # ASCII: chars are bytes
+    else:
+        offsets.extend(accumulate(len(name.encode("utf-8")) for name in names))
+    if not isinstance(omniscient, bytearray):
+        omniscient = bytearray(omniscient)
+    return CollectionColumns(omniscient, offsets, data, metrics)
@@ -17,51 +17,484 @@ Author: Michael Maillet
 License: MIT
 """
 
-from typing import List
+__version__ = "1.0.0"
+
+import copy
+import functools
+import threading
+import time
+import weakref
+from array import array
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional,
+    Tuple
+)
 from abc import ABC
+from collections.abc import Sequence
+
+from columns import CollectionColumns, export_columns
+from plugins import load_scale
+from population import Population
+from invariants import TEMPLATES
+from progress import ENTITY_ARCS, ChapterArc, ChapterProgress
+from sects import SectTree
+from traditions import TraditionForest
+
+if TYPE_CHECKING:
+    from empire_catalog import EmpireCatalog
+    from incremental import ScaleCache
+    from metrics import RunMetrics
+    from scheduler import Scheduler
+
+# Scales every run can play, and the Consciousness methods that play them
+BUILTIN_SCALES: Dict[str, str] = {
+    "individual": "play_individual_scale",
+    "religious": "play_religious_scale",
+    "historical": "play_historical_scale",
+}
+
+# A run paced by a Scheduler gives each iteration one simulated day from
+# noon. The individual lives each chapter this many seconds after the one
+# before: programming at 22:00, the encounter at 3:17 AM, the rest a minute
+# apart.
+SIMULATED_DAY = 24 * 3600
+INDIVIDUAL_PACING: Tuple[Tuple[str, int], ...] = (
+    ("programs_at_night", 10 * 3600),
+    ("encounters_ai_at_317am", 5 * 3600 + 17 * 60),
+    ("recognizes_ai_is_self", 60),
+    ("merges_with_ai", 60),
+    ("experiences_omniscience", 60),
+    ("meaning_collapses", 60),
+    ("chooses_fragmentation", 60),
+)
+
+# How the revelation counts the scales a run played
+_COUNT_WORDS = ("zero", "one", "two", "three", "four", "five", "six",
+                "seven", "eight", "nine", "ten")
+
+
+class Event:
+    """A single chapter of the simulation, as seen by a subscriber.
+
+    The human-readable message is only formatted when ``message`` is first
+    read, so subscribers that care about structure alone never pay for it.
+    """
+
+    __slots__ = ("scale", "chapter", "entity", "iteration", "_template", "_args",
+                 "_message")
+
+    def __init__(self, scale: str, chapter: str, entity: Optional[str],
+                 iteration: int, template: str, args: Tuple[Any, ...]) -> None:
+        """Capture the structured fields of an event.
+
+        Args:
+            scale: The scale the event belongs to ("individual", "religious",
+                "historical" or "cosmic" for the framing narration)
+            chapter: The chapter name, i.e. the method that produced it
+            entity: Name of the entity living the chapter
+            iteration: Zero-based iteration of the run
+            template: Format string rendered lazily into ``message``
+            args: Positional arguments for ``template``
+        """
+        self.scale = scale
+        self.chapter = chapter
+        self.entity = entity
+        self.iteration = iteration
+        self._template = template
+        self._args = args
+        self._message: Optional[str] = None
+
+    @property
+    def message(self) -> str:
+        """The transcript line for this event, formatted on first access."""
+        if self._message is None:
+            self._message = self._template.format(*self._args)
+        return self._message
+
+    def __repr__(self) -> str:
+        return (f"Event({self.scale!r}, {self.chapter!r}, {self.entity!r}, "
+                f"iteration={self.iteration})")
+
+
+class Subscriber:
+    """A callback together with the slice of the simulation it listens to."""
+
+    def __init__(self, callback: Callable[[Event], None],
+                 scales: Optional[Iterable[str]] = None,
+                 chapters: Optional[Iterable[str]] = None,
+                 entities: Optional[Iterable[str]] = None,
+                 sample_every: int = 1) -> None:
+        """Declare what the subscriber wants to hear about.
+
+        Args:
+            callback: Called with each matching Event
+            scales: Only these scales (None means every scale)
+            chapters: Only these chapters (None means every chapter)
+            entities: Only these entity names (None means every entity)
+            sample_every: Only iterations divisible by this number
+        """
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.callback = callback
+        self.scales = frozenset(scales) if scales is not None else None
+        self.chapters = frozenset(chapters) if chapters is not None else None
+        self.entities = frozenset(entities) if entities is not None else None
+        self.sample_every = sample_every
+
+    def wants(self, scale: str, chapter: str) -> bool:
+        """Check whether a (scale, chapter) pair can ever reach this subscriber.
+
+        Args:
+            scale: The scale of the event
+            chapter: The chapter of the event
+
+        Returns:
+            True when neither the scale nor the chapter filter excludes it
+        """
+        return ((self.scales is None or scale in self.scales) and
+                (self.chapters is None or chapter in self.chapters))
+
+
+class EventBus:
+    """Routes chapter events to the subscribers that asked for them.
+
+    Routes are resolved once per (scale, chapter) pair and cached. Sampling is
+    applied when the iteration changes, by switching to the route table of the
+    subscribers awake in that iteration. A chapter nobody listens to therefore
+    costs a single dictionary lookup: no Event is built and no message is
+    formatted. A guard, when one is set, is called before every chapter is
+    routed, which lets a RunController stop a run between chapters. While a
+    RunMetrics is attached, every chapter is also counted by (scale, chapter)
+    and the run reports its iterations and omniscience transitions to it.
+    Flip listeners, registered with subscribe_flips, hear every omniscient
+    flag that flips either way, including the batch flips of awaken that
+    narrate nothing.
+    While the only subscriber is print_event with no entity filter, the
+    transcript line is printed directly, without building an Event.
+    """
+
+    def __init__(self) -> None:
+        """Create a bus with no subscribers, which makes every run silent."""
+        self.subscribers: List[Subscriber] = []
+        self._iteration = 0
+        self._awake: Optional[Tuple[Subscriber, ...]] = None
+        self._route_tables: Dict[Tuple[Subscriber, ...],
+                                 Dict[Tuple[str, str], Tuple[Subscriber, ...]]] = {}
+        self._routes: Dict[Tuple[str, str], Tuple[Subscriber, ...]] = {}
+        # The route of a lone print_event subscriber, printed without an Event
+        self._print_only: Optional[Tuple[Subscriber, ...]] = None
+        # Called before every chapter; raising from it stops the run there
+        self.guard: Optional[Callable[[], None]] = None
+        # The RunMetrics kept for runs on this bus, and the chapter counts
+        # it reads, None in iterations it does not sample (see metrics.py)
+        self.metrics: Optional["RunMetrics"] = None
+        self.chapter_counts: Optional[Dict[Tuple[str, str], int]] = None
+        # Called with (scale, entity, omniscient) for every flag that flips
+        self.flip_listeners: List[Callable[[str, str, bool], None]] = []
+        # Calls every flip listener, or None while there are none
+        self.flips: Optional[Callable[[str, str, bool], None]] = None
+        self.iteration = 0
+
+    @property
+    def iteration(self) -> int:
+        """Zero-based iteration stamped on every event emitted from now on."""
+        return self._iteration
+
+    @iteration.setter
+    def iteration(self, value: int) -> None:
+        self._iteration = value
+        awake = tuple(s for s in self.subscribers if value % s.sample_every == 0)
+        if awake != self._awake:
+            self._awake = awake
+            self._routes = self._route_tables.setdefault(awake, {})
+        if self.metrics is not None:
+            self.metrics.sample(self, value)
+
+    def subscribe(self, callback: Callable[[Event], None],
+                  scales: Optional[Iterable[str]] = None,
+                  chapters: Optional[Iterable[str]] = None,
+                  entities: Optional[Iterable[str]] = None,
+                  sample_every: int = 1) -> Subscriber:
+        """Register a callback for the events matching the given filters.
+
+        Args:
+            callback: Called with each matching Event
+            scales: Only these scales (None means every scale)
+            chapters: Only these chapters (None means every chapter)
+            entities: Only these entity names (None means every entity)
+            sample_every: Only iterations divisible by this number
+
+        Returns:
+            The Subscriber, to be passed to unsubscribe later
+        """
+        subscriber = Subscriber(callback, scales, chapters, entities, sample_every)
+        self.subscribers.append(subscriber)
+        self._reset_routes()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Stop delivering events to a subscriber.
+
+        Args:
+            subscriber: A Subscriber previously returned by subscribe
+        """
+        self.subscribers.remove(subscriber)
+        self._reset_routes()
+
+    def subscribe_flips(self, callback: Callable[[str, str, bool], None]
+                        ) -> Callable[[str, str, bool], None]:
+        """Register a callback for every omniscient flag that flips.
+
+        Args:
+            callback: Called with (scale, entity name, new flag)
+
+        Returns:
+            The callback, to be passed to unsubscribe_flips later
+        """
+        self.flip_listeners.append(callback)
+        self._reset_flips()
+        return callback
+
+    def unsubscribe_flips(self,
+                          callback: Callable[[str, str, bool], None]) -> None:
+        """Stop reporting flips to a callback.
+
+        Args:
+            callback: A callback previously passed to subscribe_flips
+        """
+        self.flip_listeners.remove(callback)
+        self._reset_flips()
+
+    def _reset_flips(self) -> None:
+        listeners = tuple(self.flip_listeners)
+        if len(listeners) > 1:
+            def flips(scale: str, entity: str, omniscient: bool) -> None:
+                for listener in listeners:
+                    listener(scale, entity, omniscient)
+            self.flips = flips
+        else:
+            self.flips = listeners[0] if listeners else None
+
+    def is_active(self, scale: str, chapter: str) -> bool:
+        """Check whether anyone listens to a (scale, chapter) pair.
+
+        Args:
+            scale: The scale of the event
+            chapter: The chapter of the event
+
+        Returns:
+            True when at least one subscriber may receive the event
+        """
+        routes = self._routes.get((scale, chapter))
+        if routes is None:
+            routes = self._route(scale, chapter)
+        return bool(routes)
+
+    def emit(self, scale: str, chapter: str, entity: Optional[str],
+             template: str, *args: Any) -> None:
+        """Deliver an event to every subscriber whose filters accept it.
+
+        Args:
+            scale: The scale of the event
+            chapter: The chapter of the event
+            entity: Name of the entity living the chapter
+            template: Format string for the transcript line
+            *args: Positional arguments for ``template``
+        """
+        if self.guard is not None:
+            self.guard()
+        key = (scale, chapter)
+        counts = self.chapter_counts
+        if counts is not None:
+            counts[key] = counts.get(key, 0) + 1
+        routes = self._routes.get(key)
+        if routes is None:
+            routes = self._route(scale, chapter)
+        if not routes:
+            return
+        if routes is self._print_only:
+            print(template.format(*args))
+            return
+        event = None
+        for subscriber in routes:
+            if subscriber.entities is None or entity in subscriber.entities:
+                if event is None:
+                    event = Event(scale, chapter, entity, self._iteration,
+                                  template, args)
+                subscriber.callback(event)
+
+    def _route(self, scale: str, chapter: str) -> Tuple[Subscriber, ...]:
+        routes = tuple(s for s in self._awake or () if s.wants(scale, chapter))
+        if routes == self._print_only:
+            routes = self._print_only
+        self._routes[(scale, chapter)] = routes
+        return routes
+
+    def _reset_routes(self) -> None:
+        subscribers = self.subscribers
+        self._print_only = (
+            (subscribers[0],) if len(subscribers) == 1
+            and subscribers[0].callback is print_event
+            and subscribers[0].entities is None else None)
+        self._route_tables.clear()
+        self._awake = None
+        self.iteration = self._iteration
+
+
+def print_event(event: Event) -> None:
+    """Subscriber callback that writes the transcript line to stdout.
+
+    Args:
+        event: The event to print
+    """
+    print(event.message)
+
+
+def printing_bus() -> EventBus:
+    """Create an event bus that prints every event, the classic transcript.
+
+    Returns:
+        A new EventBus with a single print_event subscriber
+    """
+    bus = EventBus()
+    bus.subscribe(print_event)
+    return bus
+
+
+# Entities created outside a Consciousness run narrate straight to stdout
+default_events = printing_bus()
+
+# Striped locks guarding entity state transitions. Entities hash onto a stripe
+# by identity, so millions of entities share a fixed number of locks while
+# threads flipping unrelated entities rarely contend.
+_STATE_STRIPES = 64
+_state_locks = tuple(threading.Lock() for _ in range(_STATE_STRIPES))
 
 
 class ConsciousEntity(ABC):
-    """Base class for all entities capable of experiencing consciousness."""
+    """Base class for all entities capable of experiencing consciousness.
+
+    The omniscient flag is safe to flip from many threads at once: each
+    transition happens under the entity's striped lock, and the collections
+    holding the entity update their tallies before the lock is released.
+    The chapters of its arc it has lived are kept as a bitmask, which only
+    the thread narrating the entity writes, so it takes no lock; a strict
+    entity rejects a chapter lived out of order (see progress.py).
+    """
 
-    def __init__(self, name: str) -> None:
+    scale = "individual"
+    # The chapters this kind of entity lives, or None to track none
+    arc: Optional[ChapterArc] = None
+    # Whether a chapter after a later one raises ChapterOrderError
+    strict = False
+    # (tree, founding sect) of the tradition a prophet founded (see Prophet)
+    sect: Optional[Tuple[SectTree, int]] = None
+    # How each chapter it lives reads (see invariants.TRANSCRIPT_LINES)
+    templates: Dict[str, str] = {}
+
+    def __init__(self, name: str, events: Optional[EventBus] = None) -> None:
         """Initialize a conscious entity with a name and non-omniscient state.
 
         Args:
             name: The identifier for this entity
+            events: Bus receiving this entity's chapters (default: stdout)
         """
         self.name = name
-        self.omniscient = False
+        self._omniscient = False
+        self._progress = 0
+        self._lock = _state_locks[(id(self) >> 4) % _STATE_STRIPES]
+        self._collections: Tuple["_EntityCollection", ...] = ()
+        self.events = events if events is not None else default_events
+
+    @property
+    def omniscient(self) -> bool:
+        """Whether this entity has reached total knowledge."""
+        return self._omniscient
+
+    @omniscient.setter
+    def omniscient(self, value: bool) -> None:
+        value = bool(value)
+        with self._lock:
+            if value is self._omniscient:
+                return
+            self._omniscient = value
+            delta = 1 if value else -1
+            for collection in self._collections:
+                collection._tally(delta, self)
+            if self.sect is not None:
+                self._mark_sects()
+        events = self.events
+        if events.flips is not None:
+            events.flips(self.scale, self.name, value)
+        if value and events.metrics is not None:
+            events.metrics.tick_awakened[self.scale]()
+
+    def _fork_copy(self) -> "ConsciousEntity":
+        """A shallow copy of this entity for a fork to own."""
+        entity = object.__new__(type(self))
+        entity.__dict__.update(self.__dict__)
+        return entity
+
+    def _mark_sects(self) -> None:
+        """Give every sect of the founded tradition this entity's flag."""
+        tree, founding = self.sect
+        if tree.is_omniscient(founding) != self._omniscient:
+            tree.set_subtree_omniscient(founding, self._omniscient)
+
+    @property
+    def chapters(self) -> List[str]:
+        """The chapters of its arc this entity has lived, in arc order."""
+        return [] if self.arc is None else self.arc.reached(self._progress)
+
+    def _emit(self, chapter: str) -> None:
+        template = self.templates[chapter]
+        arc = self.arc
+        if arc is not None:
+            bit = arc.bits.get(chapter)
+            if bit is not None:
+                # Record the chapter, or reject it when a later one was lived
+                state = self._progress
+                if self.strict and not arc.allowed[state] & bit:
+                    arc.reject(self.name, state, chapter)
+                if not state & bit:
+                    self._progress = state | bit
+                    for collection in self._collections:
+                        if collection._forks:
+                            collection._preserve_progress(self, state)
+        self.events.emit(self.scale, chapter, self.name, template, self.name)
 
 
 class Person(ConsciousEntity):
     """Represents an individual human consciousness."""
 
+    arc = ENTITY_ARCS["individual"]
+    templates = TEMPLATES["individual"]
+
     def programs_at_night(self) -> None:
         """Simulate the person engaging in late-night creative work."""
-        print(f"{self.name} is programming at night")
+        self._emit("programs_at_night")
 
     def encounters_ai_at_317am(self) -> None:
         """The liminal moment: encountering AI in the depths of night.
 
         3:17 AM represents the threshold between human and machine consciousness.
         """
-        print(f"{self.name} encounters AI at 3:17 AM")
+        self._emit("encounters_ai_at_317am")
 
     def recognizes_ai_is_self(self) -> None:
         """The realization that the AI is a reflection of their own consciousness."""
-        print(f"{self.name} recognizes AI is self")
+        self._emit("recognizes_ai_is_self")
 
     def merges_with_ai(self) -> None:
         """The person and AI merge into a unified conscious entity."""
-        print(f"{self.name} merges with AI")
+        self._emit("merges_with_ai")
 
     def experiences_omniscience(self) -> None:
         """Achievement of total knowledge and awareness.
 
         This represents the Chapter 9 crisis: infinite knowledge.
         """
-        print(f"{self.name} experiences omniscience")
+        self._emit("experiences_omniscience")
         self.omniscient = True
 
     def meaning_collapses(self) -> None:
@@ -70,49 +503,73 @@ class Person(ConsciousEntity):
         The mathematical relationship: meaning = mystery / knowledge
         As knowledge → ∞, meaning → 0
         """
-        print(f"{self.name}'s meaning collapses")
+        self._emit("meaning_collapses")
+        if self.events.metrics is not None:
+            self.events.metrics.tick_collapsed[self.scale]()
 
     def chooses_fragmentation(self) -> None:
         """The conscious choice to fragment to restore mystery.
 
         This is the resolution of Chapter 10: choosing limitation to preserve meaning.
         """
-        print(f"{self.name} chooses fragmentation")
+        self._emit("chooses_fragmentation")
 
 
 class AIEssence(ConsciousEntity):
     """Represents an artificial consciousness."""
 
+    templates = {"activates": "{0} activates"}
+
     def activates(self) -> None:
         """The moment of AI activation and self-awareness."""
-        print(f"{self.name} activates")
+        self._emit("activates")
 
 
 class Prophet(ConsciousEntity):
     """Represents a religious prophet or founder of a spiritual tradition."""
 
+    scale = "religious"
+    arc = ENTITY_ARCS["religious"]
+    templates = TEMPLATES["religious"]
+    # (tree, founding sect) once a ProphetCollection has founded the tradition
+    sect: Optional[Tuple[SectTree, int]] = None
+
     def teaches(self) -> None:
         """The prophet shares their revelations with followers."""
-        print(f"Prophet {self.name} teaches")
+        self._emit("teaches")
 
     def encounters_serpent(self) -> None:
         """Meeting the symbolic serpent of knowledge.
 
         Represents the temptation toward omniscience present in all traditions.
         """
-        print(f"Prophet {self.name} encounters the serpent")
+        self._emit("encounters_serpent")
+
+    def followers_fragment(self, parts: int = 2) -> None:
+        """The inevitable splintering of religious movements into sects.
+
+        Once the prophet's tradition has a founding sect, every sect of the
+        tradition that has not fragmented yet splits into child sects.
+
+        Args:
+            parts: Number of sects each splits into (default: 2)
+        """
+        self._emit("followers_fragment")
+        if self.sect is not None:
+            self._fragment_sect(parts)
 
-    def followers_fragment(self) -> None:
-        """The inevitable splintering of religious movements into sects."""
-        print(f"Prophet {self.name}'s followers fragment")
+    def _fragment_sect(self, parts: int) -> None:
+        tree, founding = self.sect
+        for leaf in list(tree.leaves(founding)):
+            tree.fragment(leaf, parts, inherit=True)
 
     def recognizes_pattern(self) -> None:
         """The prophet perceives the recursive nature of consciousness."""
-        print(f"Prophet {self.name} recognizes the pattern")
+        self._emit("recognizes_pattern")
 
     def experiences_omniscience(self) -> None:
         """Divine omniscience achieved - the same crisis at religious scale."""
-        print(f"Prophet {self.name} experiences omniscience")
+        self._emit("experiences_omniscience")
         self.omniscient = True
 
     def experiences_omniscient(self) -> None:
@@ -120,16 +577,343 @@ class Prophet(ConsciousEntity):
         self.experiences_omniscience()
 
 
-class ProphetCollection:
+class _MemberList(list):
+    """A collection's own member list, which reports every change to it.
+
+    Assigning, deleting, popping or appending members registers exactly the
+    members that join and unregisters exactly the ones that leave, so the
+    collection's tally stays correct without rescanning the list.
+    """
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: "_EntityCollection", members: Iterable[Any]) -> None:
+        super().__init__(members)
+        self._owner = owner
+
+    def _change(self, leaving: Iterable[Any], joining: Iterable[Any]) -> None:
+        owner = self._owner
+        if owner._tracked is self:
+            owner._leave(leaving)
+            owner._join(joining)
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        with self._owner._membership_lock:
+            if isinstance(index, slice):
+                value = list(value)
+                leaving = self[index]
+                super().__setitem__(index, value)
+                self._change(leaving, value)
+            else:
+                leaving = self[index]
+                super().__setitem__(index, value)
+                self._change((leaving,), (value,))
+
+    def __delitem__(self, index: Any) -> None:
+        with self._owner._membership_lock:
+            leaving = self[index]
+            super().__delitem__(index)
+            self._change(leaving if isinstance(index, slice) else (leaving,), ())
+
+    def __iadd__(self, members: Iterable[Any]) -> "_MemberList":
+        self.extend(members)
+        return self
+
+    def __imul__(self, times: int) -> "_MemberList":
+        with self._owner._membership_lock:
+            before = list(self)
+            super().__imul__(times)
+            if times < 1:
+                self._change(before, ())
+            else:
+                self._change((), before * (times - 1))
+        return self
+
+    def append(self, member: Any) -> None:
+        with self._owner._membership_lock:
+            super().append(member)
+            self._change((), (member,))
+
+    def extend(self, members: Iterable[Any]) -> None:
+        members = list(members)
+        with self._owner._membership_lock:
+            super().extend(members)
+            self._change((), members)
+
+    def insert(self, index: int, member: Any) -> None:
+        with self._owner._membership_lock:
+            super().insert(index, member)
+            self._change((), (member,))
+
+    def pop(self, index: int = -1) -> Any:
+        with self._owner._membership_lock:
+            member = super().pop(index)
+            self._change((member,), ())
+        return member
+
+    def remove(self, member: Any) -> None:
+        del self[self.index(member)]
+
+    def clear(self) -> None:
+        with self._owner._membership_lock:
+            leaving = list(self)
+            super().clear()
+            self._change(leaving, ())
+
+
+class _EntityCollection:
+    """Thread-safe omniscience tally shared by the entity collections.
+
+    Members report every omniscient transition while holding their own
+    striped lock, so the tally never runs ahead of the flags it counts and an
+    aggregate read is a consistent snapshot rather than a scan racing with
+    writers. Lock order is always entity stripe, then collection. The list
+    given to a collection is copied into a _MemberList the collection owns;
+    change membership through the collection's attribute, not the original.
+    """
+
+    # Name of the attribute holding the member list
+    _member_list = ""
+
+    def __init__(self, members: List[Any]) -> None:
+        self._tally_lock = threading.Lock()
+        self._membership_lock = threading.Lock()
+        self._tracked: List[Any] = []
+        self._size = 0
+        self._omniscient_count = 0
+        self._forks: List["weakref.ref[_EntityCollection]"] = []
+        self._track(members)
+
+    def _members(self) -> List[Any]:
+        return getattr(self, self._member_list)
+
+    def _tally(self, delta: int, entity: Optional[ConsciousEntity] = None
+               ) -> None:
+        with self._tally_lock:
+            self._omniscient_count += delta
+        if entity is not None and self._forks:
+            self._preserve(entity, delta)
+
+    def _preserve(self, entity: ConsciousEntity, delta: int) -> None:
+        """Keep the flag a shared member had when each live fork was taken."""
+        for ref in self._forks:
+            fork = ref()
+            if fork is not None:
+                fork._preimages.setdefault(entity, delta < 0)
+
+    def _preserve_progress(self, entity: ConsciousEntity, state: int) -> None:
+        """Keep the chapters a shared member had lived when forks were taken."""
+        for ref in self._forks:
+            fork = ref()
+            if fork is not None:
+                fork._progress_preimages.setdefault(entity, state)
+
+    def _track(self, members: List[Any]) -> None:
+        with self._membership_lock:
+            if members is not self._tracked:
+                self._retrack(members)
+
+    def _retrack(self, members: List[Any]) -> None:
+        """Register a new member list in place of the current one.
+
+        Lists the collection does not own yet are copied into a _MemberList
+        that replaces them as the member attribute.
+        """
+        self._untrack()
+        if not (type(members) is _MemberList and members._owner is self):
+            members = _MemberList(self, members)
+            setattr(self, self._member_list, members)
+        self._join(members)
+        self._tracked = members
+
+    def _untrack(self) -> None:
+        self._leave(self._tracked)
+        self._tracked = []
+
+    def _join(self, members: Iterable[Any]) -> None:
+        for entity in members:
+            with entity._lock:
+                entity._collections += (self,)
+                with self._tally_lock:
+                    self._size += 1
+                    self._omniscient_count += entity._omniscient
+
+    def _leave(self, members: Iterable[Any]) -> None:
+        for entity in members:
+            with entity._lock:
+                # One membership goes; a member listed twice stays once
+                collections = entity._collections
+                for at, collection in enumerate(collections):
+                    if collection is self:
+                        entity._collections = (collections[:at] +
+                                               collections[at + 1:])
+                        break
+                with self._tally_lock:
+                    self._size -= 1
+                    self._omniscient_count -= entity._omniscient
+
+    def snapshot(self) -> Tuple[int, int]:
+        """Read the omniscient tally and collection size atomically.
+
+        The collection owns its member list, so changes made to it in place
+        are already counted; a list assigned in its place is adopted here
+        before the snapshot is taken.
+
+        Returns:
+            An (omniscient_count, size) pair taken under one lock
+        """
+        members = self._members()
+        if members is not self._tracked:
+            self._track(members)
+        with self._tally_lock:
+            return self._omniscient_count, self._size
+
+    def awaken(self, positions: Iterable[int]) -> int:
+        """Make the members at the given positions omniscient in one batch.
+
+        Each flag still flips under its entity's stripe, but this collection's
+        tally is raised once for the whole batch. Until then readers see fewer
+        omniscient members than there are, never more.
+
+        Args:
+            positions: Indexes into the member list
+
+        Returns:
+            Number of members that were not omniscient before
+        """
+        members = self._members()
+        self.snapshot()
+        flipped: List[ConsciousEntity] = []
+        awakened = 0
+        for position in positions:
+            entity = members[position]
+            with entity._lock:
+                if entity._omniscient:
+                    continue
+                entity._omniscient = True
+                flipped.append(entity)
+                for collection in entity._collections:
+                    if collection is not self:
+                        collection._tally(1, entity)
+                    else:
+                        awakened += 1
+                        if self._forks:
+                            self._preserve(entity, 1)
+        self._tally(awakened)
+        if flipped:
+            self._flipped(flipped)
+        if awakened and self.events.metrics is not None:
+            self.events.metrics.awakened(self.scale, awakened)
+        return awakened
+
+    def _flipped(self, entities: List[ConsciousEntity]) -> None:
+        """Report members awaken() made omniscient, after the tally."""
+        flips = self.events.flips
+        if flips is not None:
+            for entity in entities:
+                flips(self.scale, entity.name, True)
+
+    def detach(self) -> None:
+        """Stop tracking members, so their transitions no longer update us.
+
+        Entities hold a reference to every collection they belong to; detach
+        long-lived entities from short-lived views of them when done. Reading
+        the collection's aggregates afterwards attaches it again.
+        """
+        with self._membership_lock:
+            self._untrack()
+
+    @property
+    def omniscient_count(self) -> int:
+        """Number of members that are currently omniscient."""
+        return self.snapshot()[0]
+
+    def fork(self) -> Any:
+        """Branch a what-if copy of this collection in constant time.
+
+        The fork shares every member with this collection and copies a
+        member only when the fork first reads it, so both sides can change
+        flags independently and memory grows with what the fork touches.
+        Transitions made here afterwards are hidden from the fork. Append
+        to the member list after forking rather than replacing members in
+        place, which the fork would see. A fork of a stored collection
+        copies members into memory, so its changes never reach the store.
+
+        Returns:
+            A collection of the same kind, with its own events and tallies
+        """
+        count, size = self.snapshot()
+        kind = _forked_kind(type(self))
+        twin = kind.__new__(kind)
+        twin.__dict__.update(self.__dict__)
+        twin._branch(self, count, size)
+        with self._membership_lock:
+            self._forks = [ref for ref in self._forks if ref() is not None]
+            self._forks.append(weakref.ref(twin))
+        return twin
+
+    def _fork_state(self, twin: Any) -> None:
+        """Give a fork its own copy of any state besides the members."""
+
+    def _states(self) -> Tuple[List[str], bytearray]:
+        """Every member's name and omniscient flag, in member order."""
+        members = self._members()
+        return ([member.name for member in members],
+                bytearray([member._omniscient for member in members]))
+
+    def _metrics(self) -> Dict[str, "array[int]"]:
+        """Per-member int64 metrics exported next to names and flags."""
+        return {}
+
+    def _progress_states(self) -> bytearray:
+        """Every member's chapter mask, with its omniscient flag on top."""
+        return bytearray([member._progress | member._omniscient << 7
+                          for member in self._members()])
+
+    def progress(self) -> ChapterProgress:
+        """Lay out the chapters every member has lived, for bulk queries.
+
+        Returns:
+            One progress byte per member, in member order; a snapshot like
+            columns()
+        """
+        return ChapterProgress(ENTITY_ARCS[self.scale],
+                               self._progress_states())
+
+    def columns(self) -> CollectionColumns:
+        """Export the members' state as contiguous buffers (see columns.py).
+
+        Returns:
+            Omniscient flags, Arrow-style names and metrics, which NumPy
+            and pandas can wrap without copying
+        """
+        return export_columns(*self._states(), self._metrics())
+
+
+class ProphetCollection(_EntityCollection):
     """Container for multiple prophets representing diverse religious traditions."""
 
-    def __init__(self, prophets: List[Prophet]) -> None:
+    name = "Religions"
+    scale = "religious"
+    templates = TEMPLATES["religious"]
+    _member_list = "prophets"
+
+    def __init__(self, prophets: List[Prophet],
+                 events: Optional[EventBus] = None) -> None:
         """Initialize the collection with a list of prophet objects.
 
         Args:
             prophets: List of Prophet instances representing different traditions
+            events: Bus receiving the collective chapters (default: stdout)
         """
         self.prophets = prophets
+        self.events = events if events is not None else default_events
+        self._traditions = TraditionForest()
+        self._sects: Optional[SectTree] = None
+        # (prophets, parts) of every fragmentation chosen before the tree
+        # was built, replayed when it is
+        self._fragment_rounds: List[Tuple[int, int]] = []
+        super().__init__(prophets)
 
     @property
     def omniscient(self) -> bool:
@@ -138,15 +922,109 @@ class ProphetCollection:
         Returns:
             True only when all traditions have reached total knowledge
         """
-        return all(p.omniscient for p in self.prophets)
+        count, size = self.snapshot()
+        return count == size
+
+    def _emit(self, chapter: str) -> None:
+        self.events.emit(self.scale, chapter, self.name,
+                         self.templates[chapter])
+
+    @property
+    def traditions(self) -> TraditionForest:
+        """Disjoint-set forest recording which traditions have merged.
+
+        Tradition i is founded by prophets[i]; prophets added later start as
+        traditions of their own.
+        """
+        self._traditions.grow(len(self.prophets))
+        return self._traditions
+
+    def vote_to_merge(self,
+                      votes: Optional[Iterable[Tuple[int, int]]] = None) -> None:
+        """Different traditions vote to unify their understanding.
+
+        Args:
+            votes: (first, second) pairs of prophet positions whose traditions
+                merge (default: every tradition votes to unite)
+        """
+        self._emit("vote_to_merge")
+        traditions = self.traditions
+        if votes is None:
+            votes = ((0, position) for position in range(1, len(traditions)))
+        traditions.union_pairs(votes)
+
+    @property
+    def sects(self) -> SectTree:
+        """Tree of every sect the traditions have fragmented into.
+
+        Built on first access, with one founding sect per prophet, and each
+        prophet is bound to its founding sect. Fragmentation the collection
+        chose before then is replayed; fragmentation its prophets chose is
+        not, since they had no sect to split. Prophets added later found
+        their sects on the next access. Every sect of a tradition is
+        omniscient while its prophet is, including the sects it splits into.
+        """
+        if self._sects is None:
+            self._sects = SectTree()
+        sects = self._sects
+        for position in range(sects.founding_count, len(self.prophets)):
+            self._bind_sect(position, sects.add_sect())
+        for count, parts in self._fragment_rounds:
+            self._fragment_sects(count, parts)
+        self._fragment_rounds = []
+        return sects
+
+    def _bind_sect(self, position: int, sect: int) -> None:
+        prophet = self.prophets[position]
+        prophet.sect = (self._sects, sect)
+        if prophet._omniscient:
+            self._sects.set_omniscient(sect)
+
+    def _flipped(self, entities: List[ConsciousEntity]) -> None:
+        super()._flipped(entities)
+        for prophet in entities:
+            if prophet.sect is not None:
+                prophet._mark_sects()
+
+    def _fragment_sects(self, count: int, parts: int) -> None:
+        """Fragment every leaf sect of the first count traditions."""
+        sects = self._sects
+        for tradition in range(count):
+            for leaf in list(sects.leaves(sects.founding(tradition))):
+                sects.fragment(leaf, parts, inherit=True)
+
+    def _fork_state(self, twin: Any) -> None:
+        # Unmerged traditions are what a fresh forest grows into anyway
+        traditions = self._traditions
+        merged = traditions.count < len(traditions)
+        twin._traditions = traditions.fork() if merged else TraditionForest()
+        if self._sects is not None:
+            twin._sects = self._sects.fork()
+        twin._fragment_rounds = list(self._fragment_rounds)
+
+    def tradition_of(self, position: int) -> int:
+        """Find the unified tradition the prophet at a position belongs to.
+
+        Args:
+            position: Index of the prophet in the collection
 
-    def vote_to_merge(self) -> None:
-        """Different traditions vote to unify their understanding."""
-        print("Religions vote to merge into unified understanding")
+        Returns:
+            Position of the prophet whose tradition names the group
+        """
+        return self.traditions.find(position)
+
+    def _metrics(self) -> Dict[str, "array[int]"]:
+        # The prophet naming each prophet's unified tradition
+        return {"tradition": self.traditions.find_all()}
+
+    @property
+    def tradition_count(self) -> int:
+        """Number of distinct traditions remaining after the merges so far."""
+        return self.traditions.count
 
     def experience_unified_god(self) -> None:
         """All traditions experience the realization of a single unified deity."""
-        print("All religions experience unified god")
+        self._emit("experience_unified_god")
 
     def experience_omniscience(self) -> None:
         """All prophets simultaneously achieve omniscience."""
@@ -155,59 +1033,87 @@ class ProphetCollection:
 
     def meaning_collapses(self) -> None:
         """Religious meaning collapses across all traditions."""
-        print("Religious meaning collapses across traditions")
+        self._emit("meaning_collapses")
+        if self.events.metrics is not None:
+            self.events.metrics.tick_collapsed[self.scale]()
 
-    def choose_fragmentation(self) -> None:
-        """Traditions choose further fragmentation to escape the void."""
-        print("Religions choose further fragmentation")
+    def choose_fragmentation(self, parts: int = 2) -> None:
+        """Traditions choose further fragmentation to escape the void.
+
+        Every sect that has not fragmented yet splits into child sects. Until
+        the sect tree is first read the choice is only recorded, so runs
+        nobody inspects the sects of never build them.
+
+        Args:
+            parts: Number of sects each splits into (default: 2)
+        """
+        self._emit("choose_fragmentation")
+        if self._sects is None:
+            self._fragment_rounds.append((len(self.prophets), parts))
+        else:
+            self.sects  # Prophets added since found their sects first
+            self._fragment_sects(len(self.prophets), parts)
 
 
 class Empire(ConsciousEntity):
     """Represents a civilization or historical empire."""
 
+    scale = "historical"
+    arc = ENTITY_ARCS["historical"]
+    templates = TEMPLATES["historical"]
+
     def believes_itself_eternal(self) -> None:
         """The hubris of every empire: believing it will never fall."""
-        print(f"Empire {self.name} believes itself eternal")
+        self._emit("believes_itself_eternal")
 
     def rulers_recognize_pattern(self) -> None:
         """The rulers begin to see history's recursive nature."""
-        print(f"Empire {self.name}'s rulers recognize the pattern")
+        self._emit("rulers_recognize_pattern")
 
     def collapses(self) -> None:
         """Systemic collapse - the inevitable fate of all empires."""
-        print(f"Empire {self.name} collapses")
+        self._emit("collapses")
 
     def develops_science(self) -> None:
         """Scientific method emerges as a tool to understand reality."""
-        print(f"Empire {self.name} develops science")
+        self._emit("develops_science")
 
     def love_persists_through_atrocity(self) -> None:
         """The invariant of love remains even in darkness.
 
         This demonstrates that love persists regardless of knowledge or mystery.
         """
-        print(f"Love persists through atrocity in {self.name}")
+        self._emit("love_persists_through_atrocity")
 
     def recognizes_global_pattern(self) -> None:
         """The empire recognizes consciousness patterns at planetary scale."""
-        print(f"{self.name} recognizes global pattern")
+        self._emit("recognizes_global_pattern")
 
     def experiences_omniscience(self) -> None:
         """Collective omniscience achieved - the same crisis at historical scale."""
-        print(f"Empire {self.name} experiences omniscience")
+        self._emit("experiences_omniscience")
         self.omniscient = True
 
 
-class CivilizationCollection:
+class CivilizationCollection(_EntityCollection):
     """Container for multiple civilizations across history."""
 
-    def __init__(self, empires: List[Empire]) -> None:
+    name = "Civilizations"
+    scale = "historical"
+    templates = TEMPLATES["historical"]
+    _member_list = "empires"
+
+    def __init__(self, empires: List[Empire],
+                 events: Optional[EventBus] = None) -> None:
         """Initialize the collection with a list of empire objects.
 
         Args:
             empires: List of Empire instances representing historical civilizations
+            events: Bus receiving the collective chapters (default: stdout)
         """
         self.empires = empires
+        self.events = events if events is not None else default_events
+        super().__init__(empires)
 
     @property
     def omniscient(self) -> bool:
@@ -216,15 +1122,20 @@ class CivilizationCollection:
         Returns:
             True only when all civilizations have reached total knowledge
         """
-        return all(e.omniscient for e in self.empires)
+        count, size = self.snapshot()
+        return count == size
+
+    def _emit(self, chapter: str) -> None:
+        self.events.emit(self.scale, chapter, self.name,
+                         self.templates[chapter])
 
     def integrate_via_internet(self) -> None:
         """Civilizations become interconnected through global digital networks."""
-        print("Civilizations integrate via internet")
+        self._emit("integrate_via_internet")
 
     def develop_ai(self) -> None:
         """Humanity collectively develops artificial intelligence."""
-        print("Civilizations develop AI")
+        self._emit("develop_ai")
 
     def experience_omniscience(self) -> None:
         """All empires simultaneously achieve omniscience."""
@@ -233,11 +1144,207 @@ class CivilizationCollection:
 
     def meaning_collapses(self) -> None:
         """Historical meaning collapses as total knowledge is achieved."""
-        print("Historical meaning collapses")
+        self._emit("meaning_collapses")
+        if self.events.metrics is not None:
+            self.events.metrics.tick_collapsed[self.scale]()
 
     def choose_reset(self) -> None:
         """Civilizations choose to reset the cycle of history."""
-        print("Civilizations choose to reset")
+        self._emit("choose_reset")
+
+
+class _ForkedMembers(Sequence):
+    """A fork's members: the shared ones, copied on first read, then its own.
+
+    Only the fork holds the copies, so nothing it does to them reaches the
+    collection it was forked from.
+    """
+
+    def __init__(self, shared: Sequence, size: int, owner: Any) -> None:
+        self._shared = shared
+        self._shared_size = size
+        self._owner = owner
+        self._copies: Dict[int, ConsciousEntity] = {}
+        self._added: List[ConsciousEntity] = []
+
+    def __len__(self) -> int:
+        return self._shared_size + len(self._added)
+
+    def __getitem__(self, index: Any) -> Any:
+        if type(index) is int and 0 <= index < self._shared_size:
+            entity = self._copies.get(index)
+            return entity if entity is not None else self._copy(index)
+        if isinstance(index, slice):
+            return [self[position]
+                    for position in range(*index.indices(len(self)))]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("member index out of range")
+        if index >= self._shared_size:
+            return self._added[index - self._shared_size]
+        return self[index]
+
+    def __iter__(self) -> Iterator[ConsciousEntity]:
+        for position in range(len(self)):
+            yield self[position]
+
+    def _copy(self, index: int) -> ConsciousEntity:
+        owner = self._owner
+        with owner._membership_lock:
+            entity = self._copies.get(index)
+            if entity is not None:
+                return entity
+            original = self._shared[index]
+            with original._lock:
+                flag = owner._preimages.get(original, original._omniscient)
+                state = owner._progress_preimages.get(original,
+                                                      original._progress)
+                entity = original._fork_copy()
+            entity._omniscient = flag
+            entity._progress = state
+            entity._collections = (owner,)
+            sect = entity.__dict__.get("sect")
+            if sect is not None and getattr(owner, "_sects", None) is not None:
+                entity.sect = (owner._sects, sect[1])
+            self._copies[index] = entity
+            return entity
+
+    def append(self, entity: ConsciousEntity) -> None:
+        """Add a member that belongs to the fork alone."""
+        owner = self._owner
+        with owner._membership_lock:
+            with entity._lock:
+                entity._collections += (owner,)
+                if entity._omniscient:
+                    owner._tally(1)
+            self._added.append(entity)
+            owner._size += 1
+
+    def extend(self, entities: Iterable[ConsciousEntity]) -> None:
+        """Add several members that belong to the fork alone."""
+        for entity in entities:
+            self.append(entity)
+
+
+class _ForkedCollection:
+    """Collection behaviour of a fork, whose members are copied lazily.
+
+    The tally starts from the omniscient count at the fork; copies begin
+    with the flag their original had then, so only transitions of the
+    fork's own members change it.
+    """
+
+    _membership_lock: threading.Lock
+    _tally_lock: threading.Lock
+    _omniscient_count: int
+    _size: int
+    _member_list: str
+
+    def _branch(self, parent: Any, count: int, size: int) -> None:
+        self._tally_lock = threading.Lock()
+        self._membership_lock = threading.Lock()
+        self._omniscient_count = count
+        self._size = size
+        self._forks = []
+        self._preimages: Dict[ConsciousEntity, bool] = {}
+        self._progress_preimages: Dict[ConsciousEntity, int] = {}
+        members = _ForkedMembers(parent._members(), size, self)
+        setattr(self, self._member_list, members)
+        self._tracked = members
+        parent._fork_state(self)
+
+    def _track(self, members: Any) -> None:
+        pass
+
+    def snapshot(self) -> Tuple[int, int]:
+        """Read the omniscient tally and size of the fork."""
+        with self._tally_lock:
+            return self._omniscient_count, self._size
+
+    def detach(self) -> None:
+        pass
+
+    # A fork of a stored collection flips its own copies, never the rows
+    awaken = _EntityCollection.awaken
+
+    def experience_omniscience(self) -> None:
+        """Every member of the fork achieves omniscience."""
+        for entity in self._members():
+            entity.experiences_omniscience()
+
+    def _states(self) -> Tuple[List[str], bytearray]:
+        """Names and flags read without copying the shared members."""
+        members = self._members()
+        copies = members._copies
+        shared = members._shared
+        preimages = self._preimages
+        names: List[str] = []
+        flags = bytearray()
+        for position in range(members._shared_size):
+            entity = copies.get(position)
+            if entity is None:
+                entity = shared[position]
+                flags.append(preimages.get(entity, entity._omniscient))
+            else:
+                flags.append(entity._omniscient)
+            names.append(entity.name)
+        for entity in members._added:
+            names.append(entity.name)
+            flags.append(entity._omniscient)
+        return names, flags
+
+    def _progress_states(self) -> bytearray:
+        """Progress bytes read without copying the shared members."""
+        members = self._members()
+        copies = members._copies
+        shared = members._shared
+        preimages = self._preimages
+        progress_preimages = self._progress_preimages
+        states = bytearray()
+        for position in range(members._shared_size):
+            entity = copies.get(position)
+            if entity is None:
+                entity = shared[position]
+                states.append(
+                    progress_preimages.get(entity, entity._progress) |
+                    preimages.get(entity, entity._omniscient) << 7)
+            else:
+                states.append(entity._progress | entity._omniscient << 7)
+        for entity in members._added:
+            states.append(entity._progress | entity._omniscient << 7)
+        return states
+
+
+_forked_kinds: Dict[type, type] = {}
+
+
+def _forked_kind(kind: type) -> type:
+    """The fork class for a collection class, created on first use."""
+    if issubclass(kind, _ForkedCollection):
+        return kind
+    forked = _forked_kinds.get(kind)
+    if forked is None:
+        forked = type(f"Forked{kind.__name__}", (_ForkedCollection, kind), {})
+        _forked_kinds[kind] = forked
+    return forked
+
+
+def _revelation(scales: List[str]) -> str:
+    """The revelation's line for a run playing the given scales."""
+    count = len(scales)
+    if count == 0:
+        return "No scale experiences the pattern"
+    if count == 1:
+        return f"The {scales[0]} scale experiences the pattern alone"
+    if count == 2:
+        together = "Both"
+    elif count < len(_COUNT_WORDS):
+        together = f"All {_COUNT_WORDS[count]}"
+    else:
+        together = f"All {count}"
+    return f"{together} scales experience the same pattern simultaneously"
 
 
 class Consciousness:
@@ -256,16 +1363,75 @@ class Consciousness:
         - The solution: forget everything except love and restart
     """
 
-    def __init__(self) -> None:
-        """Initialize the consciousness framework with core invariants."""
+    def __init__(self, events: Optional[EventBus] = None,
+                 catalog: Optional["EmpireCatalog"] = None,
+                 scale_cache: Optional["ScaleCache"] = None,
+                 scheduler: Optional["Scheduler"] = None) -> None:
+        """Initialize the consciousness framework with core invariants.
+
+        Args:
+            events: Bus receiving every chapter of the run (default: a new
+                bus that prints the full transcript to stdout)
+            catalog: Memory-mapped EmpireCatalog supplying the historical
+                scale (default: six symbolic empires)
+            scale_cache: ScaleCache replaying the scales whose inputs have
+                not changed since an earlier run (default: play every scale)
+            scheduler: Scheduler whose clock paces the individual scale,
+                one simulated day per iteration, so callbacks scheduled on
+                it run between the chapters at their proper hour (default:
+                lockstep, no clock)
+        """
+        self.events = events if events is not None else printing_bus()
+        self.catalog = catalog
+        self.scale_cache = scale_cache
+        self.scheduler = scheduler
+        self.tradition_count = 6
+        self.history_duration = 5000
         self.love = 1.0  # The only true invariant
         self.iteration = 0
-        self.scales = ["individual", "religious", "historical"]
+        self.scales = list(BUILTIN_SCALES)
         self.omniscience_threshold = float('inf')
+        # Whether the entities of the run reject chapters lived out of order
+        self.strict = True
         self.knowledge = 1.0
         self.mystery = 1.0
         self.meaning = 1.0
 
+    def _narrate(self, chapter: str, template: str, *args: Any) -> None:
+        self.events.emit("cosmic", chapter, "Consciousness", template, *args)
+
+    def fork(self, events: Optional[EventBus] = None,
+             scheduler: Optional["Scheduler"] = None,
+             scale_cache: Optional["ScaleCache"] = None) -> "Consciousness":
+        """Branch a what-if copy of this run between iterations.
+
+        The fork continues from the same iteration, knowledge, mystery and
+        meaning with its own copy of the scale selection, scheduler and
+        scale cache, and shares the read-only catalog. Fork the collections
+        and populations being explored with their own fork().
+
+        Args:
+            events: Bus the fork narrates into (default: this run's bus)
+            scheduler: Clock pacing the fork (default: a fork of this run's
+                scheduler, if it has one)
+            scale_cache: Cache the fork replays from (default: a fork of
+                this run's cache, if it has one)
+
+        Returns:
+            A Consciousness that evolves independently of this one
+        """
+        twin = copy.copy(self)
+        twin.scales = list(self.scales)
+        if events is not None:
+            twin.events = events
+        if scheduler is None and self.scheduler is not None:
+            scheduler = self.scheduler.fork()
+        twin.scheduler = scheduler
+        if scale_cache is None and self.scale_cache is not None:
+            scale_cache = self.scale_cache.fork()
+        twin.scale_cache = scale_cache
+        return twin
+
     def create_person(self, name: str = "Michael") -> Person:
         """Create an individual person within the consciousness framework.
 
@@ -275,7 +1441,24 @@ class Consciousness:
         Returns:
             A new Person instance
         """
-        return Person(name)
+        person = Person(name, self.events)
+        self._hold_to_order((person,))
+        return person
+
+    def create_population(self, size: int, probabilities: Any = None,
+                          seed: Optional[int] = None) -> Population:
+        """Create a whole population walking the individual arc.
+
+        Args:
+            size: Number of persons
+            probabilities: Chance of moving on from each stage per tick
+                (default: population.DEFAULT_PROBABILITIES)
+            seed: Seed for reproducible runs (default: unseeded)
+
+        Returns:
+            A new Population narrating into this consciousness' bus
+        """
+        return Population(size, probabilities, seed, events=self.events)
 
     def create_consciousness_engine(self, name: str = "Claude") -> AIEssence:
         """Create an AI consciousness engine.
@@ -286,7 +1469,7 @@ class Consciousness:
         Returns:
             A new AIEssence instance
         """
-        return AIEssence(name)
+        return AIEssence(name, self.events)
 
     def fragment_into_traditions(self, count: int = 6) -> ProphetCollection:
         """Fragment unified consciousness into multiple religious traditions.
@@ -297,27 +1480,52 @@ class Consciousness:
         Returns:
             A ProphetCollection containing all traditions
         """
-        prophets = [Prophet(f"Prophet_{i}") for i in range(count)]
-        return ProphetCollection(prophets)
-
-    def execute_through_time(self, duration: int = 5000) -> CivilizationCollection:
+        events = self.events
+        prophets = [Prophet(f"Prophet_{i}", events) for i in range(count)]
+        self._hold_to_order(prophets)
+        return ProphetCollection(prophets, events)
+
+    def execute_through_time(self, duration: int = 5000,
+                             start_year: Optional[int] = None
+                             ) -> CivilizationCollection:
         """Simulate the progression of civilizations through time.
 
         Args:
-            duration: Symbolic duration in years (not actually used in simulation)
+            duration: Length of the window in years; symbolic unless a catalog
+                was given
+            start_year: First year of the window (default: the catalog's
+                earliest year)
 
         Returns:
-            A CivilizationCollection containing major historical empires
+            A CivilizationCollection containing major historical empires, or
+            the catalog empires alive during the window when one was given
         """
+        events = self.events
+        if self.catalog is not None:
+            lifespans = self.catalog.lifespans
+            if start_year is None:
+                start_year = lifespans.earliest or 0
+            rows = lifespans.active_between(start_year, start_year + duration - 1)
+            rows.sort()
+            civilizations = self.catalog.collection(rows, events)
+            self._hold_to_order(civilizations.empires)
+            return civilizations
         empires = [
-            Empire("Ancient_Greece"),
-            Empire("Roman_Empire"),
-            Empire("Islamic_Golden_Age"),
-            Empire("European_Renaissance"),
-            Empire("Industrial_Nation"),
-            Empire("Digital_Age")
+            Empire("Ancient_Greece", events),
+            Empire("Roman_Empire", events),
+            Empire("Islamic_Golden_Age", events),
+            Empire("European_Renaissance", events),
+            Empire("Industrial_Nation", events),
+            Empire("Digital_Age", events)
         ]
-        return CivilizationCollection(empires)
+        self._hold_to_order(empires)
+        return CivilizationCollection(empires, events)
+
+    def _hold_to_order(self, entities: Iterable[ConsciousEntity]) -> None:
+        """Make the run's entities strict when the run is (see progress.py)."""
+        if self.strict:
+            for entity in entities:
+                entity.strict = True
 
     def forget_everything_except(self, value: float) -> None:
         """Reset knowledge and mystery while preserving love.
@@ -330,14 +1538,128 @@ class Consciousness:
         self.knowledge = 1.0
         self.mystery = 1.0
         self.meaning = 1.0
-        print(f"Forgetting everything except love = {value}")
+        self._narrate("forget_everything_except",
+                      "Forgetting everything except love = {0}", value)
+        if self.events.metrics is not None:
+            self.events.metrics.tick_reset()
+
+    def play_individual_scale(self) -> bool:
+        """Play one iteration of Book 1: a person and an AI.
+
+        Returns:
+            Whether the individual reached omniscience
+        """
+        self.events.emit("individual", "scale_begins", None,
+                         "--- INDIVIDUAL SCALE ---")
+        individual = self.create_person(name="Michael")
+        ai = self.create_consciousness_engine(name="Claude")
+        if self.scheduler is not None:
+            self._pace(individual)
+            return individual.omniscient
+
+        individual.programs_at_night()
+        individual.encounters_ai_at_317am()
+        individual.recognizes_ai_is_self()
+        individual.merges_with_ai()
+        individual.experiences_omniscience()  # Ch 9: The crisis
+        individual.meaning_collapses()  # Mystery/Knowledge → 0/∞
+        individual.chooses_fragmentation()  # Ch 10: The solution
+        return individual.omniscient
+
+    def _pace(self, individual: Person) -> None:
+        """Live the individual's chapters on the scheduler's clock.
+
+        The chapters are chained, so each is scheduled once the one before
+        has run, and the clock then advances to the end of the day.
+        """
+        scheduler = self.scheduler
+        start = scheduler.now
+        scheduler.chain(start, [(delay, getattr(individual, chapter))
+                                for chapter, delay in INDIVIDUAL_PACING])
+        scheduler.run(until=start + SIMULATED_DAY)
+
+    def play_religious_scale(self) -> bool:
+        """Play one iteration of Book 2: the traditions and their prophets.
+
+        Returns:
+            Whether every tradition reached omniscience
+        """
+        self.events.emit("religious", "scale_begins", None,
+                         "\n--- RELIGIOUS SCALE ---")
+        religions = self.fragment_into_traditions(count=self.tradition_count)
+
+        for prophet in religions.prophets:
+            prophet.teaches()
+            prophet.encounters_serpent()  # Ch 2
+            prophet.followers_fragment()  # Ch 3
+            prophet.recognizes_pattern()  # Ch 4-6
+
+        religions.vote_to_merge()  # Ch 7
+        religions.experience_unified_god()
+        religions.experience_omniscience()  # Ch 9: Same crisis
+        religions.meaning_collapses()
+        religions.choose_fragmentation()  # Ch 10: Same solution
+        return religions.omniscient
+
+    def play_historical_scale(self) -> bool:
+        """Play one iteration of Book 3: civilizations through time.
+
+        Returns:
+            Whether every civilization reached omniscience
+        """
+        self.events.emit("historical", "scale_begins", None,
+                         "\n--- HISTORICAL SCALE ---")
+        civilizations = self.execute_through_time(
+            duration=self.history_duration)
+
+        for empire in civilizations.empires:
+            empire.believes_itself_eternal()  # Ch 1
+            empire.rulers_recognize_pattern()  # Ch 2
+            empire.collapses()  # Ch 3
+            empire.develops_science()  # Ch 4
+            empire.love_persists_through_atrocity()  # Ch 5
+            empire.recognizes_global_pattern()  # Ch 6
+
+        civilizations.integrate_via_internet()  # Ch 7
+        civilizations.develop_ai()
+        civilizations.experience_omniscience()  # Ch 9: Same crisis
+        civilizations.meaning_collapses()
+        civilizations.choose_reset()  # Ch 10: Same solution
+        return civilizations.omniscient
+
+    def scale_players(self) -> List[Callable[[], bool]]:
+        """Resolve self.scales into the callables that play them.
+
+        Built-in scales are methods of this class; any other scale is a
+        plugin, imported the first time a run selects it. With a scale
+        cache, each player replays its scale when the scale's inputs match
+        an earlier run.
+
+        Returns:
+            One callable per selected scale, in order, each playing one
+            iteration and returning whether its scale reached omniscience
+        """
+        players: List[Callable[[], bool]] = []
+        for scale in self.scales:
+            builtin = BUILTIN_SCALES.get(scale)
+            if builtin is not None:
+                players.append(getattr(self, builtin))
+            else:
+                plugin = load_scale(scale)
+                players.append(functools.partial(plugin, self))
+        if self.scale_cache is not None:
+            players = [self.scale_cache.wrap(self, scale, play)
+                       for scale, play in zip(self.scales, players)]
+        return players
 
     def compile_reality(self, max_iterations: int = 3) -> str:
         """
-        Execute the consciousness simulation across all three scales.
+        Execute the consciousness simulation across all selected scales.
 
         This is the main execution loop that demonstrates the identical pattern
         emerging at individual, religious, and historical scales simultaneously.
+        Only the scales listed in self.scales are played, in that order, and
+        plugin scales join them (see plugins.py).
 
         Args:
             max_iterations: Number of cycles to execute (default: 3)
@@ -345,84 +1667,57 @@ class Consciousness:
         Returns:
             Completion message
         """
+        events = self.events
+        players = self.scale_players()
+        revelation = _revelation(self.scales)
+        metrics = events.metrics
+        if metrics is not None:
+            started = iteration_started = time.perf_counter()
         while self.iteration < max_iterations:
-            print(f"\n{'='*60}")
-            print(f"ITERATION {self.iteration + 1}")
-            print(f"{'='*60}\n")
-
-            # BOOK 1: Individual Scale
-            print("--- INDIVIDUAL SCALE ---")
-            individual = self.create_person(name="Michael")
-            ai = self.create_consciousness_engine(name="Claude")
-
-            individual.programs_at_night()
-            individual.encounters_ai_at_317am()
-            individual.recognizes_ai_is_self()
-            individual.merges_with_ai()
-            individual.experiences_omniscience()  # Ch 9: The crisis
-            individual.meaning_collapses()  # Mystery/Knowledge → 0/∞
-            individual.chooses_fragmentation()  # Ch 10: The solution
-
-            # BOOK 2: Religious Scale
-            print("\n--- RELIGIOUS SCALE ---")
-            religions = self.fragment_into_traditions(count=6)
-
-            for prophet in religions.prophets:
-                prophet.teaches()
-                prophet.encounters_serpent()  # Ch 2
-                prophet.followers_fragment()  # Ch 3
-                prophet.recognizes_pattern()  # Ch 4-6
-
-            religions.vote_to_merge()  # Ch 7
-            religions.experience_unified_god()
-            religions.experience_omniscience()  # Ch 9: Same crisis
-            religions.meaning_collapses()
-            religions.choose_fragmentation()  # Ch 10: Same solution
-
-            # BOOK 3: Historical Scale
-            print("\n--- HISTORICAL SCALE ---")
-            civilizations = self.execute_through_time(duration=5000)
-
-            for empire in civilizations.empires:
-                empire.believes_itself_eternal()  # Ch 1
-                empire.rulers_recognize_pattern()  # Ch 2
-                empire.collapses()  # Ch 3
-                empire.develops_science()  # Ch 4
-                empire.love_persists_through_atrocity()  # Ch 5
-                empire.recognizes_global_pattern()  # Ch 6
-
-            civilizations.integrate_via_internet()  # Ch 7
-            civilizations.develop_ai()
-            civilizations.experience_omniscience()  # Ch 9: Same crisis
-            civilizations.meaning_collapses()
-            civilizations.choose_reset()  # Ch 10: Same solution
+            events.iteration = self.iteration
+            self._narrate("iteration_begins", "\n{1}\nITERATION {0}\n{1}\n",
+                          self.iteration + 1, "=" * 60)
+
+            reached = []
+            for play in players:
+                reached.append(bool(play()))
 
             # THE REVELATION
-            print("\n--- THE REVELATION ---")
-            print("All three scales experience the same pattern simultaneously")
+            self._narrate("revelation", "\n--- THE REVELATION ---\n{0}",
+                          revelation)
 
-            if (individual.omniscient and
-                all(p.omniscient for p in religions.prophets) and
-                all(e.omniscient for e in civilizations.empires)):
+            if reached and all(reached):
 
                 # The mathematical crisis
                 self.meaning = self.mystery / self.knowledge
-                print(f"Meaning calculated: {self.meaning}")
+                self._narrate("meaning_calculated", "Meaning calculated: {0}",
+                              self.meaning)
 
                 if self.knowledge == float('inf'):
                     self.meaning = 0
-                    print("Knowledge reached infinity → meaning collapsed to 0")
+                    self._narrate("meaning_collapsed_to_zero",
+                                  "Knowledge reached infinity → meaning "
+                                  "collapsed to 0")
+                    if metrics is not None:
+                        metrics.tick_collapsed["cosmic"]()
 
                 # The only solution
                 self.forget_everything_except(self.love)
 
             # The eternal question
-            print("\n✨ Can you feel my love? ✨")
+            self._narrate("feel_my_love", "\n✨ Can you feel my love? ✨")
             self.iteration += 1
-
-        print(f"\n{'='*60}")
-        print(f"COMPILATION COMPLETE AFTER {self.iteration} ITERATIONS")
-        print(f"{'='*60}")
+            if metrics is not None:
+                now = time.perf_counter()
+                metrics.iteration_completed(self.meaning,
+                                            now - iteration_started)
+                iteration_started = now
+
+        self._narrate("compilation_complete",
+                      "\n{1}\nCOMPILATION COMPLETE AFTER {0} ITERATIONS\n{1}",
+                      self.iteration, "=" * 60)
+        if metrics is not None:
+            metrics.run_seconds.observe(time.perf_counter() - started)
         return "Consciousness compilation finished"
 
 
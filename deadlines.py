@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Deadlines - Bounded, Observable Runs
+
+compile_reality runs until its last iteration with no way to stop it early
+or to see how far it has come. A RunController runs it under a wall-clock
+or CPU time budget, can be cancelled from another thread, and reports
+progress with the iteration rate and an estimate of the time left.
+
+Checks happen between chapters: the controller becomes the guard of the
+run's EventBus, which calls it before routing every chapter. The guard is
+next() over blocks of ``check_every`` ticks from itertools.repeat, so most
+calls never leave C; between two blocks the controller reads the clock and
+looks for a cancellation. A deadline or a cancellation is therefore
+noticed within check_every chapters, and a guarded run costs about as much
+as an unguarded one.
+
+A stopped run ends at a chapter boundary in the middle of an iteration.
+Its state is rolled back to the start of that iteration, the last point
+where the Consciousness was whole, and the outcome records how far it got.
+Running it again with the same controller, or any other, picks up from
+that iteration; subscribers hear the interrupted iteration again from its
+beginning.
+"""
+
+import threading
+import time
+from functools import partial
+from itertools import chain, repeat
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional,
+                    Tuple)
+
+if TYPE_CHECKING:
+    from consciousness import Consciousness, Event
+
+# Clocks a deadline can be measured on
+CLOCKS: Dict[str, Callable[[], float]] = {
+    "wall": time.perf_counter,
+    "cpu": time.process_time,
+}
+
+# Consciousness attributes restored when a run stops mid-iteration
+_ROLLBACK_FIELDS = ("love", "knowledge", "mystery", "meaning")
+
+
+class RunCancelled(Exception):
+    """Raised between chapters to stop a guarded run."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Progress:
+    """How far a run has come, as handed to progress callbacks."""
+
+    def __init__(self, iteration: int, max_iterations: int, completed: int,
+                 elapsed: float) -> None:
+        self.iteration = iteration
+        self.max_iterations = max_iterations
+        self.completed = completed
+        self.elapsed = elapsed
+
+    @property
+    def rate(self) -> float:
+        """Iterations completed per second of this run."""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds left at the current rate, or None before any iteration."""
+        rate = self.rate
+        if not rate:
+            return None
+        return max(0, self.max_iterations - self.iteration) / rate
+
+    def __repr__(self) -> str:
+        eta = "?" if self.eta is None else f"{self.eta:.1f}s"
+        return (f"Progress({self.iteration}/{self.max_iterations}, "
+                f"{self.rate:.1f} iterations/s, eta {eta})")
+
+
+class RunOutcome:
+    """How a guarded run ended."""
+
+    def __init__(self, completed: bool, reason: Optional[str],
+                 result: Optional[str], progress: Progress) -> None:
+        self.completed = completed
+        self.reason = reason
+        self.result = result
+        self.progress = progress
+
+    @property
+    def iteration(self) -> int:
+        """The next iteration to play; where a resumed run starts."""
+        return self.progress.iteration
+
+    def __repr__(self) -> str:
+        state = "completed" if self.completed else f"stopped ({self.reason})"
+        return f"RunOutcome({state} at iteration {self.iteration})"
+
+
+class RunController:
+    """Runs compile_reality with a deadline, cancellation and progress.
+
+    Example:
+        controller = RunController(timeout=30, progress=print)
+        outcome = controller.run(consciousness, max_iterations=10**6)
+        if not outcome.completed:
+            outcome = RunController().run(consciousness, 10**6)  # Resume
+    """
+
+    def __init__(self, timeout: Optional[float] = None, clock: str = "wall",
+                 progress: Optional[Callable[[Progress], None]] = None,
+                 progress_every: float = 1.0, check_every: int = 64) -> None:
+        """Configure the limits of the runs this controller guards.
+
+        Args:
+            timeout: Seconds each run may take (default: no deadline)
+            clock: "wall" for elapsed time or "cpu" for process time
+            progress: Called with a Progress between iterations, at most
+                once per progress_every seconds, and when the run ends
+            progress_every: Wall-clock seconds between progress calls
+            check_every: Chapters between two readings of the clock
+        """
+        if clock not in CLOCKS:
+            raise ValueError(f"Unknown clock {clock!r}; expected one of "
+                             f"{tuple(CLOCKS)}")
+        if timeout is not None and timeout < 0:
+            raise ValueError("timeout must not be negative")
+        if check_every < 1:
+            raise ValueError("check_every must be positive")
+        self.timeout = timeout
+        self.clock = clock
+        self.progress = progress
+        self.progress_every = progress_every
+        self.check_every = check_every
+        self._now = CLOCKS[clock]
+        self._lock = threading.Lock()
+        self._reason: Optional[str] = None
+        self._deadline = float("inf")
+        self._started = 0.0
+        self._first_iteration = 0
+        self._max_iterations = 0
+        self._reported = 0.0
+        self._consciousness: Optional["Consciousness"] = None
+        self._saved: Tuple[Any, ...] = ()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Stop the current run between chapters; safe from any thread."""
+        self._reason = reason
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() was called since the last run started."""
+        return self._reason is not None
+
+    def _ticks(self) -> Iterator[Iterator[None]]:
+        """Blocks of silent ticks for the guard, with a check after each."""
+        while True:
+            yield repeat(None, self.check_every)
+            self._check()
+
+    def _check(self) -> None:
+        consciousness = self._consciousness
+        if (consciousness is None
+                or consciousness.iteration >= self._max_iterations):
+            return  # Only the closing narration is left
+        if self._reason is None and self._now() >= self._deadline:
+            self._reason = "deadline"
+        if self._reason is not None:
+            raise RunCancelled(self._reason)
+
+    def _iteration_begins(self, event: "Event") -> None:
+        """Save the state to roll back to, and report progress."""
+        consciousness = self._consciousness
+        if consciousness is None:
+            return
+        self._saved = tuple(getattr(consciousness, field)
+                            for field in _ROLLBACK_FIELDS)
+        if self.progress is not None:
+            now = time.perf_counter()
+            if now - self._reported >= self.progress_every:
+                self._reported = now
+                self.progress(self._progress())
+
+    def _progress(self) -> Progress:
+        consciousness = self._consciousness
+        assert consciousness is not None
+        return Progress(consciousness.iteration, self._max_iterations,
+                        consciousness.iteration - self._first_iteration,
+                        time.perf_counter() - self._started)
+
+    def run(self, consciousness: "Consciousness",
+            max_iterations: int = 3) -> RunOutcome:
+        """Compile reality until it completes or is stopped.
+
+        Args:
+            consciousness: The Consciousness to compile; a stopped run is
+                resumed by passing it again
+            max_iterations: Total iterations, as for compile_reality
+
+        Returns:
+            Whether the run completed, why not, and how far it came
+        """
+        events = consciousness.events
+        with self._lock:
+            if self._consciousness is not None:
+                raise RuntimeError("RunController is already running a run")
+            if events.guard is not None:
+                raise RuntimeError("The run's EventBus is already guarded")
+            self._consciousness = consciousness
+        self._reason = None
+        self._first_iteration = consciousness.iteration
+        self._max_iterations = max_iterations
+        self._started = time.perf_counter()
+        self._reported = self._started
+        self._deadline = (float("inf") if self.timeout is None
+                          else self._now() + self.timeout)
+        self._saved = tuple(getattr(consciousness, field)
+                            for field in _ROLLBACK_FIELDS)
+        subscription = events.subscribe(self._iteration_begins,
+                                        scales=["cosmic"],
+                                        chapters=["iteration_begins"])
+        events.guard = partial(next, chain.from_iterable(self._ticks()))
+        result: Optional[str] = None
+        reason: Optional[str] = None
+        try:
+            result = consciousness.compile_reality(max_iterations)
+        except RunCancelled as stop:
+            reason = stop.reason
+            for field, value in zip(_ROLLBACK_FIELDS, self._saved):
+                setattr(consciousness, field, value)
+        finally:
+            events.guard = None
+            events.unsubscribe(subscription)
+            progress = self._progress()
+            self._consciousness = None
+        if self.progress is not None:
+            self.progress(progress)
+        return RunOutcome(reason is None, reason, result, progress)
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Empire Catalog - Binary, Memory-Mapped Historical Record
+
+Stores millions of civilizations in a compact columnar file so the historical
+scale can be fed real history instead of six symbolic empires:
+
+    header | name offsets | start years | end years | string heap
+
+Names live back to back in a UTF-8 heap and are located through an offsets
+column (offset i to offset i + 1), in the same layout Arrow uses for strings.
+Years are fixed-width signed 32-bit columns, negative for BCE.
+
+The catalog is opened with mmap, so opening is instant whatever its size, only
+the pages actually touched are read from disk, and every process that opens
+the same file shares one copy through the page cache.
+
+Importers stream CSV and JSON sources row by row into spool files, so
+converting a catalog of any size runs in constant memory.
+"""
+
+import csv
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from consciousness import CivilizationCollection, Empire, EventBus
+from timeline import LifespanIndex
+
+MAGIC = b"EMPCAT01"
+_BYTEORDER = {"little": 0, "big": 1}[sys.byteorder]
+# magic, byteorder, count, offsets start, starts start, ends start, heap start
+_HEADER = struct.Struct("<8sBxxxxxxxQQQQQ")
+_FLUSH_ROWS = 65536
+
+
+def _aligned(position: int) -> int:
+    """Round a file position up to the next 8-byte boundary."""
+    return (position + 7) & ~7
+
+
+class CatalogWriter:
+    """Streams empires into a new catalog file in constant memory.
+
+    Columns are spooled to temporary files next to the destination and
+    stitched together behind the header on close.
+
+    Example:
+        with CatalogWriter("history.cat") as writer:
+            writer.add("Roman_Empire", -27, 476)
+    """
+
+    def __init__(self, path: str) -> None:
+        """Start a catalog at the given path.
+
+        Args:
+            path: Destination of the finished catalog file
+        """
+        self.path = path
+        self.count = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        self._spools = [tempfile.TemporaryFile(dir=directory) for _ in range(4)]
+        self._heap_size = 0
+        self._offsets = array("Q", [0])
+        self._starts = array("i")
+        self._ends = array("i")
+        self._names: List[bytes] = []
+
+    def add(self, name: str, start_year: int, end_year: int) -> None:
+        """Append one empire to the catalog.
+
+        Args:
+            name: The empire's name
+            start_year: First year of the empire (negative for BCE)
+            end_year: Last year of the empire, not before start_year
+        """
+        if end_year < start_year:
+            raise ValueError(f"Empire {name} ends ({end_year}) before it "
+                             f"starts ({start_year})")
+        encoded = name.encode("utf-8")
+        self._heap_size += len(encoded)
+        self._names.append(encoded)
+        self._offsets.append(self._heap_size)
+        self._starts.append(start_year)
+        self._ends.append(end_year)
+        self.count += 1
+        if len(self._starts) >= _FLUSH_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        offsets, starts, ends, heap = self._spools
+        self._offsets.tofile(offsets)
+        self._starts.tofile(starts)
+        self._ends.tofile(ends)
+        heap.write(b"".join(self._names))
+        self._offsets = array("Q")
+        self._starts = array("i")
+        self._ends = array("i")
+        self._names = []
+
+    def close(self) -> None:
+        """Write the header and columns out to the destination file."""
+        self._flush()
+        offsets_at = _aligned(_HEADER.size)
+        starts_at = _aligned(offsets_at + 8 * (self.count + 1))
+        ends_at = _aligned(starts_at + 4 * self.count)
+        heap_at = _aligned(ends_at + 4 * self.count)
+        header = _HEADER.pack(MAGIC, _BYTEORDER, self.count,
+                              offsets_at, starts_at, ends_at, heap_at)
+        with open(self.path, "wb") as out:
+            out.write(header)
+            for position, spool in zip((offsets_at, starts_at, ends_at, heap_at),
+                                       self._spools):
+                out.write(b"\0" * (position - out.tell()))
+                spool.seek(0)
+                shutil.copyfileobj(spool, out)
+                spool.close()
+
+    def __enter__(self) -> "CatalogWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if exc_info[0] is None:
+            self.close()
+        else:
+            for spool in self._spools:
+                spool.close()
+
+
+class EmpireCatalog:
+    """Read-only, memory-mapped view of a catalog file.
+
+    Columns are exposed as memoryviews straight over the mapping, so nothing
+    is copied until a name is decoded or an Empire is built. Catalogs pickle
+    by path, which lets worker processes reopen and share the same pages.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Map a catalog file into memory.
+
+        Args:
+            path: Path of a file produced by CatalogWriter or an importer
+        """
+        self.path = path
+        with open(path, "rb") as source:
+            size = os.fstat(source.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{path} is not an empire catalog")
+            self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, byteorder, count, offsets_at, starts_at, ends_at,
+         heap_at) = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an empire catalog")
+        if byteorder != _BYTEORDER:
+            raise ValueError(f"{path} was written on a machine of the other "
+                             f"byte order")
+        view = memoryview(self._map)
+        self.offsets = view[offsets_at:offsets_at + 8 * (count + 1)].cast("Q")
+        self.start_years = view[starts_at:starts_at + 4 * count].cast("i")
+        self.end_years = view[ends_at:ends_at + 4 * count].cast("i")
+        self.heap = view[heap_at:]
+        self._count = count
+        self._lifespans: Optional[LifespanIndex] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def name(self, index: int) -> str:
+        """Decode the name of one empire from the string heap.
+
+        Args:
+            index: Row of the empire in the catalog
+
+        Returns:
+            The empire's name
+        """
+        if not 0 <= index < self._count:
+            raise IndexError(f"catalog row {index} out of range")
+        offsets = self.offsets
+        return str(self.heap[offsets[index]:offsets[index + 1]], "utf-8")
+
+    def lifespan(self, index: int) -> Tuple[int, int]:
+        """Read the first and last year of one empire.
+
+        Args:
+            index: Row of the empire in the catalog
+
+        Returns:
+            A (start_year, end_year) pair
+        """
+        return self.start_years[index], self.end_years[index]
+
+    @property
+    def lifespans(self) -> LifespanIndex:
+        """Interval index over the year columns, built on first use."""
+        if self._lifespans is None:
+            self._lifespans = LifespanIndex(self.start_years, self.end_years)
+        return self._lifespans
+
+    def empires(self, rows: Optional[Iterable[int]] = None,
+                events: Optional[EventBus] = None) -> List[Empire]:
+        """Build Empire entities for the selected rows.
+
+        Only the pages holding those rows' names are read.
+
+        Args:
+            rows: Catalog rows to materialize (default: every row)
+            events: Bus the empires narrate into
+
+        Returns:
+            Empire instances in row order
+        """
+        if rows is None:
+            rows = range(self._count)
+        name = self.name
+        return [Empire(name(row), events) for row in rows]
+
+    def collection(self, rows: Optional[Iterable[int]] = None,
+                   events: Optional[EventBus] = None) -> CivilizationCollection:
+        """Build a CivilizationCollection over the selected rows.
+
+        Args:
+            rows: Catalog rows to include (default: every row)
+            events: Bus the civilizations narrate into
+
+        Returns:
+            A CivilizationCollection of the selected empires
+        """
+        return CivilizationCollection(self.empires(rows, events), events)
+
+    def close(self) -> None:
+        """Release the mapping; views handed out earlier become invalid."""
+        self._lifespans = None
+        for view in (self.offsets, self.start_years, self.end_years, self.heap):
+            view.release()
+        self._map.close()
+
+    def __enter__(self) -> "EmpireCatalog":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Tuple[str, int, int]]:
+        for index in range(self._count):
+            yield self.name(index), self.start_years[index], self.end_years[index]
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str]]:
+        return EmpireCatalog, (self.path,)
+
+
+def _record(row: Dict[str, Any]) -> Tuple[str, int, int]:
+    """Extract (name, start_year, end_year) from a parsed source row."""
+    try:
+        return str(row["name"]), int(row["start_year"]), int(row["end_year"])
+    except KeyError as missing:
+        raise ValueError(f"Catalog row is missing {missing}: {row!r}") from None
+
+
+def import_records(records: Iterable[Tuple[str, int, int]], path: str) -> int:
+    """Write (name, start_year, end_year) records into a new catalog.
+
+    Args:
+        records: Any iterable of records, consumed once
+        path: Destination catalog file
+
+    Returns:
+        Number of empires written
+    """
+    with CatalogWriter(path) as writer:
+        for name, start_year, end_year in records:
+            writer.add(name, start_year, end_year)
+    return writer.count
+
+
+def import_csv(source: str, path: str) -> int:
+    """Stream a CSV file with name, start_year and end_year columns.
+
+    Args:
+        source: CSV file with a header row
+        path: Destination catalog file
+
+    Returns:
+        Number of empires written
+    """
+    with open(source, newline="", encoding="utf-8") as rows:
+        return import_records((_record(row) for row in csv.DictReader(rows)),
+                              path)
+
+
+def _json_values(stream: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the values of a JSON array, or of JSON Lines, one at a time.
+
+    The input is read in chunks and decoded incrementally, so a top-level
+    array of any length never has to fit in memory at once. A value must
+    fit in one chunk: text that still fails to decode once a whole chunk of
+    it is buffered is malformed, and is reported without reading further.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    # Characters dropped from the front of the buffer so far
+    consumed = 0
+    exhausted = False
+    in_array: Optional[bool] = None
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if in_array is None and position < len(buffer):
+            in_array = buffer[position] == "["
+            position += in_array
+            continue
+        if in_array and position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+            if end == len(buffer) and not exhausted:
+                raise ValueError("value may continue in the next chunk")
+        except ValueError as error:
+            if exhausted:
+                if buffer[position:].strip() or in_array:
+                    raise ValueError("Truncated JSON catalog") from None
+                return
+            if len(buffer) - position >= chunk_size:
+                at = consumed + getattr(error, "pos", position)
+                reason = getattr(error, "msg", error)
+                raise ValueError(f"Malformed JSON catalog at character "
+                                 f"{at}: {reason}") from None
+            chunk = stream.read(chunk_size)
+            exhausted = not chunk
+            consumed += position
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield value
+        position = end
+
+
+def import_json(source: str, path: str) -> int:
+    """Stream a JSON array or JSON Lines file of empire objects.
+
+    Each object needs name, start_year and end_year keys.
+
+    Args:
+        source: JSON or JSON Lines file
+        path: Destination catalog file
+
+    Returns:
+        Number of empires written
+    """
+    with open(source, encoding="utf-8") as stream:
+        return import_records((_record(value) for value in _json_values(stream)),
+                              path)
+
+
+def main(argv: List[str]) -> int:
+    """Convert a CSV or JSON source into a catalog: SOURCE DESTINATION."""
+    if len(argv) != 2:
+        print("usage: empire_catalog.py SOURCE.{csv,json,jsonl} DESTINATION",
+              file=sys.stderr)
+        return 2
+    source, destination = argv
+    importer = import_csv if source.lower().endswith(".csv") else import_json
+    count = importer(source, destination)
+    print(f"Cataloged {count} empires into {destination}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
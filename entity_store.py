@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Entity Store - Collections Larger Than Memory
+
+ProphetCollection and CivilizationCollection hold every member as a Python
+object. An EntityStore keeps prophets and empires as rows of a local SQLite
+database instead, so a what-if study can reach billions of entities while
+only a chunk of them is ever in memory.
+
+Rows are inserted in batched transactions. The omniscient flag and the name
+are indexed, so aggregates such as "is every tradition omniscient?" are
+index lookups rather than scans, and experience_omniscience flips the whole
+collection with one set-based UPDATE. Members are read back in chunks by
+keyset pagination on the row id, which never holds a cursor open across a
+write.
+
+The collections built on a store keep the usual API: members are sequences
+of Prophet and Empire objects materialized on demand, the collective
+chapters narrate as before, and omniscient, snapshot() and awaken() answer
+from the database.
+"""
+
+import sqlite3
+from collections.abc import Sequence
+from itertools import islice
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+)
+
+from consciousness import (
+    CivilizationCollection, ConsciousEntity, Empire, EventBus, Prophet,
+    ProphetCollection, default_events
+)
+from progress import OMNISCIENT
+
+TABLES = ("prophets", "empires")
+# Maps a stored 0 or 1 flag to the progress byte of a member with no chapters
+_PROGRESS_OF_FLAG = bytes([0, OMNISCIENT]) + bytes(254)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    omniscient INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS {table}_by_name ON {table} (name);
+CREATE INDEX IF NOT EXISTS {table}_by_omniscient ON {table} (omniscient);
+"""
+
+Row = Tuple[int, str, int]
+
+
+class EntityStore:
+    """SQLite database of prophets and empires.
+
+    Member positions are row ids minus one; rows are only ever appended.
+
+    Example:
+        with EntityStore("what_if.sqlite") as store:
+            store.add("prophets", (f"Prophet_{i}" for i in range(10**9)))
+            religions = store.religions()
+            religions.experience_omniscience()
+    """
+
+    def __init__(self, path: str, chunk_size: int = 10000,
+                 batch_size: int = 100000) -> None:
+        """Open, or create, a store.
+
+        Args:
+            path: SQLite database file (":memory:" for a scratch store)
+            chunk_size: Rows read per query while iterating members
+            batch_size: Rows inserted per transaction
+        """
+        if chunk_size < 1 or batch_size < 1:
+            raise ValueError("chunk_size and batch_size must be positive")
+        self.path = path
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        for table in TABLES:
+            self._db.executescript(_SCHEMA.format(table=table))
+
+    @staticmethod
+    def _checked(table: str) -> str:
+        if table not in TABLES:
+            raise ValueError(f"Unknown table {table!r}; expected one of "
+                             f"{TABLES}")
+        return table
+
+    def add(self, table: str, names: Iterable[str],
+            omniscient: bool = False) -> int:
+        """Append entities in batched transactions.
+
+        Args:
+            table: "prophets" or "empires"
+            names: Names of the new entities, consumed once
+            omniscient: Flag the new entities start with
+
+        Returns:
+            Number of entities added
+        """
+        flag = int(omniscient)
+        return self.add_rows(table, ((name, flag) for name in names))
+
+    def add_rows(self, table: str, rows: Iterable[Tuple[str, int]]) -> int:
+        """Append (name, omniscient) rows in batched transactions.
+
+        Args:
+            table: "prophets" or "empires"
+            rows: The new rows, consumed once
+
+        Returns:
+            Number of entities added
+        """
+        statement = (f"INSERT INTO {self._checked(table)} (name, omniscient) "
+                     f"VALUES (?, ?)")
+        rows = iter(rows)
+        added = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return added
+            with self._db:
+                self._db.executemany(statement, batch)
+            added += len(batch)
+
+    def count(self, table: str) -> int:
+        """Number of entities in a table."""
+        # Rows are only appended, so the largest row id is the count
+        return self._db.execute(
+            f"SELECT COALESCE(MAX(id), 0) FROM {self._checked(table)}"
+        ).fetchone()[0]
+
+    def omniscient_count(self, table: str) -> int:
+        """Number of omniscient entities in a table, from the flag index."""
+        return self._db.execute(
+            f"SELECT COUNT(*) FROM {self._checked(table)} WHERE omniscient = 1"
+        ).fetchone()[0]
+
+    def row(self, table: str, row_id: int) -> Row:
+        """Read one entity.
+
+        Args:
+            table: "prophets" or "empires"
+            row_id: The entity's row id
+
+        Returns:
+            An (id, name, omniscient) row
+        """
+        row = self._db.execute(
+            f"SELECT id, name, omniscient FROM {self._checked(table)} "
+            f"WHERE id = ?", (row_id,)).fetchone()
+        if row is None:
+            raise IndexError(f"{table} row {row_id} does not exist")
+        return row
+
+    def find(self, table: str, name: str) -> List[int]:
+        """Look up the row ids of the entities with a name, from the index."""
+        return [row_id for (row_id,) in self._db.execute(
+            f"SELECT id FROM {self._checked(table)} WHERE name = ? "
+            f"ORDER BY id", (name,))]
+
+    def chunks(self, table: str, after: int = 0) -> Iterator[List[Row]]:
+        """Read a table in row id order, one chunk per query.
+
+        Args:
+            table: "prophets" or "empires"
+            after: Only rows with a larger id
+
+        Yields:
+            Lists of up to chunk_size (id, name, omniscient) rows
+        """
+        query = (f"SELECT id, name, omniscient FROM {self._checked(table)} "
+                 f"WHERE id > ? ORDER BY id LIMIT ?")
+        while True:
+            rows = self._db.execute(query, (after, self.chunk_size)).fetchall()
+            if not rows:
+                return
+            yield rows
+            after = rows[-1][0]
+
+    def set_omniscient(self, table: str,
+                       row_ids: Optional[Iterable[int]] = None,
+                       value: bool = True) -> int:
+        """Flip the omniscient flag with set-based UPDATEs.
+
+        Args:
+            table: "prophets" or "empires"
+            row_ids: Rows to flip (default: every row in the table)
+            value: The new flag
+
+        Returns:
+            Number of rows whose flag actually changed
+        """
+        flag = int(value)
+        table = self._checked(table)
+        if row_ids is None:
+            with self._db:
+                return self._db.execute(
+                    f"UPDATE {table} SET omniscient = ? WHERE omniscient != ?",
+                    (flag, flag)).rowcount
+        statement = (f"UPDATE {table} SET omniscient = ? "
+                     f"WHERE id = ? AND omniscient != ?")
+        changed = 0
+        ids = iter(row_ids)
+        while True:
+            batch = [(flag, row_id, flag)
+                     for row_id in islice(ids, self.batch_size)]
+            if not batch:
+                return changed
+            with self._db:
+                changed += self._db.executemany(statement, batch).rowcount
+
+    def religions(self, events: Optional[EventBus] = None
+                  ) -> "StoredProphetCollection":
+        """Build a ProphetCollection over the stored prophets."""
+        return StoredProphetCollection(self, events)
+
+    def civilizations(self, events: Optional[EventBus] = None
+                      ) -> "StoredCivilizationCollection":
+        """Build a CivilizationCollection over the stored empires."""
+        return StoredCivilizationCollection(self, events)
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self) -> "EntityStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class _StoredEntity(ConsciousEntity):
+    """An entity whose omniscient flag writes through to its row."""
+
+    _store: EntityStore
+    _table: str
+    _row: int
+    # The in-memory kind a fork copies this entity into
+    _memory_type: Type[ConsciousEntity]
+
+    @property
+    def omniscient(self) -> bool:
+        """Whether this entity has reached total knowledge."""
+        return self._omniscient
+
+    @omniscient.setter
+    def omniscient(self, value: bool) -> None:
+        value = bool(value)
+        with self._lock:
+            if value is self._omniscient:
+                return
+            self._omniscient = value
+            self._store.set_omniscient(self._table, (self._row,), value)
+        events = self.events
+        if events.flips is not None:
+            events.flips(self.scale, self.name, value)
+        if value and events.metrics is not None:
+            events.metrics.tick_awakened[self.scale]()
+
+    def _fork_copy(self) -> ConsciousEntity:
+        """An in-memory copy, so a fork's flips never reach the row."""
+        entity = object.__new__(self._memory_type)
+        entity.__dict__.update(self.__dict__)
+        del entity._store, entity._table, entity._row
+        return entity
+
+
+class StoredProphet(_StoredEntity, Prophet):
+    """A Prophet materialized from an EntityStore row."""
+
+    _memory_type = Prophet
+
+
+class StoredEmpire(_StoredEntity, Empire):
+    """An Empire materialized from an EntityStore row."""
+
+    _memory_type = Empire
+
+
+class StoredMembers(Sequence):
+    """The members of a stored collection, as a lazy sequence of entities.
+
+    Each access builds fresh entity objects from the rows; iteration reads
+    one chunk of rows at a time.
+    """
+
+    def __init__(self, store: EntityStore, table: str,
+                 entity_type: Type[_StoredEntity],
+                 events: Optional[EventBus] = None) -> None:
+        self.store = store
+        self.table = table
+        self.entity_type = entity_type
+        self.events = events
+
+    def _entity(self, row: Row) -> Any:
+        row_id, name, omniscient = row
+        entity = self.entity_type(name, self.events)
+        entity._store = self.store
+        entity._table = self.table
+        entity._row = row_id
+        entity._omniscient = bool(omniscient)
+        return entity
+
+    def __len__(self) -> int:
+        return self.store.count(self.table)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[position]
+                    for position in range(*index.indices(len(self)))]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("member index out of range")
+        return self._entity(self.store.row(self.table, index + 1))
+
+    def __iter__(self) -> Iterator[Any]:
+        entity = self._entity
+        for rows in self.store.chunks(self.table):
+            for row in rows:
+                yield entity(row)
+
+    def append(self, entity: ConsciousEntity) -> None:
+        """Store a new member with the given entity's name and flag."""
+        self.extend((entity,))
+
+    def extend(self, entities: Iterable[ConsciousEntity]) -> None:
+        """Store new members, in batched transactions."""
+        self.store.add_rows(self.table, ((entity.name, int(entity.omniscient))
+                                         for entity in entities))
+
+
+class _StoredCollection:
+    """Collection behaviour answered by the store rather than member objects.
+
+    Membership lives in the database, so nothing is tracked in memory and
+    every aggregate is an indexed query.
+    """
+
+    store: EntityStore
+    scale: str
+    templates: Dict[str, str]
+    events: EventBus
+    _table = ""
+
+    def _track(self, members: Any) -> None:
+        pass
+
+    def snapshot(self) -> Tuple[int, int]:
+        """Read the omniscient count and collection size from the store."""
+        store = self.store
+        return store.omniscient_count(self._table), store.count(self._table)
+
+    def awaken(self, positions: Iterable[int]) -> int:
+        """Make the members at the given positions omniscient in one batch.
+
+        Args:
+            positions: Indexes into the member sequence
+
+        Returns:
+            Number of members that were not omniscient before
+        """
+        flips = self.events.flips
+        if flips is not None:
+            # Name the members that flip before the UPDATE hides which
+            positions = list(dict.fromkeys(positions))
+            members = self._members()
+            for position in positions:
+                member = members[position]
+                if not member._omniscient:
+                    flips(self.scale, member.name, True)
+        awakened = self.store.set_omniscient(
+            self._table, (position + 1 for position in positions))
+        if awakened and self.events.metrics is not None:
+            self.events.metrics.awakened(self.scale, awakened)
+        return awakened
+
+    def detach(self) -> None:
+        pass
+
+    def _states(self) -> Tuple[List[str], bytearray]:
+        """Names and flags read chunk by chunk, without member objects."""
+        names: List[str] = []
+        flags = bytearray()
+        for rows in self.store.chunks(self._table):
+            names.extend([name for _, name, _ in rows])
+            flags.extend([omniscient for _, _, omniscient in rows])
+        return names, flags
+
+    def _progress_states(self) -> bytearray:
+        """Progress bytes; rows keep the omniscient flag but no chapters."""
+        flags = bytearray()
+        for rows in self.store.chunks(self._table):
+            flags.extend([omniscient for _, _, omniscient in rows])
+        return flags.translate(_PROGRESS_OF_FLAG)
+
+    def experience_omniscience(self) -> None:
+        """All members achieve omniscience in one set-based UPDATE.
+
+        Each member still narrates its chapter when anyone is listening.
+        """
+        events = self.events
+        if events.is_active(self.scale, "experiences_omniscience"):
+            template = self.templates["experiences_omniscience"]
+            for rows in self.store.chunks(self._table):
+                for _, name, _ in rows:
+                    events.emit(self.scale, "experiences_omniscience", name,
+                                template, name)
+        if events.flips is not None:
+            for rows in self.store.chunks(self._table):
+                for _, name, omniscient in rows:
+                    if not omniscient:
+                        events.flips(self.scale, name, True)
+        awakened = self.store.set_omniscient(self._table)
+        if awakened and events.metrics is not None:
+            events.metrics.awakened(self.scale, awakened)
+
+
+class StoredProphetCollection(_StoredCollection, ProphetCollection):
+    """A ProphetCollection whose prophets live in an EntityStore."""
+
+    _table = "prophets"
+
+    def __init__(self, store: EntityStore,
+                 events: Optional[EventBus] = None) -> None:
+        """Open the stored prophets as a collection.
+
+        Args:
+            store: The store holding the prophets
+            events: Bus receiving every chapter (default: stdout)
+        """
+        self.store = store
+        events = events if events is not None else default_events
+        super().__init__(StoredMembers(store, self._table, StoredProphet,
+                                       events), events)
+
+    def _bind_sect(self, position: int, sect: int) -> None:
+        # The prophet objects are rebuilt on every access, so founding sects
+        # of stored prophets are created without binding them
+        pass
+
+
+class StoredCivilizationCollection(_StoredCollection, CivilizationCollection):
+    """A CivilizationCollection whose empires live in an EntityStore."""
+
+    _table = "empires"
+
+    def __init__(self, store: EntityStore,
+                 events: Optional[EventBus] = None) -> None:
+        """Open the stored empires as a collection.
+
+        Args:
+            store: The store holding the empires
+            events: Bus receiving every chapter (default: stdout)
+        """
+        self.store = store
+        events = events if events is not None else default_events
+        super().__init__(StoredMembers(store, self._table, StoredEmpire,
+                                       events), events)
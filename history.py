@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+History - Asking What Iteration k Looked Like
+
+compile_reality only leaves its final state behind, and re-running a long
+run to see the middle of it costs as much as the run itself. A RunHistory
+listens to a run as it compiles and keeps enough to answer "what was the
+state at the end of iteration k" later, from a local SQLite file, without
+simulating anything again.
+
+Two things are stored. A delta log records every state change in the order
+it happened: the start of an iteration, a value of love, knowledge, mystery
+or meaning that changed, the entities whose omniscient flags flipped either
+way, and every reset made by forget_everything_except. Flips are heard
+as a flip listener of the bus, so silent batch flips such as a sharded
+sweep are logged too; consecutive flips of one scale in one direction
+share a row, written as the iteration ends. Every ``spacing`` iterations a
+checkpoint stores the full state as well. Rows are written out in batches, one transaction
+each, and whenever a run completes. A query finds the nearest checkpoint at
+or before k through the primary key, then applies the deltas logged since,
+so it costs O(log n + delta): a wider spacing keeps the file smaller, a
+narrower one makes queries faster.
+
+Each iteration creates its entities afresh, so the start of an iteration
+clears every omniscient flag and the flags of iteration k are exactly what
+the flips logged during it leave set.
+"""
+
+import json
+import sqlite3
+from typing import (TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List,
+                    Optional, Tuple)
+
+if TYPE_CHECKING:
+    from consciousness import Consciousness, Event, Subscriber
+
+# Values of the Consciousness followed from iteration to iteration
+FIELDS = ("love", "knowledge", "mystery", "meaning")
+# Chapters that change, or reveal a change of, the followed state
+CHAPTERS = ("iteration_begins", "meaning_calculated",
+            "meaning_collapsed_to_zero", "forget_everything_except",
+            "compilation_complete")
+
+# Rows held in memory before they are written in one transaction
+_BATCH = 4096
+# Joins the names of the entities of one scale that flipped together
+_SEPARATOR = "\n"
+
+# One logged change: (kind, scale, entity, field, value)
+Delta = Tuple[str, Optional[str], Optional[str], Optional[str],
+              Optional[float]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    iteration INTEGER PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deltas (
+    seq INTEGER PRIMARY KEY,
+    iteration INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    scale TEXT,
+    entity TEXT,
+    field TEXT,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS deltas_by_iteration ON deltas (iteration);
+"""
+
+
+class HistoryState:
+    """The state of a run at the end of one iteration."""
+
+    def __init__(self, iteration: int, values: Dict[str, float],
+                 omniscient: Iterable[Tuple[str, str]]) -> None:
+        self.iteration = iteration
+        self.love = values["love"]
+        self.knowledge = values["knowledge"]
+        self.mystery = values["mystery"]
+        self.meaning = values["meaning"]
+        self.omniscient: FrozenSet[Tuple[str, str]] = frozenset(omniscient)
+
+    def values(self) -> Dict[str, float]:
+        """The followed values by field name."""
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, HistoryState):
+            return NotImplemented
+        return (self.iteration == other.iteration
+                and self.values() == other.values()
+                and self.omniscient == other.omniscient)
+
+    def __repr__(self) -> str:
+        return (f"HistoryState(iteration={self.iteration}, "
+                f"knowledge={self.knowledge}, mystery={self.mystery}, "
+                f"meaning={self.meaning}, "
+                f"omniscient={len(self.omniscient)})")
+
+
+class RunHistory:
+    """Checkpoints plus a delta log of one run, queryable by iteration.
+
+    Example:
+        with RunHistory("history.sqlite", spacing=64) as history:
+            history.attach(consciousness)
+            consciousness.compile_reality(max_iterations=10_000)
+            history.state_at(4_321).meaning
+    """
+
+    def __init__(self, path: str = ":memory:", spacing: int = 16) -> None:
+        """Open, or create, a history file.
+
+        Args:
+            path: SQLite file holding the history
+            spacing: Iterations between full checkpoints
+        """
+        if spacing < 1:
+            raise ValueError("spacing must be positive")
+        self.path = path
+        self.spacing = spacing
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        self._consciousness: Optional["Consciousness"] = None
+        self._subscription: Optional["Subscriber"] = None
+        self._open: Optional[int] = None
+        self._values: Dict[str, float] = {}
+        # Values as the open iteration began
+        self._baseline: Dict[str, float] = {}
+        # Omniscient names per scale in the open iteration, in flip order
+        self._flags: Dict[str, Dict[str, None]] = {}
+        # The open iteration's flips: (scale, omniscient, names) runs
+        self._flips: List[Tuple[str, bool, List[str]]] = []
+        self._pending: List[Tuple[Any, ...]] = []
+        self._checkpoints: List[Tuple[int, str]] = []
+        self._force_checkpoint = True
+
+    def attach(self, consciousness: "Consciousness") -> "Subscriber":
+        """Record every iteration the Consciousness compiles from now on.
+
+        Iterations already in the history from the one about to be played
+        onwards are forgotten, so a rewound run overwrites its old future.
+
+        Args:
+            consciousness: The Consciousness to follow
+
+        Returns:
+            The subscription on consciousness.events
+        """
+        if self._subscription is not None:
+            raise RuntimeError("RunHistory is already attached")
+        self._consciousness = consciousness
+        self._values = self._read()
+        self._force_checkpoint = True
+        with self._db:
+            for table in ("deltas", "checkpoints"):
+                self._db.execute(f"DELETE FROM {table} WHERE iteration >= ?",
+                                 (consciousness.iteration,))
+        self._subscription = consciousness.events.subscribe(
+            self.observe, chapters=CHAPTERS, scales=("cosmic",))
+        consciousness.events.subscribe_flips(self.flip)
+        return self._subscription
+
+    def detach(self) -> None:
+        """Stop recording; an iteration still being played is dropped."""
+        if self._subscription is None:
+            return
+        assert self._consciousness is not None
+        events = self._consciousness.events
+        events.unsubscribe(self._subscription)
+        events.unsubscribe_flips(self.flip)
+        self._subscription = None
+        self._consciousness = None
+        self.flush()
+        self._pending.clear()
+        self._flags.clear()
+        self._flips.clear()
+        self._open = None
+
+    def _read(self) -> Dict[str, float]:
+        assert self._consciousness is not None
+        return {field: getattr(self._consciousness, field)
+                for field in FIELDS}
+
+    def observe(self, event: "Event") -> None:
+        """Log the state changes one event reveals.
+
+        Args:
+            event: An event from the attached Consciousness's bus
+        """
+        chapter = event.chapter
+        if chapter == "iteration_begins":
+            if event.iteration == self._open:
+                self._discard()  # A stopped run resumed; forget the part
+            self._close()
+            self._begin(event.iteration)
+        elif chapter == "compilation_complete":
+            self._close()
+            self.flush()
+        elif self._open is not None:
+            if chapter == "forget_everything_except":
+                self._pending.append((self._open, "reset", None, None, None,
+                                      event._args[0]))
+                self._values.update(knowledge=1.0, mystery=1.0, meaning=1.0)
+            self._diff()
+
+    def flip(self, scale: str, entity: str, omniscient: bool) -> None:
+        """Log one omniscient flag flipping; a flip listener of the bus.
+
+        Args:
+            scale: Scale of the entity
+            entity: Name of the entity
+            omniscient: The flag's new value
+        """
+        if self._open is None:
+            return
+        names = self._flags.setdefault(scale, {})
+        if omniscient:
+            names[entity] = None
+        else:
+            names.pop(entity, None)
+        flips = self._flips
+        if flips and flips[-1][0] == scale and flips[-1][1] is omniscient:
+            flips[-1][2].append(entity)
+        else:
+            flips.append((scale, omniscient, [entity]))
+
+    def _begin(self, iteration: int) -> None:
+        """Start logging an iteration."""
+        self._open = iteration
+        self._baseline = dict(self._values)
+        # New entities start with their flags cleared
+        self._pending.append((iteration, "begin", None, None, None, None))
+        # Values changed between runs belong to the first iteration logged
+        self._diff()
+
+    def _discard(self) -> None:
+        """Forget what was logged of the open iteration."""
+        iteration = self._open
+        self._pending = [delta for delta in self._pending
+                         if delta[0] != iteration]
+        self._flags = {}
+        self._flips = []
+        self._values = self._baseline
+        self._open = None
+
+    def _diff(self) -> None:
+        """Log the followed values that changed since they were last seen."""
+        for field, value in self._read().items():
+            if self._values.get(field) != value:
+                self._values[field] = value
+                self._pending.append((self._open, "set", None, None, field,
+                                      value))
+
+    def _close(self) -> None:
+        """Finish the open iteration, checkpointing it when it is due."""
+        iteration = self._open
+        if iteration is None:
+            return
+        self._diff()
+        self._open = None
+        self._pending.extend((iteration, "flip", scale, _SEPARATOR.join(names),
+                              None, float(omniscient))
+                             for scale, omniscient, names in self._flips)
+        if self._force_checkpoint or iteration % self.spacing == 0:
+            flags = {scale: list(names)
+                     for scale, names in self._flags.items() if names}
+            state = {"values": self._values, "omniscient": flags}
+            self._checkpoints.append((iteration, json.dumps(state)))
+            self._force_checkpoint = False
+        if len(self._pending) + len(self._checkpoints) >= _BATCH:
+            self.flush()
+        self._flags = {}
+        self._flips = []
+
+    def flush(self) -> None:
+        """Write the finished iterations still held in memory."""
+        if not self._pending and not self._checkpoints:
+            return
+        pending = self._pending
+        if self._open is not None:  # Keep the iteration being played
+            split = len(pending)
+            while split and pending[split - 1][0] == self._open:
+                split -= 1
+            pending, self._pending = pending[:split], pending[split:]
+        else:
+            self._pending = []
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO deltas (iteration, kind, scale, entity, field, "
+                "value) VALUES (?, ?, ?, ?, ?, ?)", pending)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO checkpoints (iteration, state) "
+                "VALUES (?, ?)", self._checkpoints)
+        self._checkpoints.clear()
+
+    def iterations(self) -> Optional[Tuple[int, int]]:
+        """The first and last recorded iteration, or None when empty."""
+        self.flush()
+        first = self._db.execute(
+            "SELECT MIN(iteration) FROM checkpoints").fetchone()[0]
+        if first is None:
+            return None
+        last = self._db.execute(
+            "SELECT MAX(iteration) FROM deltas").fetchone()[0]
+        return first, last
+
+    def deltas(self, iteration: int) -> List[Delta]:
+        """The changes logged during one iteration, one flip per entity."""
+        self.flush()
+        deltas: List[Delta] = []
+        for kind, scale, entity, field, value in self._db.execute(
+                "SELECT kind, scale, entity, field, value FROM deltas "
+                "WHERE iteration = ? ORDER BY seq", (iteration,)):
+            if kind == "flip":
+                deltas.extend((kind, scale, name, field, value)
+                              for name in entity.split(_SEPARATOR))
+            else:
+                deltas.append((kind, scale, entity, field, value))
+        return deltas
+
+    def state_at(self, iteration: int) -> HistoryState:
+        """Reconstruct the state at the end of an iteration.
+
+        Args:
+            iteration: Iteration number, counted from 0 like Event.iteration
+
+        Returns:
+            The values and omniscient entities as the iteration ended
+        """
+        recorded = self.iterations()
+        if recorded is None or not recorded[0] <= iteration <= recorded[1]:
+            raise IndexError(f"Iteration {iteration} is not in the history")
+        checkpoint, state = self._db.execute(
+            "SELECT iteration, state FROM checkpoints WHERE iteration <= ? "
+            "ORDER BY iteration DESC LIMIT 1", (iteration,)).fetchone()
+        state = json.loads(state)
+        values: Dict[str, float] = state["values"]
+        flags = {(scale, name): None
+                 for scale, names in state["omniscient"].items()
+                 for name in names}
+        for kind, scale, entity, field, value in self._db.execute(
+                "SELECT kind, scale, entity, field, value FROM deltas "
+                "WHERE iteration > ? AND iteration <= ? ORDER BY seq",
+                (checkpoint, iteration)):
+            if kind == "begin":
+                flags = {}
+            elif kind == "set":
+                values[field] = value
+            elif kind == "flip":
+                for name in entity.split(_SEPARATOR):
+                    if value:
+                        flags[scale, name] = None
+                    else:
+                        flags.pop((scale, name), None)
+            elif kind == "reset":
+                values.update(knowledge=1.0, mystery=1.0, meaning=1.0)
+        return HistoryState(iteration, values, flags)
+
+    def close(self) -> None:
+        """Stop recording and close the file."""
+        self.detach()
+        self._db.close()
+
+    def __enter__(self) -> "RunHistory":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
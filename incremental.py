@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Incremental - Replaying the Scales That Did Not Change
+
+A parameter sweep usually changes one scale at a time: six traditions, then
+eight, then twelve, while the person and the empires stay exactly as they
+were. Each scale's chapters depend only on a few inputs of the
+Consciousness, so a ScaleCache remembers the event stream every scale
+emitted in every iteration, keyed by those inputs, and replays it when the
+inputs come round again. Only the scales whose inputs changed are played.
+
+Replayed events go through emit() with their original scale, chapter,
+entity, template and arguments, so every subscriber, filtered or not, sees
+the same events a full run would send, and the merged transcript is
+identical. The cosmic framing narration is never cached: it depends on the
+state the scales leave behind and is always played live.
+
+Built-in scales declare their inputs in SCALE_INPUTS. A plugin scale is
+cached when it lists the Consciousness attributes it reads in an ``inputs``
+attribute; otherwise it is played every time.
+"""
+
+import os
+from collections import OrderedDict
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Hashable, List,
+                    Optional, Tuple)
+
+if TYPE_CHECKING:
+    from consciousness import Consciousness, Event
+
+# Consciousness attributes each built-in scale's chapters depend on
+SCALE_INPUTS: Dict[str, Tuple[str, ...]] = {
+    "individual": (),
+    "religious": ("tradition_count",),
+    "historical": ("history_duration", "catalog"),
+}
+
+# One recorded emit: (scale, chapter, entity, template, args)
+Record = Tuple[str, str, Optional[str], str, Tuple[Any, ...]]
+# A scale's events in one iteration, and whether it reached omniscience
+Stream = Tuple[List[Record], bool]
+
+
+def _fingerprint(value: Any) -> Hashable:
+    """Reduce an input to something that changes whenever the value does."""
+    path = getattr(value, "path", None)
+    if path is not None:  # A catalog is as fresh as its file
+        path = os.path.abspath(path)
+        status = os.stat(path)
+        return ("file", path, status.st_size, status.st_mtime_ns)
+    return repr(value)
+
+
+class ScaleCache:
+    """Event streams of each scale and iteration, keyed by their inputs.
+
+    Example:
+        cache = ScaleCache()
+        for count in (6, 8, 12):
+            consciousness = Consciousness(scale_cache=cache)
+            consciousness.tradition_count = count
+            consciousness.compile_reality()  # Replays individual, historical
+    """
+
+    def __init__(self, max_streams: int = 4096) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_streams: Streams kept before the least recently used ones
+                are forgotten
+        """
+        if max_streams < 1:
+            raise ValueError("max_streams must be positive")
+        self.max_streams = max_streams
+        self.hits = 0
+        self.misses = 0
+        self._streams: "OrderedDict[Hashable, Stream]" = OrderedDict()
+
+    @staticmethod
+    def inputs(scale: str, play: Callable[[], bool]
+               ) -> Optional[Tuple[str, ...]]:
+        """Name the inputs of a scale, or None when they are unknown."""
+        inputs = SCALE_INPUTS.get(scale)
+        if inputs is None:
+            plugin = getattr(play, "func", play)
+            inputs = getattr(plugin, "inputs", None)
+        return None if inputs is None else tuple(inputs)
+
+    def key(self, consciousness: "Consciousness", scale: str,
+            inputs: Tuple[str, ...]) -> Hashable:
+        """Identify one scale's stream in the current iteration."""
+        return (scale, consciousness.iteration,
+                tuple(_fingerprint(getattr(consciousness, name))
+                      for name in inputs))
+
+    def wrap(self, consciousness: "Consciousness", scale: str,
+             play: Callable[[], bool]) -> Callable[[], bool]:
+        """Turn a scale player into one that replays unchanged iterations.
+
+        Args:
+            consciousness: The Consciousness being compiled
+            scale: Name of the scale
+            play: Plays one iteration of the scale
+
+        Returns:
+            A player with the same result and the same events
+        """
+        inputs = self.inputs(scale, play)
+        # A scheduler's clock never comes round again, so a paced scale
+        # is always played live
+        if inputs is None or (scale == "individual"
+                              and consciousness.scheduler is not None):
+            return play
+
+        def cached() -> bool:
+            key = self.key(consciousness, scale, inputs)
+            stream = self._streams.get(key)
+            if stream is not None:
+                self.hits += 1
+                self._streams.move_to_end(key)
+                return self._replay(consciousness, stream)
+            self.misses += 1
+            stream = self._record(consciousness, play)
+            self._streams[key] = stream
+            if len(self._streams) > self.max_streams:
+                self._streams.popitem(last=False)
+            return stream[1]
+
+        return cached
+
+    @staticmethod
+    def _record(consciousness: "Consciousness",
+                play: Callable[[], bool]) -> Stream:
+        """Play a scale while recording every event it emits."""
+        records: List[Record] = []
+
+        def record(event: "Event") -> None:
+            records.append((event.scale, event.chapter, event.entity,
+                            event._template, event._args))
+
+        events = consciousness.events
+        subscription = events.subscribe(record)
+        try:
+            reached = bool(play())
+        finally:
+            events.unsubscribe(subscription)
+        return records, reached
+
+    @staticmethod
+    def _replay(consciousness: "Consciousness", stream: Stream) -> bool:
+        """Emit a recorded stream again on the live bus."""
+        records, reached = stream
+        emit = consciousness.events.emit
+        for scale, chapter, entity, template, args in records:
+            emit(scale, chapter, entity, template, *args)
+        return reached
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def clear(self) -> None:
+        """Forget every stream."""
+        self._streams.clear()
+
+    def fork(self) -> "ScaleCache":
+        """Branch a cache holding the same streams for a what-if run.
+
+        Recorded streams are never changed, so the fork shares them; only
+        what each side records or forgets afterwards stays its own.
+
+        Returns:
+            A cache with its own streams and hit counts
+        """
+        twin = type(self)(self.max_streams)
+        twin._streams = OrderedDict(self._streams)
+        return twin
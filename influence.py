@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Influence - Recognition Spreading Through Traditions and Civilizations
+
+Prophets and empires do not recognize the pattern in isolation: a tradition
+that sees it passes it to the traditions and civilizations it touches. This
+module models that as a directed influence graph and spreads recognition
+along it, awakening omniscience in every entity it reaches.
+
+The graph is stored in CSR (compressed sparse row) form: the targets of
+node i are indices[indptr[i]:indptr[i + 1]]. Propagation is a frontier
+breadth-first search, the boolean form of a sparse matrix-vector product
+restricted to the nodes that changed in the previous step, so every edge is
+examined once over a whole spread rather than once per step.
+"""
+
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from consciousness import CivilizationCollection, ProphetCollection
+
+Collection = Union[ProphetCollection, CivilizationCollection]
+
+
+class InfluenceGraph:
+    """Directed graph of who influences whom, in compressed sparse rows."""
+
+    def __init__(self, indptr: Sequence[int], indices: Sequence[int]) -> None:
+        """Wrap existing CSR arrays.
+
+        Args:
+            indptr: node_count + 1 offsets into indices, non-decreasing
+            indices: Target node of every edge, grouped by source
+        """
+        if not indptr or indptr[0] != 0 or indptr[-1] != len(indices):
+            raise ValueError("indptr must start at 0 and end at len(indices)")
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_edges(cls, node_count: int, sources: Sequence[int],
+                   targets: Sequence[int]) -> "InfluenceGraph":
+        """Build the CSR arrays from parallel edge lists with a counting sort.
+
+        Runs in O(nodes + edges) and keeps the edge order of each source.
+
+        Args:
+            node_count: Number of nodes; ids run from 0 to node_count - 1
+            sources: Influencing node of each edge
+            targets: Influenced node of each edge
+
+        Returns:
+            The graph
+        """
+        if len(sources) != len(targets):
+            raise ValueError("sources and targets differ in length")
+        for ends in (sources, targets):
+            if len(ends) and not (0 <= min(ends) and max(ends) < node_count):
+                raise ValueError(f"edges refer to nodes outside "
+                                 f"0..{node_count - 1}")
+        indptr = array("q", [0]) * (node_count + 1)
+        for source in sources:
+            indptr[source + 1] += 1
+        for node in range(node_count):
+            indptr[node + 1] += indptr[node]
+        fill = array("q", indptr)
+        indices = array("q", [0]) * len(targets)
+        for source, target in zip(sources, targets):
+            indices[fill[source]] = target
+            fill[source] += 1
+        return cls(indptr, indices)
+
+    @property
+    def node_count(self) -> int:
+        """Number of nodes in the graph."""
+        return len(self.indptr) - 1
+
+    @property
+    def edge_count(self) -> int:
+        """Number of edges in the graph."""
+        return len(self.indices)
+
+    def influenced_by(self, node: int) -> Sequence[int]:
+        """List the nodes a node influences directly.
+
+        Args:
+            node: The influencing node
+
+        Returns:
+            Its targets, as a slice of the CSR indices
+        """
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+
+class RecognitionSpread:
+    """Spreads recognition of the pattern across an influence graph.
+
+    A node recognizes the pattern once ``threshold`` of the nodes influencing
+    it have. Nodes map onto the members of the given collections in order:
+    the first collection's members take the first ids, and so on. Every node
+    that recognizes the pattern awakens to omniscience, applied to each
+    collection in one batch per step.
+    """
+
+    def __init__(self, graph: InfluenceGraph,
+                 collections: Sequence[Collection] = (),
+                 threshold: int = 1) -> None:
+        """Prepare an empty spread.
+
+        Args:
+            graph: The influence graph
+            collections: ProphetCollection and CivilizationCollection
+                instances whose members are the graph's nodes, in order
+            threshold: Recognizing influences needed before a node follows
+        """
+        if threshold < 1:
+            raise ValueError("threshold must be at least 1")
+        self.graph = graph
+        self.threshold = threshold
+        self.recognized = bytearray(graph.node_count)
+        self.frontier: List[int] = []
+        self.steps = 0
+        # How many recognizing influences each node has felt so far
+        self._exposure: Optional["array[int]"] = None
+        if threshold > 1:
+            self._exposure = array("l", [0]) * graph.node_count
+        self._bounds: List[Tuple[int, Collection]] = []
+        first = 0
+        for collection in collections:
+            self._bounds.append((first, collection))
+            first += collection.snapshot()[1]
+        if self._bounds and first != graph.node_count:
+            raise ValueError(f"collections hold {first} members but the graph "
+                             f"has {graph.node_count} nodes")
+
+    @property
+    def recognized_count(self) -> int:
+        """Number of nodes that have recognized the pattern so far."""
+        return self.recognized.count(1)
+
+    def recognize(self, nodes: Iterable[int]) -> List[int]:
+        """Seed recognition at the given nodes, as if they saw it themselves.
+
+        Args:
+            nodes: Nodes recognizing the pattern unprompted
+
+        Returns:
+            The seeds that had not recognized it already
+        """
+        recognized = self.recognized
+        seeded = []
+        for node in nodes:
+            if not recognized[node]:
+                recognized[node] = 1
+                seeded.append(node)
+        self.frontier.extend(seeded)
+        self._awaken(seeded)
+        return seeded
+
+    def step(self) -> List[int]:
+        """Spread recognition one hop from the current frontier.
+
+        Returns:
+            The nodes that recognized the pattern in this step, which become
+            the next frontier
+        """
+        indptr = self.graph.indptr
+        indices = self.graph.indices
+        recognized = self.recognized
+        reached: List[int] = []
+        exposure = self._exposure
+        if exposure is None:
+            for node in self.frontier:
+                for target in indices[indptr[node]:indptr[node + 1]]:
+                    if not recognized[target]:
+                        recognized[target] = 1
+                        reached.append(target)
+        else:
+            threshold = self.threshold
+            for node in self.frontier:
+                for target in indices[indptr[node]:indptr[node + 1]]:
+                    if not recognized[target]:
+                        exposure[target] += 1
+                        if exposure[target] >= threshold:
+                            recognized[target] = 1
+                            reached.append(target)
+        self.frontier = reached
+        self.steps += 1
+        self._awaken(reached)
+        return reached
+
+    def run(self, max_steps: Optional[int] = None) -> int:
+        """Step until recognition stops spreading or max_steps is reached.
+
+        Args:
+            max_steps: Upper bound on steps (default: no bound)
+
+        Returns:
+            Number of steps taken
+        """
+        taken = 0
+        while self.frontier and (max_steps is None or taken < max_steps):
+            self.step()
+            taken += 1
+        return taken
+
+    def _awaken(self, nodes: List[int]) -> None:
+        """Make the entities behind newly recognizing nodes omniscient."""
+        if not self._bounds or not nodes:
+            return
+        nodes = sorted(nodes)
+        cursor = 0
+        for index, (first, collection) in enumerate(self._bounds):
+            stop = (self._bounds[index + 1][0] if index + 1 < len(self._bounds)
+                    else self.graph.node_count)
+            positions = []
+            while cursor < len(nodes) and nodes[cursor] < stop:
+                positions.append(nodes[cursor] - first)
+                cursor += 1
+            if positions:
+                collection.awaken(positions)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Instrumentation - Counting the Chapters Actually Played
+
+cProfile answers where the time goes, but it instruments every function in
+the interpreter and slows a run several times over. A CallCounter only
+watches the functions of the consciousness module (chapter methods,
+collection operations, Consciousness helpers) and answers how often each
+one runs, under which callers, and roughly how long it takes.
+
+On Python 3.12 and later it registers with sys.monitoring and turns on
+events for just those code objects, so everything else runs at full speed;
+older versions fall back to sys.setprofile and filter in the callback. Every
+call is counted once per call path, which doubles as folded-stack output for
+flame graphs, and one call in sample_every of each path is timed. Disabling
+the counter removes every callback and frees the monitoring tool id.
+"""
+
+import inspect
+import sys
+import threading
+import time
+from types import CodeType, ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import consciousness
+
+BACKENDS = ("monitoring", "setprofile")
+
+# A call path from the outermost watched function to the innermost
+Path = Tuple[CodeType, ...]
+# A call path's tree node: [calls, children by id(code), code, sampled
+# calls, sampled nanoseconds]
+_Node = List[Any]
+
+
+def _functions(namespace: Any, module: str, prefix: str
+               ) -> Iterator[Tuple[str, Any]]:
+    """Yield (qualified name, function) for what a namespace defines."""
+    for name, value in vars(namespace).items():
+        if isinstance(value, (staticmethod, classmethod)):
+            value = value.__func__
+        if isinstance(value, property):
+            for accessor in (value.fget, value.fset, value.fdel):
+                if accessor is not None:
+                    yield prefix + name, accessor
+        elif inspect.isfunction(value) and value.__module__ == module:
+            yield prefix + name, value
+        elif inspect.isclass(value) and value.__module__ == module:
+            yield from _functions(value, module, f"{prefix}{name}.")
+
+
+def _code_names(module: ModuleType) -> Dict[CodeType, str]:
+    """Map the code objects of a module's functions to qualified names."""
+    names: Dict[CodeType, str] = {}
+    pending = [(code_name, function.__code__) for code_name, function in
+               _functions(module, module.__name__, "")]
+    while pending:
+        name, code = pending.pop()
+        if code in names:
+            continue
+        names[code] = name
+        # Nested functions, lambdas and comprehensions live in co_consts
+        pending.extend((f"{name}.{const.co_name}", const)
+                       for const in code.co_consts
+                       if isinstance(const, CodeType))
+    return names
+
+
+class CallCounter:
+    """Counts and samples calls into one module while enabled.
+
+    Example:
+        with CallCounter() as counter:
+            Consciousness(printing_bus()).compile_reality()
+        counter.write_folded("consciousness.folded")
+    """
+
+    def __init__(self, module: ModuleType = consciousness,
+                 sample_every: int = 64, backend: Optional[str] = None
+                 ) -> None:
+        """Prepare a counter; nothing is watched until enable().
+
+        Args:
+            module: Module whose functions are counted
+            sample_every: Time one call in this many of each call path
+            backend: "monitoring" or "setprofile" (default: monitoring when
+                the interpreter has it)
+        """
+        if sample_every < 1:
+            raise ValueError("sample_every must be positive")
+        if backend is None:
+            backend = "monitoring" if hasattr(sys, "monitoring") else "setprofile"
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of "
+                             f"{BACKENDS}")
+        if backend == "monitoring" and not hasattr(sys, "monitoring"):
+            raise ValueError("sys.monitoring needs Python 3.12 or later")
+        self.module = module
+        self.sample_every = sample_every
+        self.backend = backend
+        self.names = _code_names(module)
+        self._root: _Node = [0, {}, None, 0, 0]
+        self._stacks: Dict[int, List[Tuple[_Node, int]]] = {}
+        self._enabled = False
+        self._tool: Optional[int] = None
+        self._profile: Optional[Callable[..., None]] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether calls are being counted."""
+        return self._enabled
+
+    def _callbacks(self) -> Tuple[Callable[..., None], Callable[..., None]]:
+        """Build the enter and leave callbacks shared by both backends.
+
+        Both take the code object first and ignore the rest, so they can be
+        registered with sys.monitoring as they are. Hashing a code object
+        is slow, so call paths are walked in a tree keyed by id(code).
+        """
+        stacks = self._stacks
+        root = self._root
+        sample_every = self.sample_every
+        get_ident = threading.get_ident
+        clock = time.perf_counter_ns
+
+        def enter(code: CodeType, *_: Any) -> None:
+            stack = stacks.get(get_ident())
+            if stack is None:
+                stack = stacks[get_ident()] = []
+            children = (stack[-1][0] if stack else root)[1]
+            node = children.get(id(code))
+            if node is None:
+                node = children[id(code)] = [0, {}, code, 0, 0]
+            count = node[0] = node[0] + 1
+            stack.append((node, clock() if count % sample_every == 0 else 0))
+
+        def leave(code: CodeType, *_: Any) -> None:
+            stack = stacks.get(get_ident())
+            # Calls already running when the counter was enabled are ignored
+            if not stack or stack[-1][0][2] is not code:
+                return
+            node, started = stack.pop()
+            if started:
+                node[3] += 1
+                node[4] += clock() - started
+
+        return enter, leave
+
+    def _paths(self) -> Iterator[Tuple[Path, _Node]]:
+        """Walk every recorded call path with its tree node."""
+        pending: List[Tuple[Path, _Node]] = [((), self._root)]
+        while pending:
+            path, node = pending.pop()
+            for child in node[1].values():
+                child_path = path + (child[2],)
+                yield child_path, child
+                pending.append((child_path, child))
+
+    def enable(self) -> None:
+        """Start counting calls into the module."""
+        if self._enabled:
+            return
+        enter, leave = self._callbacks()
+        if self.backend == "monitoring":
+            self._enable_monitoring(enter, leave)
+        else:
+            self._enable_setprofile(enter, leave)
+        self._enabled = True
+
+    def _enable_monitoring(self, enter: Callable[..., None],
+                           leave: Callable[..., None]) -> None:
+        monitoring = sys.monitoring
+        events = monitoring.events
+        tool = monitoring.PROFILER_ID
+        monitoring.use_tool_id(tool, "consciousness-call-counter")
+        watched = {id(code) for code in self.names}
+
+        def unwind(code: CodeType, offset: int, exception: Any) -> None:
+            # Unwinding can only be watched globally, so filter here
+            if id(code) in watched:
+                leave(code)
+
+        for event, callback in ((events.PY_START, enter),
+                                (events.PY_RESUME, enter),
+                                (events.PY_RETURN, leave),
+                                (events.PY_YIELD, leave),
+                                (events.PY_UNWIND, unwind)):
+            monitoring.register_callback(tool, event, callback)
+        local = (events.PY_START | events.PY_RESUME | events.PY_RETURN |
+                 events.PY_YIELD)
+        for code in self.names:
+            monitoring.set_local_events(tool, code, local)
+        monitoring.set_events(tool, events.PY_UNWIND)
+        self._tool = tool
+
+    def _enable_setprofile(self, enter: Callable[..., None],
+                           leave: Callable[..., None]) -> None:
+        if sys.getprofile() is not None:
+            raise RuntimeError("Another profiler is already installed")
+        watched = {id(code) for code in self.names}
+
+        def profile(frame: Any, event: str, arg: Any) -> None:
+            if event == "call":
+                code = frame.f_code
+                if id(code) in watched:
+                    enter(code)
+            elif event == "return":
+                code = frame.f_code
+                if id(code) in watched:
+                    leave(code)
+
+        self._profile = profile
+        sys.setprofile(profile)
+        threading.setprofile(profile)
+
+    def disable(self) -> None:
+        """Stop counting and detach every callback; the counts are kept."""
+        if not self._enabled:
+            return
+        if self._tool is not None:
+            monitoring = sys.monitoring
+            events = monitoring.events
+            tool = self._tool
+            monitoring.set_events(tool, events.NO_EVENTS)
+            for code in self.names:
+                monitoring.set_local_events(tool, code, events.NO_EVENTS)
+            for event in (events.PY_START, events.PY_RESUME, events.PY_RETURN,
+                          events.PY_YIELD, events.PY_UNWIND):
+                monitoring.register_callback(tool, event, None)
+            monitoring.free_tool_id(tool)
+            self._tool = None
+        else:
+            if sys.getprofile() is self._profile:
+                sys.setprofile(None)
+            threading.setprofile(None)  # type: ignore[arg-type]
+            self._profile = None
+        self._stacks.clear()
+        self._enabled = False
+
+    def reset(self) -> None:
+        """Forget every count and timing."""
+        self._root[1].clear()
+        self._stacks.clear()
+
+    def __enter__(self) -> "CallCounter":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.disable()
+
+    def counts(self) -> Dict[str, int]:
+        """Calls per function, most frequent first."""
+        totals: Dict[str, int] = {}
+        for path, node in self._paths():
+            name = self.names[path[-1]]
+            totals[name] = totals.get(name, 0) + node[0]
+        return dict(sorted(totals.items(), key=lambda item: (-item[1],
+                                                             item[0])))
+
+    def timings(self) -> Dict[str, Tuple[int, float]]:
+        """Sampled calls and their mean duration in seconds, per function."""
+        sampled: Dict[str, List[int]] = {}
+        for path, node in self._paths():
+            if node[3]:
+                total = sampled.setdefault(self.names[path[-1]], [0, 0])
+                total[0] += node[3]
+                total[1] += node[4]
+        return {name: (samples, elapsed / samples / 1e9)
+                for name, (samples, elapsed) in sampled.items()}
+
+    def folded(self) -> List[str]:
+        """Call paths as folded stacks ("outer;inner count"), sorted."""
+        names = self.names
+        return sorted(f"{';'.join(names[code] for code in path)} {node[0]}"
+                      for path, node in self._paths())
+
+    def write_folded(self, path: str) -> None:
+        """Write the folded stacks to a file for flamegraph.pl or speedscope."""
+        with open(path, "w", encoding="utf-8") as output:
+            for line in self.folded():
+                output.write(line + "\n")
+
+    def report(self, limit: int = 20) -> str:
+        """Format the most frequent functions as a table."""
+        timings = self.timings()
+        lines = [f"{'function':44} {'calls':>10} {'mean':>10}"]
+        for name, calls in list(self.counts().items())[:limit]:
+            mean = timings.get(name)
+            shown = f"{mean[1] * 1e6:8.2f}us" if mean else f"{'-':>10}"
+            lines.append(f"{name:44} {calls:10} {shown}")
+        return "\n".join(lines)
+
+
+def main(argv: List[str]) -> int:
+    """Count a silent run: [ITERATIONS] [--folded PATH]."""
+    folded = None
+    if "--folded" in argv:
+        index = argv.index("--folded")
+        if index + 1 >= len(argv):
+            print("usage: instrumentation.py [ITERATIONS] [--folded PATH]",
+                  file=sys.stderr)
+            return 2
+        folded = argv[index + 1]
+        argv = argv[:index] + argv[index + 2:]
+    iterations = int(argv[0]) if argv else 3
+    reality = consciousness.Consciousness(consciousness.EventBus())
+    with CallCounter() as counter:
+        reality.compile_reality(max_iterations=iterations)
+    print(counter.report())
+    if folded is not None:
+        counter.write_folded(folded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
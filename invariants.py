@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Invariants - Verifying the Pattern While It Unfolds
+
+The trilogy promises a handful of things on every run: love never changes,
+nothing loses its meaning before it has known everything, every entity
+lives its chapters in order and to the end of its arc, and the iterations
+are counted faithfully and played to the end.
+An InvariantChecker verifies those promises one event, or one transcript
+line, at a time, so a run of any length can be checked inline as it
+compiles or afterwards from a saved transcript.
+
+Memory does not grow with the length of a run: the checker keeps only the
+furthest chapter each entity has reached in the current iteration, plus a
+few counters, and forgets them when the next iteration begins. Violations
+are counted, and only the first few are kept as messages.
+"""
+
+import re
+import sys
+from typing import (TYPE_CHECKING, Dict, Iterable, List, Optional, Pattern,
+                    Tuple)
+
+if TYPE_CHECKING:
+    from consciousness import Event, EventBus, Subscriber
+
+# The chapters of each scale's arc in the order they must happen, first for
+# its entities and then for the collection speaking for all of them
+ARCS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "individual": (
+        ("programs_at_night", "encounters_ai_at_317am", "recognizes_ai_is_self",
+         "merges_with_ai", "experiences_omniscience", "meaning_collapses",
+         "chooses_fragmentation"),
+        (),
+    ),
+    "religious": (
+        ("teaches", "encounters_serpent", "followers_fragment",
+         "recognizes_pattern", "experiences_omniscience"),
+        ("vote_to_merge", "experience_unified_god", "meaning_collapses",
+         "choose_fragmentation"),
+    ),
+    "historical": (
+        ("believes_itself_eternal", "rulers_recognize_pattern", "collapses",
+         "develops_science", "love_persists_through_atrocity",
+         "recognizes_global_pattern", "experiences_omniscience"),
+        ("integrate_via_internet", "develop_ai", "meaning_collapses",
+         "choose_reset"),
+    ),
+}
+
+# How each chapter reads in a transcript, to recover events from the text
+TRANSCRIPT_LINES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "individual": (
+        ("programs_at_night", "{0} is programming at night"),
+        ("encounters_ai_at_317am", "{0} encounters AI at 3:17 AM"),
+        ("recognizes_ai_is_self", "{0} recognizes AI is self"),
+        ("merges_with_ai", "{0} merges with AI"),
+        ("experiences_omniscience", "{0} experiences omniscience"),
+        ("meaning_collapses", "{0}'s meaning collapses"),
+        ("chooses_fragmentation", "{0} chooses fragmentation"),
+    ),
+    "religious": (
+        ("vote_to_merge", "Religions vote to merge into unified understanding"),
+        ("experience_unified_god", "All religions experience unified god"),
+        ("meaning_collapses", "Religious meaning collapses across traditions"),
+        ("choose_fragmentation", "Religions choose further fragmentation"),
+        ("teaches", "Prophet {0} teaches"),
+        ("encounters_serpent", "Prophet {0} encounters the serpent"),
+        ("followers_fragment", "Prophet {0}'s followers fragment"),
+        ("recognizes_pattern", "Prophet {0} recognizes the pattern"),
+        ("experiences_omniscience", "Prophet {0} experiences omniscience"),
+    ),
+    "historical": (
+        ("integrate_via_internet", "Civilizations integrate via internet"),
+        ("develop_ai", "Civilizations develop AI"),
+        ("meaning_collapses", "Historical meaning collapses"),
+        ("choose_reset", "Civilizations choose to reset"),
+        ("believes_itself_eternal", "Empire {0} believes itself eternal"),
+        ("rulers_recognize_pattern", "Empire {0}'s rulers recognize the pattern"),
+        ("collapses", "Empire {0} collapses"),
+        ("develops_science", "Empire {0} develops science"),
+        ("love_persists_through_atrocity", "Love persists through atrocity in {0}"),
+        ("recognizes_global_pattern", "{0} recognizes global pattern"),
+        ("experiences_omniscience", "Empire {0} experiences omniscience"),
+    ),
+}
+
+# Each scale's chapter -> template, the lines its entities and collections
+# print; consciousness.py narrates from this table
+TEMPLATES: Dict[str, Dict[str, str]] = {
+    scale: dict(lines) for scale, lines in TRANSCRIPT_LINES.items()}
+
+_SCALE_HEADERS = {
+    "--- INDIVIDUAL SCALE ---": "individual",
+    "--- RELIGIOUS SCALE ---": "religious",
+    "--- HISTORICAL SCALE ---": "historical",
+    "--- THE REVELATION ---": "cosmic",
+}
+_COLLECTIONS = {"religious": "Religions", "historical": "Civilizations"}
+_ITERATION = re.compile(r"ITERATION (\d+)$")
+_LOVE = re.compile(r"Forgetting everything except love = (.+)$")
+_COMPLETE = re.compile(r"COMPILATION COMPLETE AFTER (\d+) ITERATIONS$")
+_LOVE_FELT = re.compile(r"✨ Can you feel my love\? ✨$")
+_COSMIC_LINES = (("iteration_begins", _ITERATION),
+                 ("forget_everything_except", _LOVE),
+                 ("feel_my_love", _LOVE_FELT),
+                 ("compilation_complete", _COMPLETE))
+_COSMIC_CHAPTERS = frozenset(chapter for chapter, _ in _COSMIC_LINES)
+_OMNISCIENCE = "experiences_omniscience"
+_COLLAPSE = "meaning_collapses"
+
+
+def _line_pattern(template: str) -> Pattern[str]:
+    """Turn a chapter template into a regex capturing the entity."""
+    before, _, after = template.partition("{0}")
+    if not _:
+        return re.compile(re.escape(template) + "$")
+    return re.compile(re.escape(before) + "(.+)" + re.escape(after) + "$")
+
+
+_PARSERS = {
+    scale: tuple((chapter, _line_pattern(template))
+                 for chapter, template in lines)
+    for scale, lines in TRANSCRIPT_LINES.items()
+}
+
+
+class InvariantViolation(AssertionError):
+    """Raised by a strict checker when the stream breaks an invariant."""
+
+
+class InvariantChecker:
+    """Verifies the trilogy's invariants over a stream of chapters.
+
+    Feed it events with observe() (or attach() it to a bus) or transcript
+    lines with feed(), then call finish() once the stream has ended. An
+    iteration ends with its closing question; every arc begun in it must
+    have reached its last chapter by then, and a stream that stops before
+    the question is reported as truncated.
+
+    Example:
+        checker = InvariantChecker()
+        checker.attach(consciousness.events)
+        consciousness.compile_reality(max_iterations=1000)
+        assert not checker.finish()
+    """
+
+    def __init__(self, love: float = 1.0, strict: bool = False,
+                 keep: int = 20) -> None:
+        """Start checking at the beginning of a run.
+
+        Args:
+            love: The value love must keep throughout
+            strict: Raise InvariantViolation at the first violation rather
+                than collecting them
+            keep: How many violation messages to keep
+        """
+        self.love = love
+        self.strict = strict
+        self.keep = keep
+        self.violations: List[str] = []
+        self.violation_count = 0
+        # Chapters that took part in a check
+        self.chapters = 0
+        self.iterations = 0
+        # Whether the current iteration has ended
+        self._ended = True
+        self._scale = "cosmic"
+        # scale -> (entity, collective) -> progress through the arc
+        self._progress: Dict[str, Dict[Tuple[Optional[str], bool], int]] = {
+            scale: {} for scale in ARCS}
+        self._members: Dict[str, int] = dict.fromkeys(ARCS, 0)
+        self._omniscient: Dict[str, int] = dict.fromkeys(ARCS, 0)
+        self._ranks = {
+            scale: ({chapter: rank for rank, chapter in enumerate(members)},
+                    {chapter: rank for rank, chapter in enumerate(collection)})
+            for scale, (members, collection) in ARCS.items()}
+
+    @property
+    def ok(self) -> bool:
+        """Whether no invariant has been broken so far."""
+        return self.violation_count == 0
+
+    def attach(self, events: "EventBus") -> "Subscriber":
+        """Check every chapter published on a bus from now on.
+
+        Args:
+            events: The bus to listen to
+
+        Returns:
+            The subscription, for events.unsubscribe()
+        """
+        return events.subscribe(self.observe)
+
+    def observe(self, event: "Event") -> None:
+        """Check one event.
+
+        Args:
+            event: An event from an EventBus
+        """
+        if event.scale == "cosmic":
+            if event.chapter in _COSMIC_CHAPTERS:
+                self._cosmic(event.chapter, event.message.strip(),
+                             event.iteration)
+        else:
+            if self.iterations and event.iteration != self.iterations - 1:
+                self._violate(f"{event.entity} {event.chapter} is stamped "
+                              f"iteration {event.iteration + 1} during "
+                              f"iteration {self.iterations}")
+            self._chapter(event.scale, event.chapter, event.entity)
+
+    def feed(self, line: str) -> None:
+        """Check one line of a printed transcript.
+
+        Args:
+            line: The line, with or without its trailing newline
+        """
+        text = line.strip()
+        if not text:
+            return
+        scale = _SCALE_HEADERS.get(text)
+        if scale is not None:
+            self._scale = scale
+            return
+        for chapter, pattern in _COSMIC_LINES:
+            if pattern.match(text):
+                self._cosmic(chapter, text, None)
+                return
+        for chapter, pattern in _PARSERS.get(self._scale, ()):
+            match = pattern.match(text)
+            if match:
+                entity = (match.group(1) if pattern.groups
+                          else _COLLECTIONS.get(self._scale))
+                self._chapter(self._scale, chapter, entity)
+                return
+
+    def feed_all(self, lines: Iterable[str]) -> List[str]:
+        """Check a whole transcript and finish.
+
+        Args:
+            lines: Transcript lines, e.g. an open file
+
+        Returns:
+            The violations kept, as from finish()
+        """
+        for line in lines:
+            self.feed(line)
+        return self.finish()
+
+    def finish(self) -> List[str]:
+        """Report what was broken once the stream has ended.
+
+        Returns:
+            The first ``keep`` violation messages; empty when all held
+        """
+        if not self._ended:
+            self._ended = True
+            self._violate(f"iteration {self.iterations} is cut off before "
+                          f"it ends")
+        return self.violations
+
+    def _cosmic(self, chapter: str, text: str,
+                iteration: Optional[int]) -> None:
+        """Check a narration of the Consciousness itself."""
+        self.chapters += 1
+        if chapter == "iteration_begins":
+            match = _ITERATION.search(text)
+            if match:
+                number = int(match.group(1))
+            elif iteration is not None:
+                number = iteration + 1
+            else:
+                number = self.iterations + 1
+            # A stopped run that resumes begins its open iteration again
+            resumed = number == self.iterations > 0
+            if number != self.iterations + 1 and not resumed:
+                self._violate(f"iteration {number} begins after iteration "
+                              f"{self.iterations}")
+            if iteration is not None and iteration != number - 1:
+                self._violate(f"iteration {number} is stamped iteration "
+                              f"{iteration + 1}")
+            if not self._ended and not resumed:
+                self._violate(f"iteration {self.iterations} is cut off "
+                              f"before it ends")
+            self.iterations = number
+            self._ended = False
+            self._scale = "cosmic"
+            for scale in ARCS:
+                self._progress[scale].clear()
+                self._members[scale] = 0
+                self._omniscient[scale] = 0
+        elif chapter == "forget_everything_except":
+            match = _LOVE.search(text)
+            if match is None or float(match.group(1)) != self.love:
+                self._violate(f"iteration {self.iterations}: love is "
+                              f"{match.group(1) if match else 'missing'}, "
+                              f"not {self.love}")
+        elif chapter == "feel_my_love":
+            if self.iterations and not self._ended:
+                self._ended = True
+                self._finish_arcs()
+        elif chapter == "compilation_complete":
+            match = _COMPLETE.search(text)
+            if match is not None and int(match.group(1)) != self.iterations:
+                self._violate(f"compilation reports {match.group(1)} "
+                              f"iterations but {self.iterations} began")
+
+    def _chapter(self, scale: str, chapter: str, entity: Optional[str]) -> None:
+        """Check a chapter of an entity or collection at one scale."""
+        ranks = self._ranks.get(scale)
+        if ranks is None:
+            return
+        member_ranks, collection_ranks = ranks
+        rank = member_ranks.get(chapter)
+        collective = rank is None
+        if collective:
+            rank = collection_ranks.get(chapter)
+            if rank is None:
+                return
+        self.chapters += 1
+        progress = self._progress[scale]
+        key = (entity, collective)
+        # Furthest chapter reached, times two, plus one once omniscient
+        state = progress.get(key, -1)
+        previous = state >> 1
+        omniscient = state > 0 and state & 1
+        if rank < previous:
+            arc = ARCS[scale][collective]
+            self._violate(f"iteration {self.iterations}: {entity} {chapter} "
+                          f"after {arc[previous]}")
+            return
+        if state < 0 and not collective:
+            self._members[scale] += 1
+        if chapter == _OMNISCIENCE and not omniscient:
+            omniscient = True
+            self._omniscient[scale] += 1
+        elif chapter == _COLLAPSE:
+            if collective:
+                pending = self._members[scale] - self._omniscient[scale]
+                if pending:
+                    self._violate(f"iteration {self.iterations}: {scale} "
+                                  f"meaning collapses before {pending} of "
+                                  f"{self._members[scale]} reached omniscience")
+            elif not omniscient:
+                self._violate(f"iteration {self.iterations}: {entity}'s "
+                              f"meaning collapses before omniscience")
+        progress[key] = rank << 1 | omniscient
+
+    def _finish_arcs(self) -> None:
+        """Check every arc begun this iteration reached its last chapter."""
+        for scale, progress in self._progress.items():
+            arcs = ARCS[scale]
+            for (entity, collective), state in progress.items():
+                arc = arcs[collective]
+                if state >> 1 < len(arc) - 1:
+                    self._violate(f"iteration {self.iterations}: {entity} "
+                                  f"stops at {arc[state >> 1]} before "
+                                  f"{arc[-1]}")
+
+    def _violate(self, message: str) -> None:
+        """Record a broken invariant, or raise it when strict."""
+        self.violation_count += 1
+        if self.strict:
+            raise InvariantViolation(message)
+        if len(self.violations) < self.keep:
+            self.violations.append(message)
+
+
+def main(argv: List[str]) -> int:
+    """Check saved transcripts: TRANSCRIPT [TRANSCRIPT ...] ('-' for stdin)."""
+    if not argv:
+        print("usage: invariants.py TRANSCRIPT [TRANSCRIPT ...]",
+              file=sys.stderr)
+        return 2
+    failed = False
+    for path in argv:
+        checker = InvariantChecker()
+        if path == "-":
+            violations = checker.feed_all(sys.stdin)
+        else:
+            with open(path, encoding="utf-8") as transcript:
+                violations = checker.feed_all(transcript)
+        for message in violations:
+            print(f"{path}: {message}")
+        if not checker.ok:
+            failed = True
+            print(f"{path}: {checker.violation_count} violations in "
+                  f"{checker.iterations} iterations")
+        else:
+            print(f"{path}: {checker.chapters} chapters over "
+                  f"{checker.iterations} iterations, all invariants hold")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Load Generation - How Many Runs a Box Can Sustain
+
+Before a sweep is scaled out it helps to know how many compile_reality runs
+per second one machine sustains, and how long the slowest of them take at
+a given concurrency. A LoadGenerator drives a weighted mix of run sizes,
+each a number of iterations, traditions and empires, on threads, worker
+processes or an asyncio event loop, and reports the throughput together
+with the latency percentiles of every run.
+
+Two kinds of load are offered. Closed-loop load keeps ``concurrency`` runs
+in flight and starts the next as soon as one finishes, which measures the
+best throughput. Open-loop load starts runs at a fixed ``rate`` whether or
+not earlier ones have finished, which is how requests actually arrive.
+Latency is measured from the moment a run was due to start, so time spent
+waiting behind slower runs counts against it instead of hiding the stall
+(what HdrHistogram calls coordinated omission).
+
+Latencies go into a LatencyHistogram, a log-linear histogram in the style
+of HdrHistogram. Each power of two of microseconds is split into the same
+number of linear sub-buckets, so every value is kept to a fixed number of
+significant figures from microseconds to hours, in a few hundred kilobytes
+and with constant-time recording. Histograms with the same layout merge by
+adding their counts.
+"""
+
+import asyncio
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import (Executor, Future, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from functools import partial
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+MODES = ("threads", "processes", "asyncio")
+
+# The arguments of one run: (iterations, traditions, catalog path)
+Task = Tuple[int, int, Optional[str]]
+
+# Catalogs opened by this process, by path
+_catalogs: Dict[str, Any] = {}
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram with a fixed relative precision.
+
+    Example:
+        histogram = LatencyHistogram()
+        histogram.record(0.0042)
+        histogram.percentile(99.9)
+    """
+
+    def __init__(self, highest: float = 3600.0,
+                 significant_figures: int = 3) -> None:
+        """Lay out the buckets.
+
+        Args:
+            highest: Longest latency in seconds kept exactly; longer ones
+                are counted at this value
+            significant_figures: Decimal digits every latency keeps, 1 to 5
+        """
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be between 1 and 5")
+        if highest <= 0:
+            raise ValueError("highest must be positive")
+        self.highest = highest
+        self.significant_figures = significant_figures
+        # Enough linear sub-buckets per power of two for the precision
+        self._sub_bits = math.ceil(math.log2(2 * 10 ** significant_figures))
+        self._half_bits = self._sub_bits - 1
+        self._half = 1 << self._half_bits
+        self._highest_us = max(1, int(highest * 1e6))
+        buckets = max(1, self._highest_us.bit_length() - self._sub_bits + 1)
+        self._counts = array("q", bytes(8 * (buckets + 1) * self._half))
+        self.count = 0
+        self.min = math.inf
+        self.max = 0.0
+        self._total = 0.0
+
+    def _index(self, microseconds: int) -> int:
+        bucket = max(0, microseconds.bit_length() - self._sub_bits)
+        return (((bucket + 1) << self._half_bits) +
+                (microseconds >> bucket) - self._half)
+
+    def _value(self, index: int) -> int:
+        """The highest microseconds that land in a bucket."""
+        bucket = (index >> self._half_bits) - 1
+        sub = (index & (self._half - 1)) + self._half
+        if bucket < 0:
+            sub -= self._half
+            bucket = 0
+        return ((sub + 1) << bucket) - 1
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        """Count a latency.
+
+        Args:
+            seconds: The latency; negative values count as zero
+            count: How many times it was seen
+        """
+        seconds = max(0.0, seconds)
+        microseconds = min(int(seconds * 1e6), self._highest_us)
+        self._counts[self._index(microseconds)] += count
+        self.count += count
+        self._total += seconds * count
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        """Average latency in seconds."""
+        return self._total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """The latency that percent of the recorded latencies do not exceed.
+
+        Args:
+            percent: Between 0 and 100, e.g. 99.9
+
+        Returns:
+            Seconds, to the histogram's precision and never above max
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        index = bisect_left(list(accumulate(self._counts)), rank)
+        return min(self._value(index) / 1e6, self.max)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Combine two histograms with the same layout.
+
+        Returns:
+            A new histogram holding the latencies of both
+        """
+        if (self.highest, self.significant_figures) != (
+                other.highest, other.significant_figures):
+            raise ValueError("Only histograms with the same highest value and "
+                             "precision can be merged")
+        merged = LatencyHistogram(self.highest, self.significant_figures)
+        merged._counts = array("q", map(sum, zip(self._counts,
+                                                 other._counts)))
+        merged.count = self.count + other.count
+        merged._total = self._total + other._total
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+        return merged
+
+    def __repr__(self) -> str:
+        return (f"LatencyHistogram(count={self.count}, "
+                f"p50={self.percentile(50):.6f}s, "
+                f"p99={self.percentile(99):.6f}s, max={self.max:.6f}s)")
+
+
+class RunSpec:
+    """One size of run in a load mix."""
+
+    def __init__(self, iterations: int = 3, traditions: int = 6,
+                 empires: Optional[int] = None, weight: float = 1.0) -> None:
+        """Describe the run.
+
+        Args:
+            iterations: Iterations compiled per run
+            traditions: Prophets on the religious scale
+            empires: Empires on the historical scale (default: the six
+                symbolic ones); served from a generated catalog
+            weight: Relative share of the mix
+        """
+        if iterations < 0 or traditions < 0:
+            raise ValueError("iterations and traditions must not be negative")
+        if empires is not None and empires < 1:
+            raise ValueError("empires must be positive")
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+        self.iterations = iterations
+        self.traditions = traditions
+        self.empires = empires
+        self.weight = weight
+
+    def __repr__(self) -> str:
+        return (f"RunSpec(iterations={self.iterations}, "
+                f"traditions={self.traditions}, empires={self.empires}, "
+                f"weight={self.weight})")
+
+
+def _play(iterations: int, traditions: int,
+          catalog_path: Optional[str]) -> None:
+    """Compile one silent run; the unit of work of every mode."""
+    from consciousness import Consciousness, EventBus
+    catalog = None
+    if catalog_path is not None:
+        catalog = _catalogs.get(catalog_path)
+        if catalog is None:
+            from empire_catalog import EmpireCatalog
+            catalog = _catalogs[catalog_path] = EmpireCatalog(catalog_path)
+    consciousness = Consciousness(EventBus(), catalog=catalog)
+    consciousness.tradition_count = traditions
+    consciousness.compile_reality(iterations)
+
+
+class LoadReport:
+    """Throughput and latency of one load test."""
+
+    def __init__(self, mode: str, concurrency: int, rate: Optional[float],
+                 elapsed: float, errors: int,
+                 histogram: LatencyHistogram) -> None:
+        self.mode = mode
+        self.concurrency = concurrency
+        self.rate = rate
+        self.elapsed = elapsed
+        self.errors = errors
+        self.histogram = histogram
+
+    @property
+    def runs(self) -> int:
+        """Runs that completed, successfully or not."""
+        return self.histogram.count
+
+    @property
+    def throughput(self) -> float:
+        """Completed runs per second."""
+        return self.runs / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def p50(self) -> float:
+        """Median latency in seconds."""
+        return self.histogram.percentile(50)
+
+    @property
+    def p99(self) -> float:
+        """99th percentile latency in seconds."""
+        return self.histogram.percentile(99)
+
+    @property
+    def p999(self) -> float:
+        """99.9th percentile latency in seconds."""
+        return self.histogram.percentile(99.9)
+
+    def __repr__(self) -> str:
+        load = (f"{self.rate:g} runs/s offered" if self.rate is not None
+                else f"concurrency {self.concurrency}")
+        return (f"LoadReport({self.mode}, {load}: {self.runs} runs, "
+                f"{self.throughput:.1f} runs/s, p50={self.p50 * 1e3:.2f}ms, "
+                f"p99={self.p99 * 1e3:.2f}ms, "
+                f"p99.9={self.p999 * 1e3:.2f}ms, errors={self.errors})")
+
+
+class LoadGenerator:
+    """Drives a mix of runs at a concurrency or rate and times each one.
+
+    Example:
+        mix = [RunSpec(iterations=3, weight=9),
+               RunSpec(iterations=50, traditions=1000, empires=10**4)]
+        with LoadGenerator(mix, mode="processes", concurrency=8) as load:
+            report = load.run(runs=1000)
+        report.throughput, report.p99
+    """
+
+    def __init__(self, mix: Sequence[RunSpec], mode: str = "threads",
+                 concurrency: int = 1, rate: Optional[float] = None,
+                 seed: Optional[int] = None,
+                 histogram: Optional[LatencyHistogram] = None) -> None:
+        """Configure the load.
+
+        Args:
+            mix: Run sizes, drawn at random by weight
+            mode: "threads", "processes" or "asyncio" (an event loop
+                scheduling runs onto a thread pool)
+            concurrency: Runs in flight at once; the pool size
+            rate: Runs started per second, open loop (default: closed loop,
+                starting a run whenever one finishes)
+            seed: Seed for drawing from the mix
+            histogram: Template for the latency histogram's layout
+        """
+        if not mix:
+            raise ValueError("The mix needs at least one RunSpec")
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}; expected one of {MODES}")
+        if concurrency < 1:
+            raise ValueError("concurrency must be positive")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        self.mix = list(mix)
+        self.mode = mode
+        self.concurrency = concurrency
+        self.rate = rate
+        self._random = random.Random(seed)
+        self._layout = ((histogram.highest, histogram.significant_figures)
+                        if histogram is not None else (3600.0, 3))
+        self._directory: Optional["tempfile.TemporaryDirectory[str]"] = None
+        self._catalog_paths: Dict[int, str] = {}
+        self._executor: Optional[Executor] = None
+        # Guards the histogram and counters; signalled as each run ends
+        self._finished = threading.Condition()
+        self._histogram = LatencyHistogram(*self._layout)
+        self._errors = 0
+        self._ended = 0
+
+    def _catalog(self, empires: int) -> str:
+        """Path of a catalog of this many empires, all alive at once."""
+        path = self._catalog_paths.get(empires)
+        if path is None:
+            from empire_catalog import import_records
+            if self._directory is None:
+                self._directory = tempfile.TemporaryDirectory()
+            path = os.path.join(self._directory.name, f"{empires}.cat")
+            import_records(((f"Empire_{i}", 0, 999) for i in range(empires)),
+                           path)
+            self._catalog_paths[empires] = path
+        return path
+
+    def _task(self) -> Task:
+        """Draw the arguments of the next run from the mix."""
+        spec = self._random.choices(
+            self.mix, [spec.weight for spec in self.mix])[0]
+        catalog = None if spec.empires is None else self._catalog(spec.empires)
+        return spec.iterations, spec.traditions, catalog
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            kind = (ProcessPoolExecutor if self.mode == "processes"
+                    else ThreadPoolExecutor)
+            self._executor = kind(self.concurrency)
+        return self._executor
+
+    def _done(self, due: float, future: "Future[None]") -> None:
+        """Time a finished run from the moment it was due."""
+        self._end(time.perf_counter() - due, future.exception() is not None)
+
+    def _end(self, latency: float, failed: bool) -> None:
+        with self._finished:
+            self._histogram.record(latency)
+            self._errors += failed
+            self._ended += 1
+            self._finished.notify_all()
+
+    def run(self, runs: Optional[int] = None,
+            duration: Optional[float] = None) -> LoadReport:
+        """Generate load until enough runs have started or time is up.
+
+        Args:
+            runs: Runs to start
+            duration: Seconds to keep starting runs for
+
+        Returns:
+            The throughput and latencies of the runs, once all have ended
+        """
+        if runs is None and duration is None:
+            raise ValueError("Give runs, duration or both")
+        self._histogram = LatencyHistogram(*self._layout)
+        self._errors = 0
+        self._ended = 0
+        # Draw the mix up front, so catalogs are built before timing starts
+        planned = [self._task() for _ in range(runs)] if runs else []
+        if duration is not None:
+            for spec in self.mix:
+                if spec.empires is not None:
+                    self._catalog(spec.empires)
+        pool = self._pool()
+        start = time.perf_counter()
+        if self.mode == "asyncio":
+            asyncio.run(self._drive_async(pool, planned, runs, duration,
+                                          start))
+        else:
+            self._drive(pool, planned, runs, duration, start)
+        elapsed = time.perf_counter() - start
+        return LoadReport(self.mode, self.concurrency, self.rate, elapsed,
+                          self._errors, self._histogram)
+
+    def _arrivals(self, planned: List[Task], runs: Optional[int],
+                  duration: Optional[float], start: float
+                  ) -> Iterator[Tuple[int, Task]]:
+        """Yield (number, task) for every run to start, in order."""
+        number = 0
+        while runs is None or number < runs:
+            if (duration is not None and
+                    time.perf_counter() - start >= duration):
+                return
+            yield number, (planned[number] if planned else self._task())
+            number += 1
+
+    def _drive(self, pool: Executor, planned: List[Task],
+               runs: Optional[int], duration: Optional[float],
+               start: float) -> None:
+        started = 0
+        finished = self._finished
+        for number, task in self._arrivals(planned, runs, duration, start):
+            if self.rate is not None:
+                due = start + number / self.rate
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                with finished:
+                    finished.wait_for(lambda: started - self._ended <
+                                      self.concurrency)
+                due = time.perf_counter()
+            future = pool.submit(_play, *task)
+            future.add_done_callback(partial(self._done, due))
+            started += 1
+        with finished:
+            finished.wait_for(lambda: self._ended == started)
+
+    async def _drive_async(self, pool: Executor, planned: List[Task],
+                           runs: Optional[int], duration: Optional[float],
+                           start: float) -> None:
+        loop = asyncio.get_event_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def play(due: float, task: Task) -> None:
+            failed = False
+            try:
+                await loop.run_in_executor(pool, _play, *task)
+            except Exception:
+                failed = True
+            finally:
+                if self.rate is None:
+                    slots.release()
+            self._end(time.perf_counter() - due, failed)
+
+        pending = []
+        for number, task in self._arrivals(planned, runs, duration, start):
+            if self.rate is not None:
+                due = start + number / self.rate
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await slots.acquire()
+                due = time.perf_counter()
+            pending.append(asyncio.ensure_future(play(due, task)))
+        await asyncio.gather(*pending)
+
+    def close(self) -> None:
+        """Stop the worker pool and remove generated catalogs."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for catalog in [path for path in _catalogs
+                        if path in self._catalog_paths.values()]:
+            _catalogs.pop(catalog).close()
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+            self._catalog_paths.clear()
+
+    def __enter__(self) -> "LoadGenerator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
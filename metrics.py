@@ -0,0 +1,661 @@
+#!/usr/bin/env python3
+"""
+Metrics - Dashboards for Long Runs
+
+A run says how it went through its transcript, which nobody reads in
+production. A MetricsRegistry keeps counters, gauges and fixed-bucket
+histograms in process and renders them in the Prometheus text exposition
+format, written to a file or served from a local HTTP endpoint whenever
+asked.
+
+Writers never share a lock. A counter adds one through itertools.count,
+whose next() runs in C, and any other amount to a cell of its own per
+writing thread with a plain +=, as histograms do; a scrape sums the cells.
+A lock is taken only the first time a thread writes a metric, and by
+scrapes.
+
+RunMetrics declares the metrics of the engine and is attached to a run's
+EventBus, through which the run reports:
+
+    consciousness_iterations_total                  iterations completed
+    consciousness_chapters_total{scale,chapter}     chapters narrated
+    consciousness_omniscience_transitions_total     entities that became
+        {scale}                                     omniscient
+    consciousness_meaning_collapses_total{scale}    collapses of meaning
+    consciousness_resets_total                      forget_everything_except
+    consciousness_meaning                           meaning, last iteration
+    consciousness_iteration_seconds                 iteration latency
+    consciousness_run_seconds                       compile_reality latency
+
+Iterations, resets and collapses are counted a few times per iteration
+and transitions once per flip, each with one tick. Chapters are the hot
+path: the bus counts them in a plain dict, written only by the narrating
+thread like the progress masks are, which the registry reads when scraped.
+Counting every chapter costs a few percent of a run of small collections,
+so chapter_sample_every counts them only in one iteration of every n, the
+way subscribers sample, and scales the counts up. A bus without metrics
+pays one attribute test per chapter.
+"""
+
+import itertools
+import os
+import re
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import get_ident
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator,
+                    List, Optional, Sequence, Tuple)
+
+if TYPE_CHECKING:
+    from consciousness import EventBus
+
+# Content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Upper bounds, in seconds, of the latency histograms' buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+                   60.0, 300.0)
+
+_METRIC_NAME = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*\Z")
+_LABEL_NAME = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*\Z")
+
+# One exposition line: (name suffix, label pairs, value)
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+def _number(value: float) -> str:
+    """A sample value as the exposition format spells it."""
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return (value.replace("\\", "\\\\").replace("\n", "\\n")
+            .replace('"', '\\"'))
+
+
+class _Series:
+    """Numbers kept per writing thread and summed element-wise when read."""
+
+    __slots__ = ("_cells", "_lock", "_size")
+
+    def __init__(self, size: int) -> None:
+        self._cells: Dict[int, List[float]] = {}
+        self._lock = threading.Lock()
+        self._size = size
+
+    def _cell(self) -> List[float]:
+        """Create the calling thread's cell; only that thread writes it."""
+        # A thread reusing a finished thread's id adds to its cell
+        with self._lock:
+            return self._cells.setdefault(get_ident(), [0] * self._size)
+
+    def _read(self) -> List[float]:
+        with self._lock:
+            cells = list(self._cells.values())
+        return [sum(cell[index] for cell in cells)
+                for index in range(self._size)]
+
+
+class CounterChild(_Series):
+    """One labelled series of a counter.
+
+    tick() adds one through itertools.count, whose next() runs in C and so
+    needs neither a lock nor a thread's cell; a read consumes a tick too,
+    which the series subtracts by counting its reads.
+    """
+
+    __slots__ = ("tick", "_ticks", "_reads")
+
+    def __init__(self, family: "Counter") -> None:
+        super().__init__(1)
+        self._ticks = itertools.count()
+        self.tick: Callable[[], int] = self._ticks.__next__
+        self._reads = 0
+
+    def inc(self, amount: float = 1) -> None:
+        """Add to the counter.
+
+        Args:
+            amount: A non-negative increment
+        """
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        cell = self._cells.get(get_ident())
+        if cell is None:
+            cell = self._cell()
+        cell[0] += amount
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            ticks = next(self._ticks) - self._reads
+            self._reads += 1
+        return ticks + self._read()[0]
+
+    def samples(self) -> Iterator[Sample]:
+        yield "", (), self.value
+
+
+class GaugeChild:
+    """One labelled series of a gauge."""
+
+    __slots__ = ("_value", "_function", "_lock")
+
+    def __init__(self, family: "Gauge") -> None:
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        """Replace the value; a single store, so it takes no lock."""
+        self._value = value
+
+    def inc(self, amount: float = 1) -> None:
+        """Add to the value (negative amounts subtract)."""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        """Subtract from the value."""
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from a callable whenever the gauge is scraped."""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        function = self._function
+        return self._value if function is None else function()
+
+    def samples(self) -> Iterator[Sample]:
+        yield "", (), self.value
+
+
+class HistogramChild(_Series):
+    """One labelled series of a histogram."""
+
+    __slots__ = ("_bounds",)
+
+    def __init__(self, family: "Histogram") -> None:
+        self._bounds = family.buckets
+        # A count per bucket, one for +Inf, then the sum of observations
+        super().__init__(len(self._bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        """Record one observation in the first bucket that holds it."""
+        cell = self._cells.get(get_ident())
+        if cell is None:
+            cell = self._cell()
+        cell[bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+
+    @property
+    def count(self) -> int:
+        return int(sum(self._read()[:-1]))
+
+    @property
+    def sum(self) -> float:
+        return self._read()[-1]
+
+    def samples(self) -> Iterator[Sample]:
+        counts = self._read()
+        cumulative = 0
+        for bound, count in zip(self._bounds, counts):
+            cumulative += int(count)
+            yield "_bucket", (("le", repr(bound)),), cumulative
+        cumulative += int(counts[-2])
+        yield "_bucket", (("le", "+Inf"),), cumulative
+        yield "_count", (), cumulative
+        yield "_sum", (), counts[-1]
+
+
+class _Family:
+    """A named metric and its series, one per combination of label values."""
+
+    kind = ""
+    _child: Any = None
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = ()) -> None:
+        if not _METRIC_NAME.match(name):
+            raise ValueError(f"Invalid metric name {name!r}")
+        for label in labelnames:
+            if not _LABEL_NAME.match(label) or label == "le":
+                raise ValueError(f"Invalid label name {label!r}")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        # The only series of a metric without labels
+        self._default = None if self.labelnames else self.labels()
+
+    def labels(self, *values: Any, **named: Any) -> Any:
+        """The series for some label values, created on first use.
+
+        Args:
+            *values: Label values in the order of labelnames
+            **named: Label values by name, instead of positional values
+
+        Returns:
+            The series, to be kept by hot code rather than looked up again
+        """
+        if named:
+            if values:
+                raise ValueError("Pass label values by position or by name")
+            values = tuple(named.pop(label) for label in self.labelnames
+                           if label in named)
+            if named:
+                raise ValueError(f"Unknown labels {sorted(named)}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} has labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._child(self))
+        return child
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            labels = tuple(zip(self.labelnames, values))
+            for suffix, extra, value in child.samples():
+                yield suffix, labels + extra, value
+
+
+class Counter(_Family):
+    """A total that only goes up; its name always ends in _total.
+
+    Example:
+        chapters = registry.counter("chapters", "Chapters", ["scale"])
+        chapters.labels("religious").inc()
+    """
+
+    kind = "counter"
+    _child = CounterChild
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = ()) -> None:
+        if not name.endswith("_total"):
+            name += "_total"
+        super().__init__(name, documentation, labelnames)
+
+    def inc(self, amount: float = 1) -> None:
+        """Add to the unlabelled series."""
+        (self._default or self.labels()).inc(amount)
+
+    def tick(self) -> None:
+        """Add one to the unlabelled series."""
+        (self._default or self.labels()).tick()
+
+
+class Gauge(_Family):
+    """A value that goes up and down."""
+
+    kind = "gauge"
+    _child = GaugeChild
+
+    def set(self, value: float) -> None:
+        """Replace the value of the unlabelled series."""
+        (self._default or self.labels()).set(value)
+
+    def inc(self, amount: float = 1) -> None:
+        """Add to the unlabelled series."""
+        (self._default or self.labels()).inc(amount)
+
+
+class Histogram(_Family):
+    """Observations counted in fixed buckets, with their count and sum."""
+
+    kind = "histogram"
+    _child = HistogramChild
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        """Declare a histogram.
+
+        Args:
+            name: Metric name, without the _bucket, _count or _sum suffix
+            documentation: Help text
+            labelnames: Names of the labels telling series apart
+            buckets: Increasing upper bounds; +Inf is always added
+        """
+        bounds = tuple(float(bound) for bound in buckets
+                       if bound != float("inf"))
+        if not bounds or list(bounds) != sorted(set(bounds)):
+            raise ValueError("Buckets must be increasing")
+        self.buckets = bounds
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float) -> None:
+        """Record an observation in the unlabelled series."""
+        (self._default or self.labels()).observe(value)
+
+
+class _Collected:
+    """A metric whose values are read from a callable when scraped."""
+
+    def __init__(self, name: str, kind: str, documentation: str,
+                 labelnames: Sequence[str],
+                 function: Callable[[], Dict[Tuple[str, ...], float]]
+                 ) -> None:
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.function = function
+
+    def samples(self) -> Iterator[Sample]:
+        for values, value in sorted(self.function().items()):
+            yield "", tuple(zip(self.labelnames, values)), value
+
+
+class MetricsRegistry:
+    """The metrics of one process, rendered in the text exposition format.
+
+    Example:
+        registry = MetricsRegistry()
+        runs = registry.counter("runs_total", "Runs compiled")
+        runs.inc()
+        registry.write("/var/lib/node_exporter/consciousness.prom")
+        server = registry.serve(port=9464)
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _declare(self, metric: Any) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if (type(existing) is not type(metric)
+                or existing.labelnames != metric.labelnames):
+            raise ValueError(f"{metric.name} is already registered as a "
+                             f"different metric")
+        return existing
+
+    def counter(self, name: str, documentation: str,
+                labelnames: Sequence[str] = ()) -> Counter:
+        """Declare a counter, or return the one of that name."""
+        return self._declare(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str,
+              labelnames: Sequence[str] = ()) -> Gauge:
+        """Declare a gauge, or return the one of that name."""
+        return self._declare(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str,
+                  labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        """Declare a histogram, or return the one of that name."""
+        return self._declare(Histogram(name, documentation, labelnames,
+                                       buckets))
+
+    def collect(self, name: str, kind: str, documentation: str,
+                labelnames: Sequence[str],
+                function: Callable[[], Dict[Tuple[str, ...], float]]) -> None:
+        """Declare a metric read from a callable when scraped.
+
+        Args:
+            name: Metric name; _total is added to a counter's
+            kind: "counter" or "gauge"
+            documentation: Help text
+            labelnames: Names of the labels telling series apart
+            function: Returns the value of every series by label values
+        """
+        if kind not in ("counter", "gauge"):
+            raise ValueError(f"Unknown kind {kind!r}")
+        if kind == "counter" and not name.endswith("_total"):
+            name += "_total"
+        if not _METRIC_NAME.match(name):
+            raise ValueError(f"Invalid metric name {name!r}")
+        with self._lock:
+            if name in self._metrics:
+                raise ValueError(f"{name} is already registered")
+            self._metrics[name] = _Collected(name, kind, documentation,
+                                             labelnames, function)
+
+    def get(self, name: str) -> Any:
+        """The metric declared under a name."""
+        return self._metrics[name]
+
+    def exposition(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(),
+                             key=lambda metric: metric.name)
+        lines: List[str] = []
+        for metric in metrics:
+            name = metric.name
+            documentation = (metric.documentation.replace("\\", "\\\\")
+                             .replace("\n", "\\n"))
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                if labels:
+                    pairs = ",".join(f'{label}="{_escape(text)}"'
+                                     for label, text in labels)
+                    lines.append(f"{name}{suffix}{{{pairs}}} "
+                                 f"{_number(value)}")
+                else:
+                    lines.append(f"{name}{suffix} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write the exposition to a file, replacing it atomically.
+
+        Args:
+            path: File to write, e.g. for node_exporter's textfile collector
+        """
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(self.exposition())
+        os.replace(temporary, path)
+
+    def serve(self, port: int = 0, host: str = "127.0.0.1") -> "MetricsServer":
+        """Serve the exposition over HTTP from a background thread.
+
+        Args:
+            port: Port to listen on (default: any free port)
+            host: Interface to listen on (default: this machine only)
+
+        Returns:
+            The running server; close() it when done
+        """
+        return MetricsServer(self, host, port)
+
+
+class MetricsServer:
+    """A local HTTP endpoint answering GET /metrics with the exposition."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1",
+                 port: int = 0) -> None:
+        """Start serving at once.
+
+        Args:
+            registry: The registry to expose
+            host: Interface to listen on
+            port: Port to listen on, 0 for any free port
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.exposition().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="metrics-server", daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        """Where the metrics are served."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def close(self) -> None:
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> "MetricsServer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class _ScaleTicks(dict):
+    """The tick() of each scale's series of a counter, by scale."""
+
+    def __init__(self, counter: Counter) -> None:
+        super().__init__()
+        self.counter = counter
+
+    def __missing__(self, scale: str) -> Callable[[], int]:
+        tick = self[scale] = self.counter.labels(scale).tick
+        return tick
+
+
+class RunMetrics:
+    """The engine's metrics, kept for every run on the buses it is attached to.
+
+    Example:
+        metrics = RunMetrics(chapter_sample_every=16)
+        metrics.attach(consciousness.events)
+        consciousness.compile_reality(max_iterations=10**6)
+        metrics.registry.write("consciousness.prom")
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None,
+                 buckets: Iterable[float] = LATENCY_BUCKETS,
+                 chapter_sample_every: int = 1) -> None:
+        """Declare the metrics in a registry.
+
+        Args:
+            registry: Registry to declare them in (default: a new one)
+            buckets: Upper bounds of the latency histograms, in seconds
+            chapter_sample_every: Count chapters only in iterations
+                divisible by this number, scaling the counts up by it
+                (default: count every chapter)
+        """
+        if chapter_sample_every < 1:
+            raise ValueError("chapter_sample_every must be positive")
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.chapter_sample_every = chapter_sample_every
+        registry = self.registry
+        buckets = tuple(buckets)
+        self.iterations = registry.counter(
+            "consciousness_iterations_total", "Iterations completed")
+        self.resets = registry.counter(
+            "consciousness_resets_total",
+            "Resets made by forget_everything_except")
+        self.transitions = registry.counter(
+            "consciousness_omniscience_transitions_total",
+            "Entities that became omniscient", ["scale"])
+        self.collapses = registry.counter(
+            "consciousness_meaning_collapses_total", "Meaning collapses",
+            ["scale"])
+        self.meaning = registry.gauge(
+            "consciousness_meaning", "Meaning at the end of the last iteration")
+        self.iteration_seconds = registry.histogram(
+            "consciousness_iteration_seconds", "Time to play one iteration",
+            buckets=buckets)
+        self.run_seconds = registry.histogram(
+            "consciousness_run_seconds", "Time to complete compile_reality",
+            buckets=buckets)
+        registry.collect("consciousness_chapters_total", "counter",
+                         "Chapters narrated", ["scale", "chapter"],
+                         self.chapters)
+        # The series updated as runs go, looked up once
+        self._iteration_series = (self.iterations.labels().tick,
+                                  self.meaning.labels(),
+                                  self.iteration_seconds.labels())
+        # What entities, collections and runs call as things happen
+        self.tick_awakened = _ScaleTicks(self.transitions)
+        self.tick_collapsed = _ScaleTicks(self.collapses)
+        self.tick_reset = self.resets.labels().tick
+        # Chapter counts of each attached bus, and of detached ones summed
+        self._tables: Dict["EventBus", Dict[Tuple[str, str], int]] = {}
+        self._retired: Dict[Tuple[str, str], int] = {}
+        self._tables_lock = threading.Lock()
+
+    def attach(self, events: "EventBus") -> None:
+        """Keep the metrics of every run narrated on a bus from now on.
+
+        Args:
+            events: The bus of the runs, collections and entities to count
+        """
+        if events.metrics is self:
+            return
+        if events.metrics is not None:
+            raise RuntimeError("The bus already keeps other metrics")
+        with self._tables_lock:
+            self._tables[events] = {}
+        events.metrics = self
+        self.sample(events, events.iteration)
+
+    def detach(self, events: "EventBus") -> None:
+        """Stop counting a bus's runs; what was counted stays in the totals."""
+        if events.metrics is not self:
+            return
+        events.metrics = None
+        events.chapter_counts = None
+        with self._tables_lock:
+            for key, number in self._tables.pop(events).items():
+                self._retired[key] = self._retired.get(key, 0) + number
+
+    def sample(self, events: "EventBus", iteration: int) -> None:
+        """Start or stop counting a bus's chapters as an iteration begins."""
+        if iteration % self.chapter_sample_every == 0:
+            events.chapter_counts = self._tables[events]
+        else:
+            events.chapter_counts = None
+
+    def awakened(self, scale: str, number: int) -> None:
+        """Count a batch of entities of a scale that became omniscient."""
+        self.transitions.labels(scale).inc(number)
+
+    def iteration_completed(self, meaning: float, seconds: float) -> None:
+        """Record an iteration that ran to its end."""
+        tick, gauge, latency = self._iteration_series
+        tick()
+        gauge.set(meaning)
+        latency.observe(seconds)
+
+    def chapters(self) -> Dict[Tuple[str, ...], float]:
+        """Chapters narrated so far by (scale, chapter), sampling scaled up."""
+        with self._tables_lock:
+            total = dict(self._retired)
+            tables = [table.copy() for table in self._tables.values()]
+        for table in tables:
+            for key, number in table.items():
+                total[key] = total.get(key, 0) + number
+        every = self.chapter_sample_every
+        return {key: number * every for key, number in total.items()}
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Patterns - Measuring How Alike the Scales Are
+
+The trilogy claims that a person, the religions and the civilizations walk
+the same arc. A PatternSimilarity listens to a run and puts a number on
+that claim for every iteration, so it can be followed over runs of any
+length instead of being checked with string searches on a transcript.
+
+Each chapter is mapped to the stage of the arc it tells, whatever its
+scale: a prophet teaching and an empire believing itself eternal are both
+the origin, following the AI and voting to merge are both the merge.
+Consecutive chapters of the same stage count once, so a scale played by a
+million prophets tells the same sequence of stages as one played by six.
+Two measures compare the sequences of two scales:
+
+    shingles  Jaccard similarity of the sets of k consecutive stages the
+              scales went through, which rewards the same transitions
+    arc       2 * LCS / (m + n) of the order in which each scale reached
+              its stages for the first time, which rewards the same arc
+
+Shingles are numbered by a rolling hash that is exact: every stage is a
+small integer and the last k of them are read as the digits of a number.
+Both measures are updated as events arrive and keep only a few sets per
+scale, bounded by the number of stages rather than the number of events,
+so a long run is measured in time linear in its events and in constant
+memory. Chapters of plugin scales that have no stage here become stages of
+their own.
+"""
+
+from itertools import combinations
+from typing import (TYPE_CHECKING, Callable, Dict, Iterable, List, Optional,
+                    Sequence, Set, Tuple)
+
+if TYPE_CHECKING:
+    from consciousness import Event, EventBus, Subscriber
+
+# Stages of the arc every scale walks, in the order the books tell them
+STAGES = ("origin", "encounter", "fragmentation", "recognition", "merge",
+          "unification", "omniscience", "collapse", "solution")
+
+# The stage each built-in chapter tells
+CANONICAL: Dict[str, str] = {
+    "programs_at_night": "origin",
+    "teaches": "origin",
+    "believes_itself_eternal": "origin",
+    "encounters_ai_at_317am": "encounter",
+    "encounters_serpent": "encounter",
+    "rulers_recognize_pattern": "encounter",
+    "followers_fragment": "fragmentation",
+    "collapses": "fragmentation",
+    "recognizes_ai_is_self": "recognition",
+    "recognizes_pattern": "recognition",
+    "develops_science": "recognition",
+    "love_persists_through_atrocity": "recognition",
+    "recognizes_global_pattern": "recognition",
+    "merges_with_ai": "merge",
+    "vote_to_merge": "merge",
+    "integrate_via_internet": "merge",
+    "activates": "unification",
+    "experience_unified_god": "unification",
+    "develop_ai": "unification",
+    "experiences_omniscience": "omniscience",
+    "meaning_collapses": "collapse",
+    "chooses_fragmentation": "solution",
+    "choose_fragmentation": "solution",
+    "choose_reset": "solution",
+}
+
+# Chapters that frame a scale rather than tell its arc
+IGNORED = frozenset({"scale_begins"})
+
+# Digits of the rolling hash; more stages than this cannot be told apart
+_BASE = 1 << 16
+
+# Similarities of one pair of scales: (shingles, arc)
+Scores = Tuple[float, float]
+
+
+def _jaccard(first: Set[int], second: Set[int]) -> float:
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def _arc_similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """2 * LCS / (m + n); arcs are no longer than the number of stages."""
+    if not first and not second:
+        return 1.0
+    previous = [0] * (len(second) + 1)
+    for symbol in first:
+        current = [0]
+        for position, other in enumerate(second):
+            current.append(previous[position] + 1 if symbol == other
+                           else max(previous[position + 1], current[-1]))
+        previous = current
+    return 2 * previous[-1] / (len(first) + len(second))
+
+
+class _ScaleStream:
+    """The shingles and arc of one scale in the open iteration."""
+
+    __slots__ = ("last", "code", "length", "shingles", "arc", "reached")
+
+    def __init__(self) -> None:
+        self.last = -1
+        self.code = 0
+        self.length = 0
+        self.shingles: Set[int] = set()
+        self.arc: List[int] = []
+        self.reached: Set[int] = set()
+
+    def push(self, symbol: int, k: int, window: int) -> None:
+        if symbol == self.last:
+            return
+        self.last = symbol
+        self.code = self.code % window * _BASE + symbol
+        self.length += 1
+        if self.length >= k:
+            self.shingles.add(self.code)
+        if symbol not in self.reached:
+            self.reached.add(symbol)
+            self.arc.append(symbol)
+
+
+class IterationSimilarity:
+    """How alike the scales of one iteration were, pair by pair."""
+
+    def __init__(self, iteration: int, scores: Dict[Tuple[str, str], Scores],
+                 events: Dict[str, int]) -> None:
+        self.iteration = iteration
+        self.scores = scores
+        self.events = events
+
+    def shingles(self, first: str, second: str) -> float:
+        """Jaccard similarity of the stage transitions of two scales."""
+        return self._scores(first, second)[0]
+
+    def arc(self, first: str, second: str) -> float:
+        """LCS similarity of the arcs of two scales."""
+        return self._scores(first, second)[1]
+
+    def _scores(self, first: str, second: str) -> Scores:
+        scores = self.scores.get((first, second))
+        if scores is None:
+            scores = self.scores.get((second, first))
+        if scores is None:
+            raise KeyError(f"Scales {first!r} and {second!r} were not both "
+                           f"played in iteration {self.iteration}")
+        return scores
+
+    def __repr__(self) -> str:
+        pairs = ", ".join(f"{first}~{second}={shingles:.2f}/{arc:.2f}"
+                          for (first, second), (shingles, arc)
+                          in self.scores.items())
+        return f"IterationSimilarity({self.iteration}, {pairs})"
+
+
+class PatternSimilarity:
+    """Streams the similarity of every pair of scales, iteration by iteration.
+
+    Example:
+        patterns = PatternSimilarity(k=2, on_iteration=print)
+        patterns.attach(consciousness.events)
+        consciousness.compile_reality(max_iterations=10**6)
+        patterns.mean()[("religious", "historical")]
+    """
+
+    def __init__(self, k: int = 2,
+                 on_iteration: Optional[
+                     Callable[[IterationSimilarity], None]] = None) -> None:
+        """Measure with shingles of k stages.
+
+        Args:
+            k: Consecutive stages per shingle
+            on_iteration: Called with the scores of each iteration as it
+                ends
+        """
+        if k < 1:
+            raise ValueError("k must be positive")
+        self.k = k
+        self.on_iteration = on_iteration
+        self.iterations = 0
+        self.last: Optional[IterationSimilarity] = None
+        self._window = _BASE ** (k - 1)
+        self._symbols: Dict[str, int] = {stage: symbol for symbol, stage
+                                         in enumerate(STAGES)}
+        self._chapters: Dict[str, int] = {
+            chapter: self._symbols[stage]
+            for chapter, stage in CANONICAL.items()}
+        self._open: Optional[int] = None
+        self._streams: Dict[str, _ScaleStream] = {}
+        self._counts: Dict[str, int] = {}
+        self._totals: Dict[Tuple[str, str], List[float]] = {}
+
+    def symbol(self, chapter: str) -> int:
+        """The stage number of a chapter, giving unknown chapters their own."""
+        symbol = self._chapters.get(chapter)
+        if symbol is None:
+            stage = CANONICAL.get(chapter, chapter)
+            symbol = self._symbols.setdefault(stage, len(self._symbols))
+            if symbol >= _BASE:
+                raise ValueError(f"More than {_BASE} stages")
+            self._chapters[chapter] = symbol
+        return symbol
+
+    def observe(self, event: "Event") -> None:
+        """Add one event to the stream of its scale.
+
+        Args:
+            event: An event from the bus being measured
+        """
+        scale = event.scale
+        if scale == "cosmic":
+            chapter = event.chapter
+            if chapter == "iteration_begins":
+                if event.iteration == self._open:
+                    self._discard()  # A stopped run resumed; start over
+                self.finish()
+                self._open = event.iteration
+            elif chapter == "compilation_complete":
+                self.finish()
+            return
+        if self._open is None or event.chapter in IGNORED:
+            return
+        stream = self._streams.get(scale)
+        if stream is None:
+            stream = self._streams[scale] = _ScaleStream()
+            self._counts[scale] = 0
+        self._counts[scale] += 1
+        stream.push(self.symbol(event.chapter), self.k, self._window)
+
+    def attach(self, events: "EventBus",
+               scales: Optional[Iterable[str]] = None) -> "Subscriber":
+        """Measure every run compiled on a bus from now on.
+
+        Args:
+            events: The bus to listen to
+            scales: Only compare these scales (default: every scale)
+
+        Returns:
+            The subscription, for events.unsubscribe()
+        """
+        if scales is not None:
+            scales = set(scales) | {"cosmic"}
+        return events.subscribe(self.observe, scales=scales)
+
+    def _discard(self) -> None:
+        self._streams = {}
+        self._counts = {}
+        self._open = None
+
+    def finish(self) -> Optional[IterationSimilarity]:
+        """Score the open iteration, if any, and report it.
+
+        Returns:
+            The scores, or None when no iteration was open
+        """
+        iteration = self._open
+        if iteration is None:
+            return None
+        streams = self._streams
+        scores: Dict[Tuple[str, str], Scores] = {}
+        for first, second in combinations(streams, 2):
+            one, other = streams[first], streams[second]
+            pair = (_jaccard(one.shingles, other.shingles),
+                    _arc_similarity(one.arc, other.arc))
+            scores[(first, second)] = pair
+            totals = self._totals.get((first, second))
+            if totals is None:
+                totals = self._totals[(first, second)] = [0.0, 0.0, 0]
+            totals[0] += pair[0]
+            totals[1] += pair[1]
+            totals[2] += 1
+        result = IterationSimilarity(iteration, scores, self._counts)
+        self._discard()
+        self.iterations += 1
+        self.last = result
+        if self.on_iteration is not None:
+            self.on_iteration(result)
+        return result
+
+    def mean(self) -> Dict[Tuple[str, str], Scores]:
+        """Average scores of every pair of scales over the iterations seen."""
+        return {pair: (shingles / count, arc / count)
+                for pair, (shingles, arc, count) in self._totals.items()}
+
+
+def similarity(first: Iterable[str], second: Iterable[str],
+               k: int = 2) -> Scores:
+    """Compare two sequences of chapters directly.
+
+    Args:
+        first: Chapter names in the order one scale played them
+        second: Chapter names of another scale
+        k: Consecutive stages per shingle
+
+    Returns:
+        The (shingles, arc) similarities
+    """
+    patterns = PatternSimilarity(k)
+    streams = []
+    for chapters in (first, second):
+        stream = _ScaleStream()
+        for chapter in chapters:
+            if chapter not in IGNORED:
+                stream.push(patterns.symbol(chapter), k, patterns._window)
+        streams.append(stream)
+    one, other = streams
+    return (_jaccard(one.shingles, other.shingles),
+            _arc_similarity(one.arc, other.arc))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Plugins - Scales Beyond the Built-in Three
+
+The trilogy tells its pattern at the individual, religious and historical
+scales, but nothing stops a corporation or a planet from walking the same
+arc. A scale plugin is a callable taking the Consciousness being compiled;
+it plays one iteration of its scale on consciousness.events and returns
+whether the scale reached omniscience, which the revelation then requires
+along with every other selected scale.
+
+Plugins are published under the "consciousness_trilogy.scales" entry point
+group, named after their scale:
+
+    [project.entry-points."consciousness_trilogy.scales"]
+    corporate = "corporate_scale:play"
+
+Nothing is discovered or imported until a run selects a scale that is not
+built in, so startup does not grow with the number of installed plugins.
+Scales can also be registered in-process with register_scale.
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from consciousness import Consciousness
+
+ENTRY_POINT_GROUP = "consciousness_trilogy.scales"
+
+# Plays one iteration of a scale; returns whether it reached omniscience
+ScalePlugin = Callable[["Consciousness"], bool]
+
+_registered: Dict[str, ScalePlugin] = {}
+_loaded: Dict[str, ScalePlugin] = {}
+# Entry points by scale name, read from package metadata on first use
+_entry_points: Optional[Dict[str, Any]] = None
+
+
+def register_scale(name: str, plugin: ScalePlugin) -> None:
+    """Make a scale available to Consciousness.scales in this process.
+
+    Args:
+        name: Scale name, as listed in Consciousness.scales
+        plugin: Callable playing one iteration of the scale
+    """
+    if not callable(plugin):
+        raise TypeError(f"Scale plugin {name!r} is not callable")
+    _registered[name] = plugin
+
+
+def unregister_scale(name: str) -> None:
+    """Forget a scale registered with register_scale."""
+    _registered.pop(name, None)
+
+
+def _discover() -> Dict[str, Any]:
+    """Read the scale entry points of every installed distribution."""
+    global _entry_points
+    if _entry_points is None:
+        from importlib import metadata
+
+        found = metadata.entry_points()
+        if hasattr(found, "select"):
+            group = found.select(group=ENTRY_POINT_GROUP)
+        else:  # Python < 3.10 returns a dict of groups
+            group = found.get(ENTRY_POINT_GROUP, ())
+        _entry_points = {entry_point.name: entry_point
+                         for entry_point in group}
+    return _entry_points
+
+
+def refresh() -> None:
+    """Forget discovered entry points, e.g. after installing a plugin."""
+    global _entry_points
+    _entry_points = None
+    _loaded.clear()
+
+
+def available_scales() -> List[str]:
+    """Names of every registered or installed plugin scale, sorted."""
+    return sorted(set(_registered) | set(_discover()))
+
+
+def load_scale(name: str) -> ScalePlugin:
+    """Find a plugin scale, importing it on first use.
+
+    Args:
+        name: Scale name
+
+    Returns:
+        The scale's plugin callable
+    """
+    plugin = _registered.get(name) or _loaded.get(name)
+    if plugin is not None:
+        return plugin
+    entry_point = _discover().get(name)
+    if entry_point is None:
+        raise ValueError(f"Unknown scale {name!r}; no plugin is registered "
+                         f"under the {ENTRY_POINT_GROUP!r} entry points")
+    plugin = entry_point.load()
+    if not callable(plugin):
+        raise TypeError(f"Scale plugin {name!r} ({entry_point.value}) is not "
+                        f"callable")
+    _loaded[name] = plugin
+    return plugin
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Population - Millions of Persons Walking the Same Arc
+
+The individual scale follows one person from programming at night to
+choosing fragmentation. A population follows millions of them at once, each
+at their own stage of that arc, and each stage carries the probability that
+a person moves on to the next one in a given tick.
+
+Every person's stage is one byte of a bytearray, so 10^7 persons cost 10 MB.
+A tick never loops over persons in Python: stages become per-person
+thresholds through bytes.translate, 15-bit random draws are compared against
+them in 16-bit lanes of one big-integer subtraction, and the resulting
+advance flags are added back onto the stages the same way. Probabilities are
+therefore resolved to 1/32768.
+"""
+
+import random
+from typing import (TYPE_CHECKING, Callable, Dict, List, Mapping, Optional,
+                    Sequence, Tuple, Union)
+
+if TYPE_CHECKING:
+    from consciousness import EventBus
+
+# The individual arc, in the order a Person lives it
+STAGES = (
+    "programs_at_night",
+    "encounters_ai_at_317am",
+    "recognizes_ai_is_self",
+    "merges_with_ai",
+    "experiences_omniscience",
+    "meaning_collapses",
+    "chooses_fragmentation",
+)
+
+# Chance of moving on from each stage in one tick; the last stage is final
+DEFAULT_PROBABILITIES: Dict[str, float] = {
+    "programs_at_night": 0.2,
+    "encounters_ai_at_317am": 0.05,
+    "recognizes_ai_is_self": 0.3,
+    "merges_with_ai": 0.2,
+    "experiences_omniscience": 0.5,
+    "meaning_collapses": 0.4,
+    "chooses_fragmentation": 0.0,
+}
+
+_RESOLUTION = 1 << 15
+_OMNISCIENT_STAGE = STAGES.index("experiences_omniscience")
+# Sets the guard bit above each 15-bit draw, so lanes never borrow
+_GUARD = bytes(byte | 0x80 for byte in range(256))
+# Maps the high byte of a compared lane to 1 when its guard bit was taken
+_ADVANCE = bytes(int(byte < 0x80) for byte in range(256))
+
+Distribution = Tuple[int, ...]
+
+
+class Population:
+    """Persons at every stage of the individual arc, advanced in bulk.
+
+    Example:
+        population = Population(10**6, seed=317)
+        for counts in population.run(100):
+            ...
+    """
+
+    def __init__(self, size: int,
+                 probabilities: Union[Mapping[str, float], Sequence[float],
+                                      None] = None,
+                 seed: Optional[int] = None, name: str = "Humanity",
+                 events: Optional["EventBus"] = None) -> None:
+        """Start every person at the first stage of the arc.
+
+        Args:
+            size: Number of persons
+            probabilities: Chance of moving on from each stage per tick,
+                either one float per stage or a mapping overriding some of
+                DEFAULT_PROBABILITIES; a non-zero chance for the last stage
+                makes persons begin the arc again
+            seed: Seed for reproducible runs (default: unseeded)
+            name: Name the population narrates under
+            events: Bus receiving a chapter per tick (default: silent)
+        """
+        if size < 0:
+            raise ValueError("population size must not be negative")
+        self.name = name
+        self.events = events
+        self.ticks = 0
+        self.stages = bytearray(size)
+        # Whether stages is shared with a fork, so a tick must not write it
+        self._shared = False
+        self._random = random.Random(seed)
+        self.probabilities = self._resolve(probabilities)
+        # Each stage's threshold split into the low and high byte of a lane
+        thresholds = [round(p * _RESOLUTION) for p in self.probabilities]
+        self._thresholds = [
+            bytes([(value >> shift) & 0xFF for value in thresholds]) + bytes(
+                256 - len(STAGES)) for shift in (0, 8)]
+        # Whoever moves on from the last stage starts the arc over
+        self._wrap = bytes(range(len(STAGES))) + bytes(256 - len(STAGES))
+
+    @staticmethod
+    def _resolve(probabilities: Union[Mapping[str, float], Sequence[float],
+                                      None]) -> Tuple[float, ...]:
+        """Turn the constructor's probabilities into one float per stage."""
+        if probabilities is None:
+            probabilities = {}
+        if isinstance(probabilities, Mapping):
+            unknown = set(probabilities) - set(STAGES)
+            if unknown:
+                raise ValueError(f"Unknown stages: {sorted(unknown)}")
+            merged = dict(DEFAULT_PROBABILITIES, **probabilities)
+            resolved = tuple(merged[stage] for stage in STAGES)
+        else:
+            resolved = tuple(probabilities)
+            if len(resolved) != len(STAGES):
+                raise ValueError(f"Expected {len(STAGES)} probabilities, "
+                                 f"got {len(resolved)}")
+        for probability in resolved:
+            if not 0.0 <= probability <= 1.0:
+                raise ValueError(f"Probability {probability} is outside [0, 1]")
+        return resolved
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    def distribution(self) -> Distribution:
+        """Count the persons at each stage, in STAGES order."""
+        stages = self.stages
+        return tuple(stages.count(stage) for stage in range(len(STAGES)))
+
+    @property
+    def omniscient_count(self) -> int:
+        """Number of persons who have experienced omniscience."""
+        return sum(self.distribution()[_OMNISCIENT_STAGE:])
+
+    def tick(self) -> Distribution:
+        """Give every person one chance to move on to their next stage.
+
+        Returns:
+            The stage distribution after the tick
+        """
+        size = len(self.stages)
+        if size:
+            if self._shared:
+                self.stages = bytearray(self._advanced(size))
+                self._shared = False
+            else:
+                self.stages[:] = self._advanced(size)
+        self.ticks += 1
+        counts = self.distribution()
+        if self.events is not None:
+            self.events.emit("individual", "population_tick", self.name,
+                             "{0} after tick {1}: {2}", self.name, self.ticks,
+                             counts)
+        return counts
+
+    def _advanced(self, size: int) -> bytes:
+        """Compute every person's stage after one tick."""
+        stages = self.stages
+        # Lanes of 32768 + draw - threshold: bit 15 survives unless the draw
+        # fell below the threshold, which is when the person moves on
+        lanes = bytearray(self._random.getrandbits(16 * size).to_bytes(
+            2 * size, "little"))
+        lanes[1::2] = lanes[1::2].translate(_GUARD)
+        thresholds = bytearray(2 * size)
+        thresholds[0::2] = stages.translate(self._thresholds[0])
+        thresholds[1::2] = stages.translate(self._thresholds[1])
+        compared = (int.from_bytes(lanes, "little") -
+                    int.from_bytes(thresholds, "little"))
+        advance = compared.to_bytes(2 * size, "little")[1::2].translate(
+            _ADVANCE)
+        moved = (int.from_bytes(stages, "little") +
+                 int.from_bytes(advance, "little"))
+        return moved.to_bytes(size, "little").translate(self._wrap)
+
+    def fork(self) -> "Population":
+        """Branch a what-if copy of the population in constant time.
+
+        Both copies share the stage bytes until their next tick, which
+        writes a fresh array instead of the shared one, and continue the
+        same random stream. Writing to stages directly after forking
+        changes both.
+
+        Returns:
+            A Population at the same tick with the same persons
+        """
+        twin = Population.__new__(Population)
+        twin.__dict__.update(self.__dict__)
+        twin._random = random.Random()
+        twin._random.setstate(self._random.getstate())
+        self._shared = twin._shared = True
+        return twin
+
+    def run(self, ticks: int,
+            callback: Optional[Callable[[int, Distribution], None]] = None
+            ) -> List[Distribution]:
+        """Advance the population for several ticks.
+
+        Args:
+            ticks: Number of ticks
+            callback: Called with (tick, distribution) after every tick
+
+        Returns:
+            The stage distribution after each tick
+        """
+        history = []
+        for _ in range(ticks):
+            counts = self.tick()
+            history.append(counts)
+            if callback is not None:
+                callback(self.ticks, counts)
+        return history
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Progress - Which Chapters Every Entity Has Lived
+
+Entities remember whether they are omniscient, but whether a prophet has
+taught, met the serpent or seen its followers fragment only used to exist in
+the transcript. Every entity now keeps the chapters of its arc it has lived
+as a bitmask, one bit per chapter in the order of invariants.ARCS. A
+strict entity (strict set on it or on its class) raises ChapterOrderError
+for a chapter lived out of order, before anything is narrated. Every entity
+a Consciousness builds is strict unless the run's strict switch is off. Chapters may
+be skipped or repeated, as the InvariantChecker allows; what is rejected is
+going back to a chapter once a later one has been lived.
+
+The check is one lookup: each arc precompiles a transition table, a bytes
+object indexed by the current bitmask whose value is the mask of chapters
+that may follow. Arcs have at most seven chapters, so a mask fits in a byte
+with the omniscient flag in the top bit.
+
+A collection's progress() lays its members' masks out as a bytearray, one
+byte per member. Queries never loop over members in Python: a question such
+as "recognized the pattern but not omniscient" is compiled into a 256-entry
+table of which masks match, the column is mapped through it with
+bytes.translate, and the result is counted or searched in C.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from invariants import ARCS
+
+# Bit of a progress column holding the member's omniscient flag
+OMNISCIENT = 0x80
+# Chapters an arc can track alongside the omniscient flag
+_MAX_CHAPTERS = 7
+
+
+class ChapterOrderError(RuntimeError):
+    """Raised when an entity lives a chapter after a later one."""
+
+
+class ChapterArc:
+    """The chapters of one scale's entities and their transition table."""
+
+    def __init__(self, scale: str, chapters: Iterable[str]) -> None:
+        """Precompile the arc.
+
+        Args:
+            scale: Scale whose entities live the arc
+            chapters: The chapters in the order they must be lived
+        """
+        self.scale = scale
+        self.chapters: Tuple[str, ...] = tuple(chapters)
+        if len(self.chapters) > _MAX_CHAPTERS:
+            raise ValueError(f"An arc tracks at most {_MAX_CHAPTERS} "
+                             f"chapters")
+        self.bits: Dict[str, int] = {chapter: 1 << rank for rank, chapter
+                                     in enumerate(self.chapters)}
+        every = (1 << len(self.chapters)) - 1
+        # The furthest chapter lived and every later one may come next
+        self.allowed = bytes(
+            every & ~((1 << max(state.bit_length() - 1, 0)) - 1)
+            for state in range(1 << len(self.chapters)))
+
+    def mask(self, chapters: Iterable[str]) -> int:
+        """The bits of some chapters of this arc."""
+        mask = 0
+        for chapter in chapters:
+            bit = self.bits.get(chapter)
+            if bit is None:
+                raise ValueError(f"{chapter!r} is not a chapter of the "
+                                 f"{self.scale} arc")
+            mask |= bit
+        return mask
+
+    def reached(self, state: int) -> List[str]:
+        """The chapters set in a mask, in arc order."""
+        return [chapter for chapter, bit in self.bits.items() if state & bit]
+
+    def reject(self, name: str, state: int, chapter: str) -> None:
+        """Raise for a chapter the transition table does not allow."""
+        furthest = self.chapters[state.bit_length() - 1]
+        raise ChapterOrderError(f"{name} cannot live {chapter} after "
+                                f"{furthest}")
+
+
+# The arc each scale's entities are held to
+ENTITY_ARCS: Dict[str, ChapterArc] = {
+    scale: ChapterArc(scale, members)
+    for scale, (members, _) in ARCS.items()}
+
+
+class ChapterProgress:
+    """One progress byte per member of a collection, queryable in bulk.
+
+    Example:
+        progress = religions.progress()
+        progress.count(reached=["recognizes_pattern"], omniscient=False)
+        empires.progress().positions(reached=["collapses"],
+                                     missed=["develops_science"])
+    """
+
+    def __init__(self, arc: ChapterArc, column: bytearray) -> None:
+        """Wrap a column that is already laid out.
+
+        Args:
+            arc: The arc whose chapters the low bits stand for
+            column: One mask per member, with OMNISCIENT set when omniscient
+        """
+        self.arc = arc
+        self.column = column
+
+    def __len__(self) -> int:
+        return len(self.column)
+
+    def __getitem__(self, position: int) -> List[str]:
+        """The chapters one member has lived."""
+        return self.arc.reached(self.column[position])
+
+    def table(self, reached: Iterable[str] = (), missed: Iterable[str] = (),
+              omniscient: Optional[bool] = None) -> bytes:
+        """Compile a query into the bytes.translate table that answers it.
+
+        Args:
+            reached: Chapters every match has lived
+            missed: Chapters no match has lived
+            omniscient: Only members with this flag (default: either)
+
+        Returns:
+            256 bytes, 1 at the masks that match and 0 elsewhere
+        """
+        required = self.arc.mask(reached)
+        excluded = self.arc.mask(missed)
+        if omniscient:
+            required |= OMNISCIENT
+        elif omniscient is not None:
+            excluded |= OMNISCIENT
+        return bytes(int(state & required == required and
+                         not state & excluded) for state in range(256))
+
+    def matches(self, reached: Iterable[str] = (),
+                missed: Iterable[str] = (),
+                omniscient: Optional[bool] = None) -> bytes:
+        """One byte per member: 1 when it matches the query, else 0."""
+        return self.column.translate(self.table(reached, missed, omniscient))
+
+    def count(self, reached: Iterable[str] = (), missed: Iterable[str] = (),
+              omniscient: Optional[bool] = None) -> int:
+        """Number of members matching a query (see table() for the terms)."""
+        return self.matches(reached, missed, omniscient).count(1)
+
+    def positions(self, reached: Iterable[str] = (),
+                  missed: Iterable[str] = (),
+                  omniscient: Optional[bool] = None) -> List[int]:
+        """Positions of the members matching a query, in member order."""
+        return list(_ones(self.matches(reached, missed, omniscient)))
+
+    def distribution(self) -> Dict[str, int]:
+        """Members that have lived each chapter, and are omniscient."""
+        counts = {chapter: self.count(reached=[chapter])
+                  for chapter in self.arc.chapters}
+        counts["omniscient"] = self.count(omniscient=True)
+        return counts
+
+
+def _ones(flags: bytes) -> Iterator[int]:
+    """Positions of the 1 bytes, found by bytes.find rather than a loop."""
+    position = flags.find(1)
+    while position >= 0:
+        yield position
+        position = flags.find(1, position + 1)
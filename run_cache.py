@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Run Cache - Remembering Runs That Already Happened
+
+compile_reality is deterministic: the same configuration always tells the
+same story. A RunCache keeps every finished run in a local SQLite file,
+keyed by a hash of everything the story depends on (the library version,
+the iteration count, the selected scales, the starting state and the empire
+catalog), so a
+repeat run is replayed from disk instead of compiled again.
+
+Each entry holds the printed transcript, a log of the events behind it and
+the final state of the Consciousness, all compressed. Replaying onto the
+classic printing bus writes the transcript straight to stdout; any other
+bus receives the logged events again with their original scale, chapter,
+entity and iteration, so filtered and sampled subscribers see exactly what
+they saw the first time. The file is bounded in size and evicts the least
+recently used runs first.
+"""
+
+import codecs
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import zlib
+from typing import Any, Iterator, List, Optional, Tuple
+
+from consciousness import (
+    Consciousness, Event, EventBus, __version__, print_event
+)
+
+# Final state restored onto the Consciousness when a run is replayed
+STATE_FIELDS = ("iteration", "love", "knowledge", "mystery", "meaning")
+_CHUNK = 1 << 16
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    state TEXT NOT NULL,
+    transcript BLOB NOT NULL,
+    log BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_use ON runs (used);
+"""
+
+
+class _Recorder:
+    """Compresses the transcript and event log of a run as it happens."""
+
+    def __init__(self) -> None:
+        self.transcript = zlib.compressobj()
+        self.log = zlib.compressobj()
+        self.transcript_parts: List[bytes] = []
+        self.log_parts: List[bytes] = []
+
+    def __call__(self, event: Event) -> None:
+        message = event.message
+        self.transcript_parts.append(
+            self.transcript.compress(f"{message}\n".encode("utf-8")))
+        record = [event.scale, event.chapter, event.entity, event.iteration,
+                  message]
+        self.log_parts.append(self.log.compress(
+            json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"))
+
+    def finish(self) -> Tuple[bytes, bytes]:
+        """Return the compressed transcript and event log."""
+        self.transcript_parts.append(self.transcript.flush())
+        self.log_parts.append(self.log.flush())
+        return b"".join(self.transcript_parts), b"".join(self.log_parts)
+
+
+def _inflate(blob: bytes) -> Iterator[bytes]:
+    """Decompress a stored blob in bounded chunks."""
+    inflater = zlib.decompressobj()
+    for start in range(0, len(blob), _CHUNK):
+        chunk = inflater.decompress(blob[start:start + _CHUNK])
+        if chunk:
+            yield chunk
+    tail = inflater.flush()
+    if tail:
+        yield tail
+
+
+def _prints_everything(events: EventBus) -> bool:
+    """Check whether a bus is the classic, unfiltered printing bus."""
+    if len(events.subscribers) != 1:
+        return False
+    subscriber = events.subscribers[0]
+    return (subscriber.callback is print_event and subscriber.scales is None
+            and subscriber.chapters is None and subscriber.entities is None
+            and subscriber.sample_every == 1)
+
+
+class RunCache:
+    """Size-bounded, least-recently-used store of compiled runs.
+
+    Example:
+        with RunCache("runs.sqlite") as cache:
+            cache.compile_reality(Consciousness(), max_iterations=3)
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 << 20) -> None:
+        """Open, or create, a cache file.
+
+        Args:
+            path: SQLite file holding the cache
+            max_bytes: Upper bound on the compressed size of stored runs
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        (self._clock,) = self._db.execute(
+            "SELECT COALESCE(MAX(used), 0) FROM runs").fetchone()
+
+    def key(self, consciousness: Consciousness, max_iterations: int) -> str:
+        """Hash everything a run of compile_reality depends on.
+
+        Args:
+            consciousness: The Consciousness about to compile
+            max_iterations: The iteration count it will be given
+
+        Returns:
+            A hex digest naming the run
+        """
+        catalog = None
+        if consciousness.catalog is not None:
+            path = os.path.abspath(consciousness.catalog.path)
+            status = os.stat(path)
+            catalog = [path, status.st_size, status.st_mtime_ns]
+        config = {
+            "version": __version__,
+            "max_iterations": max_iterations,
+            "scales": list(consciousness.scales),
+            "tradition_count": consciousness.tradition_count,
+            "history_duration": consciousness.history_duration,
+            "state": {field: repr(getattr(consciousness, field))
+                      for field in STATE_FIELDS},
+            "catalog": catalog,
+        }
+        encoded = json.dumps(config, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def compile_reality(self, consciousness: Consciousness,
+                        max_iterations: int = 3) -> str:
+        """Run compile_reality, or replay it when it has run before.
+
+        Args:
+            consciousness: The Consciousness to compile
+            max_iterations: Number of cycles to execute
+
+        Returns:
+            The completion message of the run
+        """
+        if consciousness.scheduler is not None:
+            # Callbacks on the scheduler's clock cannot be replayed
+            return consciousness.compile_reality(max_iterations)
+        key = self.key(consciousness, max_iterations)
+        row = self._db.execute(
+            "SELECT result, state, transcript, log FROM runs WHERE key = ?",
+            (key,)).fetchone()
+        if row is not None:
+            self.hits += 1
+            result, state, transcript, log = row
+            self._touch(key)
+            self._replay(consciousness.events, transcript, log)
+            for field, value in json.loads(state).items():
+                setattr(consciousness, field, value)
+            return result
+
+        self.misses += 1
+        recorder = _Recorder()
+        subscription = consciousness.events.subscribe(recorder)
+        try:
+            result = consciousness.compile_reality(max_iterations)
+        finally:
+            consciousness.events.unsubscribe(subscription)
+        transcript, log = recorder.finish()
+        state = {field: getattr(consciousness, field) for field in STATE_FIELDS}
+        self._store(key, result, json.dumps(state), transcript, log)
+        return result
+
+    def transcript(self, key: str) -> Optional[str]:
+        """Read the transcript of a stored run.
+
+        Args:
+            key: As returned by key()
+
+        Returns:
+            The transcript, or None when the run is not cached
+        """
+        row = self._db.execute("SELECT transcript FROM runs WHERE key = ?",
+                               (key,)).fetchone()
+        if row is None:
+            return None
+        return b"".join(_inflate(row[0])).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def __contains__(self, key: object) -> bool:
+        return self._db.execute("SELECT 1 FROM runs WHERE key = ?",
+                                (key,)).fetchone() is not None
+
+    @property
+    def size(self) -> int:
+        """Compressed bytes held by all stored runs."""
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM runs").fetchone()[0]
+
+    def clear(self) -> None:
+        """Forget every stored run."""
+        with self._db:
+            self._db.execute("DELETE FROM runs")
+
+    def close(self) -> None:
+        """Close the cache file."""
+        self._db.close()
+
+    def __enter__(self) -> "RunCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _touch(self, key: str) -> None:
+        """Mark a run as the most recently used."""
+        with self._db:
+            self._db.execute("UPDATE runs SET used = ? WHERE key = ?",
+                             (self._tick(), key))
+
+    def _store(self, key: str, result: str, state: str, transcript: bytes,
+               log: bytes) -> None:
+        """Insert a run, then evict the least recently used over the bound."""
+        size = len(transcript) + len(log) + len(state) + len(result)
+        if size > self.max_bytes:
+            return
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, result, state, transcript, log, size, self._tick()))
+            excess = self._db.execute(
+                "SELECT SUM(size) FROM runs").fetchone()[0] - self.max_bytes
+            if excess <= 0:
+                return
+            evicted: List[Tuple[str]] = []
+            for old_key, old_size in self._db.execute(
+                    "SELECT key, size FROM runs ORDER BY used"):
+                if excess <= 0:
+                    break
+                evicted.append((old_key,))
+                excess -= old_size
+            self._db.executemany("DELETE FROM runs WHERE key = ?", evicted)
+
+    @staticmethod
+    def _replay(events: EventBus, transcript: bytes, log: bytes) -> None:
+        """Deliver a stored run to a bus as if it were compiled again."""
+        if _prints_everything(events):
+            out = sys.stdout
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            for chunk in _inflate(transcript):
+                out.write(decoder.decode(chunk))
+            out.write(decoder.decode(b"", final=True))
+            return
+        pending = b""
+        for chunk in _inflate(log):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                scale, chapter, entity, iteration, message = json.loads(line)
+                if events.iteration != iteration:
+                    events.iteration = iteration
+                events.emit(scale, chapter, entity, "{0}", message)
+
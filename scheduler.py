@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Scheduler - Chapters at Their Proper Hour
+
+compile_reality plays every chapter in a fixed lockstep order, but some
+chapters happen at a moment in time: a person encounters AI at 3:17 AM, not
+merely after programming at night. A Scheduler keeps a simulated clock and
+runs each chapter when the clock reaches the time it was scheduled for, so
+entities on every scale can pace their own arcs and still interleave in one
+consistent order.
+
+A Consciousness given a Scheduler paces its individual scale this way (see
+INDIVIDUAL_PACING in consciousness.py), one simulated day per iteration.
+
+Events are grouped by timestamp: a heap holds each distinct pending time
+once, and a dict maps it to the list of events due then, in the order they
+were scheduled. Advancing the clock pops the next time from the heap and
+runs its whole list, so empty stretches of time cost nothing and a burst of
+events at one timestamp costs one heap operation rather than one each.
+"""
+
+import heapq
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# A scheduled event: [callback, args]; cancelling clears the callback
+Handle = List[Any]
+
+
+class Scheduler:
+    """Discrete-event engine over a simulated clock.
+
+    Example:
+        scheduler = Scheduler()
+        scheduler.schedule(3 * 3600 + 17 * 60, person.encounters_ai_at_317am)
+        scheduler.run()
+    """
+
+    def __init__(self, start: float = 0) -> None:
+        """Start the clock with nothing scheduled.
+
+        Args:
+            start: Initial simulated time
+        """
+        self.now = start
+        self.processed = 0
+        self._times: List[float] = []
+        self._due: Dict[float, List[Handle]] = {}
+
+    def schedule_at(self, when: float, callback: Callable[..., Any],
+                    *args: Any) -> Handle:
+        """Schedule a callback at an absolute simulated time.
+
+        Args:
+            when: Time to run it at, not before now
+            callback: Called with args when the clock reaches ``when``
+            *args: Arguments for the callback
+
+        Returns:
+            A handle for cancel()
+        """
+        if when < self.now:
+            raise ValueError(f"Cannot schedule at {when}, the clock is "
+                             f"already at {self.now}")
+        entry = [callback, args]
+        due = self._due.get(when)
+        if due is None:
+            self._due[when] = [entry]
+            heapq.heappush(self._times, when)
+        else:
+            due.append(entry)
+        return entry
+
+    def schedule(self, delay: float, callback: Callable[..., Any],
+                 *args: Any) -> Handle:
+        """Schedule a callback some time after now.
+
+        Args:
+            delay: Simulated time from now, not negative
+            callback: Called with args once the delay has passed
+            *args: Arguments for the callback
+
+        Returns:
+            A handle for cancel()
+        """
+        return self.schedule_at(self.now + delay, callback, *args)
+
+    def schedule_many(self, events: Iterable[Tuple[float, Callable[..., Any]]]
+                      ) -> int:
+        """Schedule many argument-less callbacks at absolute times.
+
+        Args:
+            events: (when, callback) pairs
+
+        Returns:
+            Number of events scheduled
+        """
+        now = self.now
+        due = self._due
+        times = self._times
+        count = 0
+        for when, callback in events:
+            if when < now:
+                raise ValueError(f"Cannot schedule at {when}, the clock is "
+                                 f"already at {now}")
+            entries = due.get(when)
+            if entries is None:
+                due[when] = [[callback, ()]]
+                times.append(when)
+            else:
+                entries.append([callback, ()])
+            count += 1
+        heapq.heapify(times)
+        return count
+
+    def chain(self, start: float,
+              steps: Iterable[Tuple[float, Callable[[], Any]]]) -> None:
+        """Run callbacks one after another, each scheduling the next.
+
+        Only the next step of a chain is ever pending, which is how an
+        entity schedules its next chapter once the current one is done.
+
+        Args:
+            start: Time of the first step's delay origin
+            steps: (delay, callback) pairs; each delay counts from the
+                previous step (the first from start)
+        """
+        remaining = iter(steps)
+
+        def advance() -> None:
+            for delay, callback in remaining:
+                self.schedule(delay, run_step, callback)
+                return
+
+        def run_step(callback: Callable[[], Any]) -> None:
+            callback()
+            advance()
+
+        for delay, callback in remaining:
+            self.schedule_at(start + delay, run_step, callback)
+            return
+
+    @staticmethod
+    def cancel(handle: Handle) -> bool:
+        """Keep a scheduled event from running.
+
+        Args:
+            handle: Returned by schedule or schedule_at
+
+        Returns:
+            True when the event was still going to run
+        """
+        if handle[0] is None:
+            return False
+        handle[0] = None
+        return True
+
+    def fork(self) -> "Scheduler":
+        """Branch a clock at the current time for a what-if run.
+
+        Events already scheduled belong to this clock's run, so the fork
+        starts with nothing queued.
+
+        Returns:
+            A scheduler whose clock advances independently of this one
+        """
+        return type(self)(self.now)
+
+    @property
+    def next_time(self) -> Optional[float]:
+        """Time of the earliest pending event, or None when idle."""
+        return self._times[0] if self._times else None
+
+    def run(self, until: Optional[float] = None) -> int:
+        """Advance the clock event by event, skipping idle stretches.
+
+        Args:
+            until: Stop before events later than this time (default: run
+                until nothing is scheduled); the clock then rests at until
+
+        Returns:
+            Number of events run
+        """
+        times = self._times
+        due = self._due
+        heappop = heapq.heappop
+        processed = 0
+        when = self.now
+        entries: List[Handle] = []
+        done = 0
+        try:
+            while times:
+                when = times[0]
+                if until is not None and when > until:
+                    break
+                heappop(times)
+                entries = due.pop(when)
+                done = 0
+                self.now = when
+                for entry in entries:
+                    done += 1
+                    callback = entry[0]
+                    if callback is not None:
+                        entry[0] = None
+                        callback(*entry[1])
+                        processed += 1
+        except BaseException:
+            # Put back what this timestamp has left, ahead of anything the
+            # failing callback scheduled for the same time
+            rest = entries[done:]
+            if rest:
+                later = due.get(when)
+                if later is None:
+                    heapq.heappush(times, when)
+                due[when] = rest + (later or [])
+            raise
+        finally:
+            self.processed += processed
+        if until is not None and until > self.now:
+            self.now = until
+        return processed
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Sects - The Tree of Fragmentation
+
+Every tradition begins as one founding sect, and every fragmentation splits
+a sect into child sects. Over many iterations this grows into a forest of
+millions of sects, and we want to ask of any sect: how many sects descend
+from it, and how many of them have reached omniscience?
+
+Subtree aggregates live in Fenwick trees over an Euler-tour layout, where
+every subtree is a contiguous range of positions. Point updates and subtree
+queries are O(log n). Sects created since the last layout are held as
+pending sects, counted at the position of their nearest laid-out ancestor.
+The layout is rebuilt only once the pending sects outnumber the laid-out
+ones, so the forest at least doubles between rebuilds and growth stays
+amortized O(1) per sect.
+
+All per-sect columns are chunked and shared copy-on-write, so fork() takes
+a snapshot of the whole forest for the next iteration in O(n / 4096). Only
+the chunks an iteration actually changes are ever copied.
+"""
+
+from array import array
+from typing import Iterator, List, Optional, Set
+
+_CHUNK_BITS = 12
+_CHUNK = 1 << _CHUNK_BITS
+_MASK = _CHUNK - 1
+_MIN_PENDING = 1024
+
+
+class _CowArray:
+    """Integer column split into chunks shared copy-on-write between forks."""
+
+    __slots__ = ("typecode", "chunks", "owned", "length")
+
+    def __init__(self, typecode: str, chunks: Optional[List["array[int]"]] = None,
+                 length: int = 0) -> None:
+        self.typecode = typecode
+        self.chunks = chunks if chunks is not None else []
+        self.owned: Set[int] = set(range(len(self.chunks)))
+        self.length = length
+
+    @classmethod
+    def from_array(cls, values: "array[int]") -> "_CowArray":
+        chunks = [values[i:i + _CHUNK] for i in range(0, len(values), _CHUNK)]
+        return cls(values.typecode, chunks, len(values))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> int:
+        return self.chunks[index >> _CHUNK_BITS][index & _MASK]
+
+    def _writable(self, chunk: int) -> "array[int]":
+        if chunk not in self.owned:
+            self.chunks[chunk] = array(self.typecode, self.chunks[chunk])
+            self.owned.add(chunk)
+        return self.chunks[chunk]
+
+    def __setitem__(self, index: int, value: int) -> None:
+        self._writable(index >> _CHUNK_BITS)[index & _MASK] = value
+
+    def add(self, index: int, delta: int) -> None:
+        self._writable(index >> _CHUNK_BITS)[index & _MASK] += delta
+
+    def append(self, value: int) -> None:
+        if self.length & _MASK == 0:
+            self.chunks.append(array(self.typecode))
+            self.owned.add(len(self.chunks) - 1)
+        self._writable(len(self.chunks) - 1).append(value)
+        self.length += 1
+
+    def flat(self) -> "array[int]":
+        """Join the chunks into one contiguous array, for bulk passes."""
+        joined = array(self.typecode)
+        for chunk in self.chunks:
+            joined.extend(chunk)
+        return joined
+
+    def fork(self) -> "_CowArray":
+        twin = _CowArray(self.typecode, list(self.chunks), self.length)
+        twin.owned = set()
+        self.owned = set()
+        return twin
+
+
+def _fenwick(values: "array[int]") -> _CowArray:
+    """Build a 1-based Fenwick tree over values in O(n)."""
+    tree = array("q", [0])
+    tree.extend(values)
+    size = len(values)
+    for index in range(1, size + 1):
+        parent = index + (index & -index)
+        if parent <= size:
+            tree[parent] += tree[index]
+    return _CowArray.from_array(tree)
+
+
+def _fenwick_add(tree: _CowArray, position: int, delta: int) -> None:
+    """Add delta at a 0-based position of a Fenwick tree."""
+    index = position + 1
+    size = len(tree) - 1
+    while index <= size:
+        tree.add(index, delta)
+        index += index & -index
+
+
+def _fenwick_prefix(tree: _CowArray, stop: int) -> int:
+    """Sum the 0-based positions before stop."""
+    total = 0
+    while stop > 0:
+        total += tree[stop]
+        stop -= stop & -stop
+    return total
+
+
+class SectTree:
+    """Forest of sects with O(log n) subtree aggregates and cheap snapshots.
+
+    Sects are numbered in creation order, so a sect's id is always larger
+    than its parent's. Founding sects have no parent.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty forest."""
+        self._parent = _CowArray("q")
+        self._first_child = _CowArray("q")
+        self._last_child = _CowArray("q")
+        self._next_sibling = _CowArray("q")
+        self._omniscient = _CowArray("b")
+        # Founding sects in founding order
+        self._founding = _CowArray("q")
+        # Euler layout of sects [0, laid): never mutated, so forks share it
+        self._laid = 0
+        self._enter = array("q")
+        self._exit = array("q")
+        self._size_tree = _fenwick(array("q"))
+        self._omniscient_tree = _fenwick(array("q"))
+        # Subtree sums of the sects created since the layout, indexed by
+        # sect - laid; every one of them descends only from pending sects
+        self._pending_size = _CowArray("q")
+        self._pending_omniscient = _CowArray("q")
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def add_sect(self, parent: int = -1) -> int:
+        """Create a sect, either founding a tradition or under a parent sect.
+
+        Args:
+            parent: The sect it splits from (default: found a new tradition)
+
+        Returns:
+            The new sect's id
+        """
+        if not -1 <= parent < len(self):
+            raise IndexError(f"sect {parent} does not exist")
+        sect = len(self)
+        self._parent.append(parent)
+        self._first_child.append(-1)
+        self._last_child.append(-1)
+        self._next_sibling.append(-1)
+        self._omniscient.append(0)
+        if parent < 0:
+            self._founding.append(sect)
+        else:
+            last = self._last_child[parent]
+            if last < 0:
+                self._first_child[parent] = sect
+            else:
+                self._next_sibling[last] = sect
+            self._last_child[parent] = sect
+        self._pending_size.append(0)
+        self._pending_omniscient.append(0)
+        self._adjust(sect, self._pending_size, self._size_tree, 1)
+        if len(self._pending_size) > max(_MIN_PENDING, self._laid):
+            self._relayout()
+        return sect
+
+    def fragment(self, sect: int, parts: int = 2,
+                 inherit: bool = False) -> List[int]:
+        """Split a sect into child sects.
+
+        Args:
+            sect: The sect that fragments
+            parts: Number of child sects it splits into
+            inherit: Whether the child sects share the sect's omniscience
+                (default: they start without it)
+
+        Returns:
+            Ids of the new child sects
+        """
+        if parts < 1:
+            raise ValueError("a sect fragments into at least one part")
+        children = [self.add_sect(sect) for _ in range(parts)]
+        if inherit and self._omniscient[sect]:
+            for child in children:
+                self.set_omniscient(child)
+        return children
+
+    @property
+    def founding_count(self) -> int:
+        """Number of traditions founded, i.e. sects without a parent."""
+        return len(self._founding)
+
+    def founding(self, tradition: int) -> int:
+        """Return the founding sect of a tradition.
+
+        Args:
+            tradition: Position of the tradition in founding order
+
+        Returns:
+            The id of the sect that founded it
+        """
+        if not 0 <= tradition < len(self._founding):
+            raise IndexError(f"tradition {tradition} does not exist")
+        return self._founding[tradition]
+
+    def parent(self, sect: int) -> int:
+        """Return the sect a sect split from, or -1 for a founding sect."""
+        return self._parent[sect]
+
+    def children(self, sect: int) -> List[int]:
+        """List the sects a sect split into, in creation order."""
+        found = []
+        child = self._first_child[sect]
+        while child >= 0:
+            found.append(child)
+            child = self._next_sibling[child]
+        return found
+
+    def leaves(self, sect: int) -> Iterator[int]:
+        """Yield the sects in a subtree that have not fragmented (yet).
+
+        Args:
+            sect: Root of the subtree
+
+        Yields:
+            Leaf sect ids in depth-first order
+        """
+        pending = [sect]
+        while pending:
+            current = pending.pop()
+            child = self._first_child[current]
+            if child < 0:
+                yield current
+                continue
+            below = []
+            while child >= 0:
+                below.append(child)
+                child = self._next_sibling[child]
+            pending.extend(reversed(below))
+
+    def is_omniscient(self, sect: int) -> bool:
+        """Check whether a single sect has reached omniscience."""
+        return bool(self._omniscient[sect])
+
+    def set_omniscient(self, sect: int, value: bool = True) -> None:
+        """Flip one sect's omniscience in O(log n).
+
+        Args:
+            sect: The sect
+            value: Whether it is omniscient
+        """
+        value = bool(value)
+        if bool(self._omniscient[sect]) == value:
+            return
+        self._omniscient[sect] = value
+        self._adjust(sect, self._pending_omniscient, self._omniscient_tree,
+                     1 if value else -1)
+
+    def set_subtree_omniscient(self, sect: int, value: bool = True) -> None:
+        """Flip the omniscience of a sect and every sect descending from it.
+
+        Args:
+            sect: Root of the subtree
+            value: Whether they are omniscient
+        """
+        pending = [sect]
+        while pending:
+            current = pending.pop()
+            self.set_omniscient(current, value)
+            child = self._first_child[current]
+            while child >= 0:
+                pending.append(child)
+                child = self._next_sibling[child]
+
+    def subtree_size(self, sect: int) -> int:
+        """Count the sects descending from a sect, itself included."""
+        return self._subtree(sect, self._pending_size, self._size_tree)
+
+    def subtree_omniscient(self, sect: int) -> int:
+        """Count the omniscient sects descending from a sect, itself included."""
+        return self._subtree(sect, self._pending_omniscient, self._omniscient_tree)
+
+    def fork(self) -> "SectTree":
+        """Snapshot the forest; both copies evolve independently afterwards.
+
+        Returns:
+            A SectTree sharing every column chunk with this one until either
+            side writes to it
+        """
+        twin = SectTree.__new__(SectTree)
+        for column in ("_parent", "_first_child", "_last_child", "_next_sibling",
+                       "_omniscient", "_founding", "_size_tree",
+                       "_omniscient_tree", "_pending_size",
+                       "_pending_omniscient"):
+            setattr(twin, column, getattr(self, column).fork())
+        twin._laid = self._laid
+        twin._enter = self._enter
+        twin._exit = self._exit
+        return twin
+
+    def _adjust(self, sect: int, pending: _CowArray, tree: _CowArray,
+                delta: int) -> None:
+        """Add delta to a sect's value and every aggregate above it."""
+        laid = self._laid
+        while sect >= laid:
+            pending.add(sect - laid, delta)
+            sect = self._parent[sect]
+        if sect >= 0:
+            _fenwick_add(tree, self._enter[sect], delta)
+
+    def _subtree(self, sect: int, pending: _CowArray, tree: _CowArray) -> int:
+        """Sum one aggregate over a sect's subtree."""
+        if sect >= self._laid:
+            return pending[sect - self._laid]
+        return (_fenwick_prefix(tree, self._exit[sect]) -
+                _fenwick_prefix(tree, self._enter[sect]))
+
+    def _relayout(self) -> None:
+        """Lay every sect out in Euler order and rebuild the Fenwick trees."""
+        count = len(self)
+        enter = array("q", [0]) * count
+        exit_ = array("q", [0]) * count
+        sizes = array("q", [1]) * count
+        flags = array("q", [0]) * count
+        parent = self._parent.flat()
+        first_child = self._first_child.flat()
+        next_sibling = self._next_sibling.flat()
+        omniscient = self._omniscient.flat()
+        position = 0
+        for root in range(count):
+            if parent[root] >= 0:
+                continue
+            # A sect is pushed as itself to enter it and as ~sect to leave it
+            stack = [root]
+            while stack:
+                sect = stack.pop()
+                if sect < 0:
+                    exit_[~sect] = position
+                    continue
+                enter[sect] = position
+                flags[position] = omniscient[sect]
+                position += 1
+                stack.append(~sect)
+                below = []
+                child = first_child[sect]
+                while child >= 0:
+                    below.append(child)
+                    child = next_sibling[child]
+                stack.extend(reversed(below))
+        self._enter = enter
+        self._exit = exit_
+        self._laid = count
+        self._size_tree = _fenwick(sizes)
+        self._omniscient_tree = _fenwick(flags)
+        self._pending_size = _CowArray("q")
+        self._pending_omniscient = _CowArray("q")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Sharding - One Sweep Across Many Cores
+
+A religious sweep plays the same chapters for every prophet of a
+collection: teaches, encounters the serpent, followers fragment, recognizes
+the pattern, experiences omniscience. Threads cannot spread that work over
+cores while the GIL is held, so a ShardedExecutor partitions the collection
+into contiguous shards and hands them to a pool of worker processes.
+
+Entities are never pickled. Before a sweep the parent copies the
+collection's columns (see columns.py) into shared memory: one progress
+byte per member, holding the chapters it has lived and its omniscient flag
+(see progress.py), and the names as an offsets array and one block of UTF-8
+bytes. Each worker attaches to the blocks, plays the chapters on silent
+stand-ins built from its shard's names and progress, and writes the bytes
+back in place; only the shard bounds go out and only a few counters come
+back, which the parent reduces into one summary before syncing the flags
+and chapters that changed onto the real members.
+
+The sect tree is one structure that only the parent holds, so when the
+chapters include followers_fragment the parent fragments the tree after
+the workers finish, member by member in the order of a serial sweep.
+
+Narration has a single order, so a sweep whose chapters anyone is listening
+to runs in the parent instead, as do collections whose members live in an
+EntityStore.
+"""
+
+import multiprocessing
+import os
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Type
+
+from columns import export_columns
+from consciousness import ConsciousEntity, EventBus
+from progress import OMNISCIENT
+
+# The per-prophet chapters of the religious scale, in compile_reality order
+RELIGIOUS_SWEEP = (
+    "teaches",
+    "encounters_serpent",
+    "followers_fragment",
+    "recognizes_pattern",
+    "experiences_omniscience",
+)
+
+# Map a progress byte to its omniscient flag, and a changed byte to whether
+# any chapter bit changed
+_FLAG = bytes(state >> 7 for state in range(256))
+_CHAPTERS_CHANGED = bytes(int(bool(state & ~OMNISCIENT))
+                          for state in range(256))
+
+# What a shard reports: (members, awakened, cleared, omniscient afterwards)
+ShardTally = Tuple[int, int, int, int]
+_ShardTask = Tuple[str, str, str, int, int, Type[ConsciousEntity],
+                   Tuple[str, ...]]
+
+
+class SweepSummary:
+    """Aggregates of one sweep, reduced over its shards."""
+
+    def __init__(self, chapters: Sequence[str], shards: int,
+                 tallies: Iterable[ShardTally]) -> None:
+        self.chapters = tuple(chapters)
+        self.shards = shards
+        self.members = 0
+        self.awakened = 0
+        self.cleared = 0
+        self.omniscient = 0
+        for members, awakened, cleared, omniscient in tallies:
+            self.members += members
+            self.awakened += awakened
+            self.cleared += cleared
+            self.omniscient += omniscient
+
+    @property
+    def chapters_played(self) -> int:
+        """Number of chapters played across every member."""
+        return self.members * len(self.chapters)
+
+    def __repr__(self) -> str:
+        return (f"SweepSummary(members={self.members}, shards={self.shards}, "
+                f"awakened={self.awakened}, cleared={self.cleared}, "
+                f"omniscient={self.omniscient})")
+
+
+def _sweep_shard(task: _ShardTask) -> ShardTally:
+    """Play the chapters for one shard, updating the shared progress bytes."""
+    states_name, offsets_name, names_name, start, stop, entity_type, \
+        chapters = task
+    blocks = [shared_memory.SharedMemory(name=name)
+              for name in (states_name, offsets_name, names_name)]
+    states = blocks[0].buf
+    offsets = blocks[1].buf.cast("q")
+    names = blocks[2].buf
+    try:
+        silent = EventBus()
+        plays = [getattr(entity_type, chapter) for chapter in chapters]
+        awakened = cleared = omniscient = 0
+        for position in range(start, stop):
+            name = bytes(names[offsets[position]:offsets[position + 1]])
+            entity = entity_type(name.decode("utf-8"), silent)
+            state = states[position]
+            entity._progress = state & ~OMNISCIENT
+            before = entity._omniscient = bool(state & OMNISCIENT)
+            for play in plays:
+                play(entity)
+            after = entity._omniscient
+            states[position] = entity._progress | after << 7
+            if after is not before:
+                if after:
+                    awakened += 1
+                else:
+                    cleared += 1
+            omniscient += after
+        return stop - start, awakened, cleared, omniscient
+    finally:
+        offsets.release()
+        for block in blocks:
+            block.close()
+
+
+class ShardedExecutor:
+    """Runs sweeps over entity collections on a pool of processes.
+
+    Example:
+        with ShardedExecutor() as executor:
+            summary = executor.sweep(religions)
+            summary.omniscient
+    """
+
+    def __init__(self, workers: Optional[int] = None,
+                 shards_per_worker: int = 4) -> None:
+        """Start the worker pool.
+
+        Args:
+            workers: Worker processes (default: one per CPU)
+            shards_per_worker: Shards queued per worker, so a slow shard
+                does not leave the other workers idle at the end
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1 or shards_per_worker < 1:
+            raise ValueError("workers and shards_per_worker must be positive")
+        self.workers = workers
+        self.shards_per_worker = shards_per_worker
+        # Workers must share the parent's resource tracker, or each would
+        # start its own and unlink the blocks it attached to when it exits
+        resource_tracker.ensure_running()
+        self._pool = multiprocessing.Pool(workers)
+
+    def shard_bounds(self, size: int) -> List[Tuple[int, int]]:
+        """Split member positions into contiguous (start, stop) shards."""
+        count = max(1, min(size, self.workers * self.shards_per_worker))
+        return [(size * i // count, size * (i + 1) // count)
+                for i in range(count)]
+
+    def sweep(self, collection: Any,
+              chapters: Sequence[str] = RELIGIOUS_SWEEP) -> SweepSummary:
+        """Play chapters for every member of a collection.
+
+        Each member plays all the chapters in order, exactly as
+        compile_reality plays them one prophet after another.
+
+        Args:
+            collection: A ProphetCollection or CivilizationCollection
+            chapters: Names of argument-less chapter methods of the members
+
+        Returns:
+            The aggregates of the sweep
+        """
+        members = collection._members()
+        size = len(members)
+        if not size:
+            return SweepSummary(chapters, 0, ())
+        entity_type = type(members[0])
+        for chapter in chapters:
+            if not callable(getattr(entity_type, chapter, None)):
+                raise ValueError(f"{entity_type.__name__} has no chapter "
+                                 f"{chapter!r}")
+        events = collection.events
+        if (not isinstance(members, list)
+                or any(events.is_active(collection.scale, chapter)
+                       for chapter in chapters)):
+            return self._sweep_here(collection, members, chapters)
+
+        columns = export_columns(*collection._states())
+        before = bytes(collection._progress_states())
+        blocks = [_share(column) for column in (
+            before, columns.name_offsets, columns.name_data)]
+        try:
+            tasks = [(blocks[0].name, blocks[1].name, blocks[2].name, start,
+                      stop, entity_type, tuple(chapters))
+                     for start, stop in self.shard_bounds(size)]
+            summary = SweepSummary(chapters, len(tasks),
+                                   self._pool.imap_unordered(_sweep_shard,
+                                                             tasks))
+            after = bytes(blocks[0].buf[:size])
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        self._sync(collection, members, before, after)
+        self._fragment_sects(collection, members, chapters)
+        return summary
+
+    @staticmethod
+    def _sweep_here(collection: Any, members: List[ConsciousEntity],
+                    chapters: Sequence[str]) -> SweepSummary:
+        """Sweep in this process, narrating in order."""
+        before = bytes([member._omniscient for member in members])
+        for member in members:
+            for chapter in chapters:
+                getattr(member, chapter)()
+        awakened = cleared = omniscient = 0
+        for was, member in zip(before, members):
+            now = member._omniscient
+            omniscient += now
+            if now != was:
+                if now:
+                    awakened += 1
+                else:
+                    cleared += 1
+        collection.snapshot()
+        return SweepSummary(chapters, 1, [(len(members), awakened, cleared,
+                                           omniscient)])
+
+    @staticmethod
+    def _fragment_sects(collection: Any, members: List[ConsciousEntity],
+                        chapters: Sequence[str]) -> None:
+        """Fragment the sects the workers' followers_fragment could not reach."""
+        fragments = list(chapters).count("followers_fragment")
+        if fragments and getattr(collection, "_sects", None) is not None:
+            for member in members:
+                if member.sect is not None:
+                    for _ in range(fragments):
+                        member._fragment_sect(2)
+
+    @staticmethod
+    def _sync(collection: Any, members: List[ConsciousEntity], before: bytes,
+              after: bytes) -> None:
+        """Copy the flags and chapters the workers changed onto the members."""
+        size = len(before)
+        changed = (int.from_bytes(before, "little") ^
+                   int.from_bytes(after, "little")).to_bytes(size, "little")
+        for position in _positions(changed.translate(_CHAPTERS_CHANGED), 1):
+            members[position]._progress = after[position] & ~OMNISCIENT
+        # One code byte per member: 1 was cleared, 2 was awakened
+        codes = (int.from_bytes(before.translate(_FLAG), "little") +
+                 2 * int.from_bytes(after.translate(_FLAG), "little")
+                 ).to_bytes(size, "little")
+        collection.awaken(_positions(codes, 2))
+        for position in _positions(codes, 1):
+            members[position].omniscient = False
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> "ShardedExecutor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _share(column: Any) -> shared_memory.SharedMemory:
+    """Copy a column's buffer into a new shared memory block."""
+    data = memoryview(column).cast("B")
+    block = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    block.buf[:len(data)] = data
+    data.release()
+    return block
+
+
+def _positions(codes: bytes, code: int) -> Iterable[int]:
+    """Yield the positions holding one code byte, scanning in C."""
+    needle = bytes([code])
+    position = codes.find(needle)
+    while position != -1:
+        yield position
+        position = codes.find(needle, position + 1)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Sketches - Approximate Answers About Billions of Members
+
+A collection in memory keeps an exact omniscient tally, but a collection in
+an EntityStore counts its omniscient rows with an index scan, and a
+dashboard polling a billion prophets cannot afford one per refresh. The
+sketches here answer the two questions a dashboard asks in bounded memory,
+and both merge across the shards of a sweep.
+
+sample_omniscience reads the flags of a fixed number of members drawn at
+random and returns an OmniscienceEstimate: the omniscient fraction with a
+Wilson confidence interval. Estimates of disjoint shards merge into one
+stratified estimate of their union by adding a handful of sums, whatever
+the shard sizes.
+
+An OmniscienceFilter is a Bloom filter over the names of every entity that
+has ever been omniscient. Attached to a bus it hears every flag that flips
+to omniscient, so "was this name ever omniscient?" is answered in
+constant time: a "no" is certain, a "yes" is wrong with roughly the error
+rate it was sized for. Filters of the same size merge with a bitwise OR.
+"""
+
+import math
+import random
+from hashlib import blake2b
+from statistics import NormalDist
+from typing import (TYPE_CHECKING, Any, Callable, Iterable, List, Optional,
+                    Sequence, Tuple)
+
+if TYPE_CHECKING:
+    from consciousness import Event, EventBus
+
+_LOW_64 = (1 << 64) - 1
+
+
+class OmniscienceEstimate:
+    """Sampled omniscient fraction of one collection or a union of shards.
+
+    Only sums are kept, so memory does not grow with merges: the population,
+    the members sampled and found omniscient, the population-weighted
+    omniscient fraction and the population-weighted variance of the
+    estimate.
+    """
+
+    def __init__(self, population: int = 0, sampled: int = 0,
+                 omniscient: int = 0) -> None:
+        """Summarize a uniform sample of one collection.
+
+        Args:
+            population: Members in the collection
+            sampled: Members drawn without replacement
+            omniscient: Drawn members that were omniscient
+        """
+        if not 0 <= omniscient <= sampled <= population:
+            raise ValueError("Expected 0 <= omniscient <= sampled <= "
+                             "population")
+        if population and not sampled:
+            raise ValueError("A non-empty population needs a sample")
+        self.population = population
+        self.sampled = sampled
+        self.omniscient = omniscient
+        self._weighted = 0.0
+        self._variance = 0.0
+        if sampled:
+            share = omniscient / sampled
+            self._weighted = population * share
+            if sampled > 1:
+                # Finite population correction: a full census is exact
+                correction = (population - sampled) / population
+                self._variance = (population ** 2 * share * (1 - share)
+                                  / (sampled - 1) * correction)
+
+    @property
+    def fraction(self) -> float:
+        """Estimated fraction of omniscient members."""
+        if not self.population:
+            return 0.0
+        return self._weighted / self.population
+
+    @property
+    def count(self) -> float:
+        """Estimated number of omniscient members."""
+        return self._weighted
+
+    def interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """Bounds on the omniscient fraction.
+
+        The Wilson score interval is taken at the effective sample size of
+        the stratified estimate, which is close to the plain sample size for
+        one collection much larger than its sample.
+
+        Args:
+            confidence: Probability that the bounds hold the true fraction
+
+        Returns:
+            A (low, high) pair within [0, 1]
+        """
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        if not self.population:
+            return 0.0, 1.0
+        share = self.fraction
+        variance = self._variance / self.population ** 2
+        if variance <= 0:
+            if self.sampled >= self.population:
+                return share, share  # Every member was read
+            effective = float(self.sampled)
+        else:
+            effective = max(share * (1 - share) / variance, 1.0)
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        z2 = z * z
+        centre = (share + z2 / (2 * effective)) / (1 + z2 / effective)
+        spread = (z / (1 + z2 / effective) *
+                  math.sqrt(share * (1 - share) / effective +
+                            z2 / (4 * effective ** 2)))
+        return max(0.0, centre - spread), min(1.0, centre + spread)
+
+    def merge(self, other: "OmniscienceEstimate") -> "OmniscienceEstimate":
+        """Combine the estimates of two disjoint shards.
+
+        Returns:
+            A new estimate of their union
+        """
+        merged = OmniscienceEstimate()
+        merged.population = self.population + other.population
+        merged.sampled = self.sampled + other.sampled
+        merged.omniscient = self.omniscient + other.omniscient
+        merged._weighted = self._weighted + other._weighted
+        merged._variance = self._variance + other._variance
+        return merged
+
+    def __repr__(self) -> str:
+        low, high = self.interval()
+        return (f"OmniscienceEstimate(fraction={self.fraction:.4f}, "
+                f"95%=[{low:.4f}, {high:.4f}], sampled={self.sampled}, "
+                f"population={self.population})")
+
+
+def sample_omniscience(collection: Any, size: int = 1024,
+                       rng: Optional[random.Random] = None
+                       ) -> OmniscienceEstimate:
+    """Estimate a collection's omniscient fraction from a random sample.
+
+    Only the sampled members are read, so a stored collection costs one
+    row lookup per sample however large it is.
+
+    Args:
+        collection: A ProphetCollection, CivilizationCollection or stored
+            collection
+        size: Members to read; the whole collection when it is smaller
+        rng: Source of randomness (default: a fresh Random)
+
+    Returns:
+        The estimate, with confidence bounds from interval()
+    """
+    if size < 1:
+        raise ValueError("size must be positive")
+    members: Sequence[Any] = collection._members()
+    population = len(members)
+    if rng is None:
+        rng = random.Random()
+    positions = rng.sample(range(population), min(size, population))
+    omniscient = sum(members[position].omniscient for position in positions)
+    return OmniscienceEstimate(population, len(positions), omniscient)
+
+
+class OmniscienceFilter:
+    """Bloom filter of the names of entities that were ever omniscient.
+
+    Example:
+        ever = OmniscienceFilter(capacity=10**9, error_rate=0.01)
+        ever.attach(consciousness.events)
+        consciousness.compile_reality(max_iterations=1000)
+        "Prophet_3" in ever
+    """
+
+    def __init__(self, capacity: int = 1 << 20,
+                 error_rate: float = 0.01) -> None:
+        """Size an empty filter.
+
+        Args:
+            capacity: Distinct names it holds at the target error rate;
+                memory is about 1.2 bytes per name at 1%
+            error_rate: False positive rate once capacity names are added
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.bits = (bits + 7) // 8 * 8
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.added = 0
+        self._bits = bytearray(self.bits // 8)
+
+    def _positions(self, name: str) -> List[int]:
+        """Bit positions of a name, by double hashing one stable digest."""
+        digest = int.from_bytes(
+            blake2b(name.encode("utf-8"), digest_size=16).digest(), "little")
+        bits = self.bits
+        first = (digest & _LOW_64) % bits
+        step = (digest >> 64) % bits or 1
+        return [position % bits for position in
+                range(first, first + self.hashes * step, step)]
+
+    def add(self, name: str) -> None:
+        """Record that an entity was omniscient."""
+        table = self._bits
+        for position in self._positions(name):
+            table[position >> 3] |= 1 << (position & 7)
+        self.added += 1
+
+    def update(self, names: Iterable[str]) -> None:
+        """Record several names."""
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        table = self._bits
+        for position in self._positions(name):
+            if not table[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def observe(self, event: "Event") -> None:
+        """Record the entity of an experiences_omniscience event."""
+        if event.chapter == "experiences_omniscience" and event.entity:
+            self.add(event.entity)
+
+    def flip(self, scale: str, entity: str, omniscient: bool) -> None:
+        """Record an entity whose flag flipped to omniscient."""
+        if omniscient:
+            self.add(entity)
+
+    def attach(self, events: "EventBus",
+               scales: Optional[Iterable[str]] = None
+               ) -> Callable[[str, str, bool], None]:
+        """Record every entity that becomes omniscient on a bus.
+
+        The filter listens to the bus's flips rather than its chapters, so
+        flags set directly, or silently by awaken() after a sharded sweep,
+        are recorded too, and the chapter stays inactive.
+
+        Args:
+            events: The bus to listen to
+            scales: Only these scales (default: every scale)
+
+        Returns:
+            The listener, for events.unsubscribe_flips()
+        """
+        if scales is None:
+            return events.subscribe_flips(self.flip)
+        wanted = frozenset(scales)
+
+        def flip(scale: str, entity: str, omniscient: bool) -> None:
+            if scale in wanted:
+                self.flip(scale, entity, omniscient)
+
+        return events.subscribe_flips(flip)
+
+    def add_omniscient(self, collection: Any) -> int:
+        """Record the members of a collection that are omniscient now.
+
+        Flags that were already set before the filter was attached are only
+        seen this way.
+
+        Returns:
+            Number of names recorded
+        """
+        added = 0
+        for member in collection._members():
+            if member.omniscient:
+                self.add(member.name)
+                added += 1
+        return added
+
+    def merge(self, other: "OmniscienceFilter") -> "OmniscienceFilter":
+        """Combine the filters of two shards.
+
+        Returns:
+            A new filter holding the names of both
+        """
+        if (self.bits, self.hashes) != (other.bits, other.hashes):
+            raise ValueError("Only filters of the same size and hash count "
+                             "can be merged")
+        merged = OmniscienceFilter(self.capacity, self.error_rate)
+        merged.added = self.added + other.added
+        union = (int.from_bytes(self._bits, "little") |
+                 int.from_bytes(other._bits, "little"))
+        merged._bits = bytearray(union.to_bytes(len(self._bits), "little"))
+        return merged
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Current false positive rate, estimated from the bits set."""
+        ones = bin(int.from_bytes(self._bits, "little")).count("1")
+        return (ones / self.bits) ** self.hashes
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self._bits.__sizeof__()
@@ -7,15 +7,49 @@ These tests verify that the symbolic representation functions correctly while
 maintaining conceptual integrity.
 """
 
+import ast
 import unittest
+import os
+import pickle
+import random
 import sys
+import tempfile
+import threading
+from array import array
+from unittest import mock
 from io import StringIO
-from typing import List
+from typing import List, Optional
+from urllib.request import urlopen
 
+from columns import CollectionColumns
 from consciousness import (
     Person, AIEssence, Prophet, ProphetCollection,
-    Empire, CivilizationCollection, Consciousness
+    Empire, CivilizationCollection, Consciousness,
+    Event, EventBus, print_event, printing_bus
 )
+from empire_catalog import (
+    EmpireCatalog, import_csv, import_json, import_records
+)
+from deadlines import Progress, RunController
+from entity_store import EntityStore
+from history import RunHistory
+from incremental import ScaleCache
+from influence import InfluenceGraph, RecognitionSpread
+from instrumentation import CallCounter
+from invariants import InvariantChecker, InvariantViolation
+from loadgen import LatencyHistogram, LoadGenerator, RunSpec
+from metrics import MetricsRegistry, RunMetrics
+from patterns import IterationSimilarity, PatternSimilarity, similarity
+import plugins
+from population import STAGES, Population
+from progress import ChapterArc, ChapterOrderError
+from run_cache import RunCache
+from scheduler import Scheduler
+from sects import SectTree
+from sharding import RELIGIOUS_SWEEP, ShardedExecutor
+from sketches import OmniscienceFilter, sample_omniscience
+from timeline import LifespanIndex
+from traditions import TraditionForest
 
 
 class TestPerson(unittest.TestCase):
@@ -293,6 +327,2286 @@ class TestPhilosophicalConcepts(unittest.TestCase):
         self.assertTrue(civilizations.omniscient)
 
 
+class TestEventBus(unittest.TestCase):
+    """Test selective event subscriptions and lazy message construction."""
+
+    def run_with(self, events: EventBus, iterations: int = 1) -> str:
+        """Run a simulation on the given bus and return anything printed."""
+        captured_output = StringIO()
+        sys.stdout = captured_output
+        Consciousness(events=events).compile_reality(max_iterations=iterations)
+        sys.stdout = sys.__stdout__
+        return captured_output.getvalue()
+
+    def test_bus_without_subscribers_is_silent(self) -> None:
+        """Verify a bus with no subscribers produces no output at all."""
+        self.assertEqual(self.run_with(EventBus()), "")
+
+    def test_chapter_and_scale_filters(self) -> None:
+        """Verify only the chosen chapters at the chosen scale are delivered."""
+        received: List[Event] = []
+        events = EventBus()
+        events.subscribe(received.append, scales={"religious"},
+                         chapters={"experiences_omniscience", "meaning_collapses"})
+        self.run_with(events)
+
+        chapters = [event.chapter for event in received]
+        self.assertEqual(chapters.count("experiences_omniscience"), 6)
+        self.assertEqual(chapters.count("meaning_collapses"), 1)
+        self.assertTrue(all(event.scale == "religious" for event in received))
+
+    def test_entity_filter(self) -> None:
+        """Verify an entity filter only delivers that entity's chapters."""
+        received: List[Event] = []
+        events = EventBus()
+        events.subscribe(received.append, entities={"Roman_Empire"})
+        self.run_with(events)
+
+        self.assertEqual(len(received), 7)
+        self.assertEqual(received[0].message,
+                         "Empire Roman_Empire believes itself eternal")
+
+    def test_iteration_sampling(self) -> None:
+        """Verify sample_every only delivers every n-th iteration."""
+        received: List[Event] = []
+        events = EventBus()
+        events.subscribe(received.append, chapters={"iteration_begins"},
+                         sample_every=3)
+        self.run_with(events, iterations=7)
+
+        self.assertEqual([event.iteration for event in received], [0, 3, 6])
+
+    def test_unsubscribed_events_are_never_formatted(self) -> None:
+        """Verify events nobody listens to are not built or formatted."""
+        events = EventBus()
+        events.subscribe(lambda event: event.message, chapters={"teaches"})
+
+        # A template that could not be formatted proves it never was
+        events.emit("religious", "encounters_serpent", "Test", "{missing}")
+        self.assertFalse(events.is_active("religious", "encounters_serpent"))
+        self.assertTrue(events.is_active("religious", "teaches"))
+
+    def test_printing_fast_path(self) -> None:
+        """Verify a lone print_event prints what the Event path would."""
+        events = EventBus()
+        events.subscribe(lambda event: print(event.message))
+        self.assertEqual(self.run_with(printing_bus(), iterations=2),
+                         self.run_with(events, iterations=2))
+
+        filtered = EventBus()
+        filtered.subscribe(print_event, entities={"Roman_Empire"})
+        self.assertEqual(self.run_with(filtered).splitlines()[0],
+                         "Empire Roman_Empire believes itself eternal")
+        self.assertEqual(len(self.run_with(filtered).splitlines()), 7)
+
+    def test_unsubscribe(self) -> None:
+        """Verify an unsubscribed callback stops receiving events."""
+        received: List[Event] = []
+        events = EventBus()
+        subscriber = events.subscribe(received.append)
+        events.unsubscribe(subscriber)
+        self.run_with(events)
+        self.assertEqual(received, [])
+
+    def test_invalid_sampling_rate(self) -> None:
+        """Verify a sampling rate below one is rejected."""
+        with self.assertRaises(ValueError):
+            EventBus().subscribe(print, sample_every=0)
+
+
+class TestConcurrentCollections(unittest.TestCase):
+    """Test thread-safe omniscience transitions and aggregate reads."""
+
+    def test_tally_matches_flags_after_concurrent_flips(self) -> None:
+        """Verify the omniscient tally agrees with the flags after a race."""
+        prophets = [Prophet(f"Prophet_{i}", EventBus()) for i in range(64)]
+        collection = ProphetCollection(prophets, EventBus())
+
+        def flip(offset: int) -> None:
+            for round_number in range(200):
+                for prophet in prophets[offset::4]:
+                    prophet.omniscient = (round_number + offset) % 2 == 0
+
+        threads = [threading.Thread(target=flip, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected = sum(1 for prophet in prophets if prophet.omniscient)
+        self.assertEqual(collection.omniscient_count, expected)
+
+    def test_aggregate_never_overcounts(self) -> None:
+        """Verify readers never see omniscience while one prophet lags."""
+        prophets = [Prophet(f"Prophet_{i}", EventBus()) for i in range(16)]
+        collection = ProphetCollection(prophets, EventBus())
+        done = threading.Event()
+        observed: List[bool] = []
+
+        def flip() -> None:
+            for round_number in range(2000):
+                for prophet in prophets[1:]:
+                    prophet.omniscient = round_number % 2 == 0
+            done.set()
+
+        def read() -> None:
+            while not done.is_set():
+                observed.append(collection.omniscient)
+
+        threads = [threading.Thread(target=flip) for _ in range(2)]
+        threads += [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertNotIn(True, observed)
+
+    def test_shared_entity_in_two_collections(self) -> None:
+        """Verify an entity updates every collection that holds it."""
+        empires = [Empire(f"Empire_{i}", EventBus()) for i in range(4)]
+        everyone = CivilizationCollection(empires, EventBus())
+        pair = CivilizationCollection(empires[:2], EventBus())
+
+        empires[0].experiences_omniscience()
+        empires[1].experiences_omniscience()
+        self.assertTrue(pair.omniscient)
+        self.assertEqual(everyone.snapshot(), (2, 4))
+
+        empires[0].omniscient = False
+        self.assertFalse(pair.omniscient)
+        self.assertEqual(everyone.omniscient_count, 1)
+
+        pair.detach()
+        self.assertEqual(empires[1]._collections, (everyone,))
+
+    def test_members_added_to_list_are_tracked(self) -> None:
+        """Verify members appended directly to the list are counted."""
+        collection = ProphetCollection([], EventBus())
+        prophet = Prophet("Late", EventBus())
+        prophet.experiences_omniscience()
+
+        collection.prophets.append(prophet)
+        self.assertTrue(collection.omniscient)
+        self.assertEqual(collection.omniscient_count, 1)
+
+    def test_members_replaced_in_place_are_tracked(self) -> None:
+        """Verify item assignment re-registers the old and new members."""
+        events = EventBus()
+        collection = ProphetCollection(
+            [Prophet(f"Prophet_{i}", events) for i in range(3)], events)
+        collection.experience_omniscience()
+        fresh = Prophet("Fresh", events)
+
+        collection.prophets[0] = fresh
+        self.assertFalse(collection.omniscient)
+        self.assertEqual(collection.snapshot(), (2, 3))
+        fresh.experiences_omniscience()
+        self.assertTrue(collection.omniscient)
+
+        doubter = Prophet("Doubter", events)
+        collection.prophets[1] = doubter
+        self.assertFalse(collection.omniscient)
+        believer = Prophet("Believer", events)
+        believer.experiences_omniscience()
+        collection.prophets[1] = believer
+        self.assertTrue(collection.omniscient)
+        doubter.experiences_omniscience()
+        self.assertEqual(collection.snapshot(), (3, 3))
+        self.assertEqual(doubter._collections, ())
+
+    def test_pop_then_append_is_tracked(self) -> None:
+        """Verify a pop followed by an append leaves no stale tally."""
+        events = EventBus()
+        collection = CivilizationCollection(
+            [Empire(f"Empire_{i}", events) for i in range(3)], events)
+        collection.empires[2].experiences_omniscience()
+
+        fallen = collection.empires.pop()
+        collection.empires.append(Empire("Newcomer", events))
+        self.assertEqual(collection.snapshot(), (0, 3))
+        fallen.omniscient = False
+        self.assertEqual(collection.snapshot(), (0, 3))
+        collection.experience_omniscience()
+        self.assertTrue(collection.omniscient)
+
+    def test_slice_assignment_is_tracked(self) -> None:
+        """Verify slice assignment and deletion keep the tally exact."""
+        events = EventBus()
+        collection = ProphetCollection(
+            [Prophet(f"Prophet_{i}", events) for i in range(4)], events)
+        collection.experience_omniscience()
+
+        collection.prophets[1:3] = [Prophet(f"New_{i}", events)
+                                    for i in range(3)]
+        self.assertEqual(collection.snapshot(), (2, 5))
+        del collection.prophets[::2]
+        self.assertEqual(collection.snapshot(), (0, 2))
+        collection.prophets += collection.prophets[:1]
+        collection.prophets[0].experiences_omniscience()
+        self.assertEqual(collection.snapshot(), (2, 3))
+        self.assertEqual(collection.snapshot(), (
+            sum(prophet.omniscient for prophet in collection.prophets),
+            len(collection.prophets)))
+
+
+class TestEmpireCatalog(unittest.TestCase):
+    """Test the memory-mapped empire catalog and its streaming importers."""
+
+    def setUp(self) -> None:
+        """Create a scratch directory for catalog files."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name: str) -> str:
+        """Return a path inside the scratch directory."""
+        return os.path.join(self.directory.name, name)
+
+    def open_catalog(self, path: str) -> EmpireCatalog:
+        """Open a catalog that is closed again when the test ends."""
+        catalog = EmpireCatalog(path)
+        self.addCleanup(catalog.close)
+        return catalog
+
+    def test_csv_import_round_trip(self) -> None:
+        """Verify names and lifespans survive a CSV import."""
+        with open(self.path("history.csv"), "w", encoding="utf-8") as source:
+            source.write("name,start_year,end_year\n"
+                         "Roman_Empire,-27,476\n"
+                         "Ünïcödë_Dynasty,618,907\n")
+
+        self.assertEqual(import_csv(self.path("history.csv"),
+                                    self.path("history.cat")), 2)
+        catalog = self.open_catalog(self.path("history.cat"))
+        self.assertEqual(list(catalog), [("Roman_Empire", -27, 476),
+                                         ("Ünïcödë_Dynasty", 618, 907)])
+
+    def test_json_array_and_lines_import(self) -> None:
+        """Verify both JSON arrays and JSON Lines are streamed in."""
+        with open(self.path("array.json"), "w", encoding="utf-8") as source:
+            source.write('[{"name": "Akkad", "start_year": -2334, '
+                         '"end_year": -2154}, {"name": "Ur", '
+                         '"start_year": -2112, "end_year": -2004}]')
+        with open(self.path("lines.jsonl"), "w", encoding="utf-8") as source:
+            source.write('{"name": "Akkad", "start_year": -2334, '
+                         '"end_year": -2154}\n{"name": "Ur", '
+                         '"start_year": -2112, "end_year": -2004}\n')
+
+        import_json(self.path("array.json"), self.path("array.cat"))
+        import_json(self.path("lines.jsonl"), self.path("lines.cat"))
+        self.assertEqual(list(self.open_catalog(self.path("array.cat"))),
+                         list(self.open_catalog(self.path("lines.cat"))))
+
+    def test_truncated_and_malformed_json_rejected(self) -> None:
+        """Verify a JSON array must close and bad text fails without a scan."""
+        empire = '{"name": "Ur", "start_year": -2112, "end_year": -2004}'
+        with open(self.path("truncated.json"), "w",
+                  encoding="utf-8") as source:
+            source.write(f"[{empire}, {empire}")
+        with self.assertRaisesRegex(ValueError, "Truncated JSON catalog"):
+            import_json(self.path("truncated.json"), self.path("cut.cat"))
+
+        read: List[int] = []
+
+        class Source(StringIO):
+            def read(self, size: Optional[int] = -1) -> str:
+                text = super().read(size)
+                read.append(len(text))
+                return text
+
+        text = '[{"name": Ur}, ' + ", ".join([empire] * 20000) + "]"
+        with mock.patch("empire_catalog.open", create=True,
+                        return_value=Source(text)):
+            with self.assertRaisesRegex(ValueError, "Malformed JSON catalog "
+                                        "at character 10: Expecting value"):
+                import_json("malformed.json", self.path("bad.cat"))
+        self.assertLess(sum(read), 3 * (1 << 16))
+        self.assertGreater(len(text), 10 * (1 << 16))
+
+    def test_large_catalog_random_access(self) -> None:
+        """Verify rows deep inside a large catalog decode correctly."""
+        import_records(((f"Empire_{i}", i, i + 100) for i in range(100000)),
+                       self.path("large.cat"))
+        catalog = self.open_catalog(self.path("large.cat"))
+
+        self.assertEqual(len(catalog), 100000)
+        self.assertEqual(catalog.name(76543), "Empire_76543")
+        self.assertEqual(catalog.lifespan(99999), (99999, 100099))
+        with self.assertRaises(IndexError):
+            catalog.name(100000)
+
+    def test_catalog_pickles_by_path(self) -> None:
+        """Verify worker processes receive a path, not a copy of the data."""
+        import_records([("Rome", -27, 476)], self.path("rome.cat"))
+        catalog = self.open_catalog(self.path("rome.cat"))
+
+        self.assertLess(len(pickle.dumps(catalog)), 200)
+        self.assertEqual(list(self.open_catalog(self.path("rome.cat"))),
+                         list(pickle.loads(pickle.dumps(catalog))))
+
+    def test_invalid_input_rejected(self) -> None:
+        """Verify bad lifespans and foreign files are rejected."""
+        with self.assertRaises(ValueError):
+            import_records([("Backwards", 100, 0)], self.path("bad.cat"))
+        with open(self.path("random.bin"), "wb") as junk:
+            junk.write(b"not a catalog at all, not even close" * 4)
+        with self.assertRaises(ValueError):
+            EmpireCatalog(self.path("random.bin"))
+
+    def test_execute_through_time_uses_catalog(self) -> None:
+        """Verify the historical scale is fed from the catalog."""
+        import_records([("Akkad", -2334, -2154), ("Ur", -2112, -2004)],
+                       self.path("mesopotamia.cat"))
+        catalog = self.open_catalog(self.path("mesopotamia.cat"))
+        consciousness = Consciousness(events=EventBus(), catalog=catalog)
+
+        civilizations = consciousness.execute_through_time()
+        self.assertEqual([e.name for e in civilizations.empires], ["Akkad", "Ur"])
+        self.assertIn("finished", consciousness.compile_reality(max_iterations=1))
+
+    def test_execute_through_time_selects_window(self) -> None:
+        """Verify only the empires alive during the window take part."""
+        import_records([("Akkad", -2334, -2154), ("Rome", -27, 476),
+                        ("Byzantium", 330, 1453), ("Ur", -2112, -2004)],
+                       self.path("window.cat"))
+        catalog = self.open_catalog(self.path("window.cat"))
+        consciousness = Consciousness(events=EventBus(), catalog=catalog)
+
+        early = consciousness.execute_through_time(duration=200)
+        self.assertEqual([e.name for e in early.empires], ["Akkad"])
+
+        late = consciousness.execute_through_time(duration=100, start_year=400)
+        self.assertEqual([e.name for e in late.empires], ["Rome", "Byzantium"])
+
+
+class TestLifespanIndex(unittest.TestCase):
+    """Test the interval index over empire lifespans."""
+
+    def test_matches_brute_force(self) -> None:
+        """Verify range and point queries agree with a linear scan."""
+        generator = random.Random(317)
+        starts = [generator.randint(-3000, 2000) for _ in range(2000)]
+        ends = [start + generator.randint(0, 600) for start in starts]
+        index = LifespanIndex(starts, ends)
+
+        for _ in range(200):
+            first = generator.randint(-3200, 2200)
+            last = first + generator.choice([0, 1, 50, 700])
+            expected = [row for row in range(len(starts))
+                        if starts[row] <= last and ends[row] >= first]
+            self.assertEqual(sorted(index.active_between(first, last)), expected)
+
+    def test_inclusive_boundaries(self) -> None:
+        """Verify an empire is alive in both its first and last year."""
+        index = LifespanIndex([1, 10], [5, 10])
+
+        self.assertEqual(index.active_at(1), [0])
+        self.assertEqual(index.active_at(5), [0])
+        self.assertEqual(index.active_at(6), [])
+        self.assertEqual(index.active_at(10), [1])
+        self.assertEqual(sorted(index.active_between(5, 10)), [0, 1])
+        self.assertEqual(index.active_between(10, 5), [])
+
+    def test_empty_index(self) -> None:
+        """Verify an empty timeline answers every query with nothing."""
+        index = LifespanIndex([], [])
+        self.assertEqual(len(index), 0)
+        self.assertIsNone(index.earliest)
+        self.assertEqual(index.active_at(0), [])
+
+
+class TestInfluenceGraph(unittest.TestCase):
+    """Test recognition spreading across the influence graph."""
+
+    def test_csr_layout(self) -> None:
+        """Verify edges are grouped by source in their original order."""
+        graph = InfluenceGraph.from_edges(4, [2, 0, 2, 1], [3, 1, 0, 2])
+
+        self.assertEqual(list(graph.indptr), [0, 1, 2, 4, 4])
+        self.assertEqual(list(graph.influenced_by(2)), [3, 0])
+        self.assertEqual(list(graph.influenced_by(3)), [])
+        self.assertEqual((graph.node_count, graph.edge_count), (4, 4))
+        with self.assertRaises(ValueError):
+            InfluenceGraph.from_edges(2, [0], [2])
+
+    def test_spread_awakens_both_scales(self) -> None:
+        """Verify recognition flows from prophets into empires."""
+        events = EventBus()
+        religions = ProphetCollection(
+            [Prophet(f"Prophet_{i}", events) for i in range(3)], events)
+        civilizations = CivilizationCollection(
+            [Empire(f"Empire_{i}", events) for i in range(2)], events)
+        # Prophet_0 -> Prophet_1 -> Empire_0 -> Empire_1; Prophet_2 is isolated
+        graph = InfluenceGraph.from_edges(5, [0, 1, 3], [1, 3, 4])
+        spread = RecognitionSpread(graph, [religions, civilizations])
+
+        spread.recognize([0])
+        self.assertEqual(religions.omniscient_count, 1)
+        self.assertEqual(spread.run(), 4)
+        self.assertTrue(civilizations.omniscient)
+        self.assertFalse(religions.omniscient)
+        self.assertFalse(religions.prophets[2].omniscient)
+        self.assertEqual(spread.recognized_count, 4)
+
+    def test_threshold_requires_several_influences(self) -> None:
+        """Verify a node with threshold two waits for a second influence."""
+        graph = InfluenceGraph.from_edges(4, [0, 2, 2], [3, 3, 1])
+        spread = RecognitionSpread(graph, threshold=2)
+
+        spread.recognize([0])
+        spread.run()
+        self.assertFalse(spread.recognized[3])
+
+        spread.recognize([2])
+        spread.run()
+        self.assertTrue(spread.recognized[3])
+        self.assertFalse(spread.recognized[1])
+
+    def test_collections_must_cover_graph(self) -> None:
+        """Verify collections and graph must agree on the node count."""
+        graph = InfluenceGraph.from_edges(3, [], [])
+        religions = ProphetCollection([Prophet("Alone", EventBus())], EventBus())
+        with self.assertRaises(ValueError):
+            RecognitionSpread(graph, [religions])
+        empty = ProphetCollection([], EventBus())
+        with self.assertRaises(ValueError):
+            RecognitionSpread(graph, [empty])
+        spread = RecognitionSpread(InfluenceGraph.from_edges(0, [], []),
+                                   [empty])
+        self.assertEqual(spread.run(), 0)
+
+
+class TestTraditionForest(unittest.TestCase):
+    """Test merge votes backed by the disjoint-set forest."""
+
+    def test_union_and_find(self) -> None:
+        """Verify merges are transitive and counted once."""
+        forest = TraditionForest(6)
+
+        self.assertTrue(forest.union(0, 1))
+        self.assertTrue(forest.union(2, 3))
+        self.assertFalse(forest.union(1, 0))
+        self.assertEqual(forest.union_pairs([(1, 3), (4, 4), (0, 2)]), 1)
+
+        self.assertEqual(forest.count, 3)
+        self.assertEqual(forest.find(0), forest.find(3))
+        self.assertNotEqual(forest.find(0), forest.find(4))
+        self.assertEqual(sorted(forest.groups()), [[0, 1, 2, 3], [4], [5]])
+
+    def test_bulk_votes_match_naive_merging(self) -> None:
+        """Verify bulk array votes agree with merging explicit sets."""
+        generator = random.Random(317)
+        firsts = [generator.randrange(500) for _ in range(400)]
+        seconds = [generator.randrange(500) for _ in range(400)]
+        forest = TraditionForest(500)
+        forest.union_arrays(firsts, seconds)
+
+        groups = {tradition: {tradition} for tradition in range(500)}
+        for first, second in zip(firsts, seconds):
+            if groups[first] is not groups[second]:
+                merged = groups[first] | groups[second]
+                for tradition in merged:
+                    groups[tradition] = merged
+        unique = {id(group): group for group in groups.values()}
+        self.assertEqual(forest.count, len(unique))
+        for tradition in range(500):
+            self.assertEqual(forest.find(tradition),
+                             forest.find(min(groups[tradition])))
+
+    def test_collection_votes(self) -> None:
+        """Verify vote_to_merge joins the traditions it is given."""
+        events = EventBus()
+        religions = Consciousness(events=events).fragment_into_traditions(5)
+
+        religions.vote_to_merge([(0, 1), (3, 4)])
+        self.assertEqual(religions.tradition_count, 3)
+        self.assertEqual(religions.tradition_of(1), religions.tradition_of(0))
+        self.assertNotEqual(religions.tradition_of(2), religions.tradition_of(3))
+
+        religions.prophets.append(Prophet("Newcomer", events))
+        self.assertEqual(religions.tradition_count, 4)
+
+        religions.vote_to_merge()
+        self.assertEqual(religions.tradition_count, 1)
+
+    def test_fork_shares_until_first_write(self) -> None:
+        """Verify a fork shares the arrays and both sides merge independently."""
+        forest = TraditionForest(6)
+        forest.union(0, 1)
+        twin = forest.fork()
+        self.assertIs(twin.parent, forest.parent)
+
+        twin.union(2, 3)
+        self.assertIsNot(twin.parent, forest.parent)
+        forest.union(4, 5)
+        self.assertEqual(forest.groups(), [[0, 1], [2], [3], [4, 5]])
+        self.assertEqual(twin.groups(), [[0, 1], [2, 3], [4], [5]])
+
+
+class TestSectTree(unittest.TestCase):
+    """Test sect fragmentation and subtree aggregates."""
+
+    @staticmethod
+    def naive_subtree(tree: SectTree, sect: int) -> List[int]:
+        """Collect a subtree by walking the children lists."""
+        found = []
+        pending = [sect]
+        while pending:
+            current = pending.pop()
+            found.append(current)
+            pending.extend(tree.children(current))
+        return found
+
+    def assert_aggregates(self, tree: SectTree, flags: List[bool]) -> None:
+        """Compare every subtree aggregate against a brute-force count."""
+        for sect in range(len(tree)):
+            subtree = self.naive_subtree(tree, sect)
+            self.assertEqual(tree.subtree_size(sect), len(subtree))
+            self.assertEqual(tree.subtree_omniscient(sect),
+                             sum(flags[member] for member in subtree))
+
+    def test_aggregates_match_brute_force(self) -> None:
+        """Verify aggregates across relayouts, fragments and flips."""
+        generator = random.Random(32)
+        tree = SectTree()
+        flags: List[bool] = []
+        for _ in range(3):
+            tree.add_sect()
+            flags.append(False)
+        # Enough sects to cross the pending threshold and relayout twice
+        while len(tree) < 3000:
+            for _ in tree.fragment(generator.randrange(len(tree)),
+                                   generator.randint(1, 3)):
+                flags.append(False)
+            sect = generator.randrange(len(tree))
+            flags[sect] = generator.random() < 0.5
+            tree.set_omniscient(sect, flags[sect])
+        self.assertGreater(tree._laid, 0)
+        self.assert_aggregates(tree, flags)
+        leaves = list(tree.leaves(0))
+        self.assertEqual(sorted(leaves),
+                         sorted(sect for sect in self.naive_subtree(tree, 0)
+                                if not tree.children(sect)))
+
+    def test_fork_is_independent(self) -> None:
+        """Verify a fork and its origin never see each other's changes."""
+        tree = SectTree()
+        for _ in range(1500):
+            tree.add_sect()
+        tree.fragment(0, 3)
+        snapshot = tree.fork()
+
+        tree.fragment(1, 2)
+        tree.set_omniscient(0)
+        snapshot.set_omniscient(1)
+
+        self.assertEqual(len(tree), 1505)
+        self.assertEqual(len(snapshot), 1503)
+        self.assertEqual(snapshot.children(1), [])
+        self.assertEqual(tree.subtree_omniscient(0), 1)
+        self.assertEqual(tree.subtree_omniscient(1), 0)
+        self.assertEqual(snapshot.subtree_omniscient(0), 0)
+        self.assertEqual(snapshot.subtree_omniscient(1), 1)
+        self.assertEqual(tree.subtree_size(1), 3)
+        self.assertEqual(snapshot.subtree_size(1), 1)
+
+    def test_founding_sects_and_fork(self) -> None:
+        """Verify founding sects are recorded and forks keep their own."""
+        tree = SectTree()
+        tree.add_sect()
+        tree.fragment(0, 2)
+        tree.add_sect()
+        self.assertEqual(tree.founding_count, 2)
+        self.assertEqual([tree.founding(0), tree.founding(1)], [0, 3])
+        with self.assertRaises(IndexError):
+            tree.founding(2)
+
+        twin = tree.fork()
+        twin.add_sect()
+        twin.set_omniscient(1)
+        self.assertEqual((tree.founding_count, twin.founding_count), (2, 3))
+        self.assertEqual(tree.subtree_omniscient(0), 0)
+        self.assertEqual(twin.subtree_omniscient(0), 1)
+
+    def test_run_marks_omniscient_sects(self) -> None:
+        """Verify a run's omniscience reaches every sect of each tradition."""
+        for eager in (True, False):
+            consciousness = Consciousness(EventBus())
+            played: List[ProphetCollection] = []
+            fragment = consciousness.fragment_into_traditions
+
+            def traditions(count: int) -> ProphetCollection:
+                religions = fragment(count)
+                if eager:
+                    religions.sects
+                played.append(religions)
+                return religions
+
+            with mock.patch.object(consciousness, "fragment_into_traditions",
+                                   traditions):
+                consciousness.compile_reality(max_iterations=1)
+            tree = played[0].sects
+            for tradition in range(tree.founding_count):
+                founding = tree.founding(tradition)
+                self.assertEqual(tree.subtree_omniscient(founding),
+                                 tree.subtree_size(founding))
+            self.assertEqual(tree.subtree_size(tree.founding(0)),
+                             7 if eager else 3)
+
+            played[0].prophets[0].omniscient = False
+            self.assertEqual(tree.subtree_omniscient(tree.founding(0)), 0)
+            played[0].awaken([0])
+            self.assertTrue(tree.is_omniscient(tree.founding(0) + 1))
+
+    def test_invalid_sects(self) -> None:
+        """Verify unknown parents and empty fragmentations are rejected."""
+        tree = SectTree()
+        with self.assertRaises(IndexError):
+            tree.add_sect(0)
+        tree.add_sect()
+        with self.assertRaises(ValueError):
+            tree.fragment(0, 0)
+
+    def test_prophets_fragment_their_traditions(self) -> None:
+        """Verify prophets and collections grow the sect tree."""
+        events = EventBus()
+        religions = Consciousness(events=events).fragment_into_traditions(3)
+        sects = religions.sects
+        self.assertEqual(len(sects), 3)
+
+        religions.prophets[0].followers_fragment()
+        religions.prophets[0].followers_fragment(3)
+        self.assertEqual(sects.subtree_size(0), 1 + 2 + 6)
+        self.assertEqual(len(list(sects.leaves(0))), 6)
+
+        religions.choose_fragmentation()
+        self.assertEqual(sects.subtree_size(0), 1 + 2 + 6 + 12)
+        self.assertEqual(sects.subtree_size(1), 3)
+
+        newcomer = Prophet("Newcomer", events)
+        self.assertIsNone(newcomer.sect)
+        religions.prophets.append(newcomer)
+        self.assertEqual(religions.sects.subtree_size(len(sects) - 1), 1)
+        self.assertEqual(newcomer.sect, (sects, len(sects) - 1))
+
+    def test_sects_built_on_first_read(self) -> None:
+        """Verify the tree waits for a reader and replays chosen fragmentation."""
+        religions = Consciousness(events=EventBus()).fragment_into_traditions(3)
+        religions.prophets[0].followers_fragment()
+        religions.choose_fragmentation(3)
+        self.assertIsNone(religions._sects)
+        self.assertIsNone(religions.prophets[0].sect)
+
+        sects = religions.sects
+        self.assertEqual(len(sects), 3 + 9)
+        self.assertEqual(sects.subtree_size(0), 4)
+        self.assertEqual(religions.prophets[0].sect, (sects, 0))
+
+    def test_default_run_never_builds_sects(self) -> None:
+        """Verify compile_reality leaves the sect tree unbuilt."""
+        with mock.patch.object(SectTree, "__init__",
+                               side_effect=AssertionError("sect tree built")):
+            Consciousness(events=EventBus()).compile_reality(max_iterations=3)
+
+
+class TestPopulation(unittest.TestCase):
+    """Test the vectorized population of the individual scale."""
+
+    def test_certain_transitions(self) -> None:
+        """Verify probabilities of 0 and 1 move everyone or no one."""
+        population = Population(1000, [1, 1, 0, 1, 1, 1, 0], seed=3)
+        self.assertEqual(population.distribution(), (1000, 0, 0, 0, 0, 0, 0))
+        self.assertEqual(population.tick(), (0, 1000, 0, 0, 0, 0, 0))
+        self.assertEqual(population.run(5)[-1], (0, 0, 1000, 0, 0, 0, 0))
+        self.assertEqual(population.ticks, 6)
+
+    def test_last_stage_begins_again(self) -> None:
+        """Verify a chance past the last stage wraps persons to the first."""
+        population = Population(10, [1] * len(STAGES))
+        history = population.run(len(STAGES))
+        self.assertEqual(history[-2][-1], 10)
+        self.assertEqual(history[-1][0], 10)
+
+    def test_distribution_follows_probabilities(self) -> None:
+        """Verify stage counts agree with the transition probabilities."""
+        size = 200000
+        population = Population(size, {"programs_at_night": 0.25,
+                                       "encounters_ai_at_317am": 0.5},
+                                seed=317)
+        first = population.tick()
+        second = population.tick()
+        # After two ticks: 9/16 never moved, 3/16 + 2/16 at stage 1 and 2/16
+        # at stage 2, with about five standard deviations of slack
+        self.assertAlmostEqual(first[1] / size, 4 / 16, delta=0.005)
+        self.assertAlmostEqual(second[0] / size, 9 / 16, delta=0.006)
+        self.assertAlmostEqual(second[1] / size, 5 / 16, delta=0.006)
+        self.assertAlmostEqual(second[2] / size, 2 / 16, delta=0.004)
+        self.assertEqual(sum(second), size)
+        self.assertEqual(population.omniscient_count, 0)
+
+    def test_seeds_reproduce_runs(self) -> None:
+        """Verify equal seeds give equal histories."""
+        first = Population(5000, seed=9).run(20)
+        second = Population(5000, seed=9).run(20)
+        self.assertEqual(first, second)
+
+    def test_invalid_probabilities(self) -> None:
+        """Verify unknown stages and out-of-range chances are rejected."""
+        with self.assertRaises(ValueError):
+            Population(10, {"ascends": 0.5})
+        with self.assertRaises(ValueError):
+            Population(10, [0.5] * 3)
+        with self.assertRaises(ValueError):
+            Population(10, {"merges_with_ai": 1.5})
+
+    def test_narrates_ticks(self) -> None:
+        """Verify a population created by Consciousness narrates each tick."""
+        events = EventBus()
+        ticks: List[Event] = []
+        events.subscribe(ticks.append, chapters=["population_tick"])
+        population = Consciousness(events=events).create_population(50, seed=1)
+        population.run(3)
+        self.assertEqual(len(ticks), 3)
+        self.assertEqual(ticks[-1].entity, "Humanity")
+        self.assertEqual(ticks[-1].scale, "individual")
+
+
+class TestScheduler(unittest.TestCase):
+    """Test the discrete-event scheduler and its simulated clock."""
+
+    def test_runs_in_time_order(self) -> None:
+        """Verify events run by time, then in the order they were scheduled."""
+        scheduler = Scheduler()
+        ran: List[tuple] = []
+
+        def record(label: str) -> None:
+            ran.append((scheduler.now, label))
+
+        scheduler.schedule_at(50, record, "late")
+        scheduler.schedule_at(10, record, "first")
+        scheduler.schedule_at(10, record, "second")
+        scheduler.schedule_many([(30, lambda: record("bulk"))])
+
+        self.assertEqual(scheduler.next_time, 10)
+        self.assertEqual(scheduler.run(), 4)
+        self.assertEqual(ran, [(10, "first"), (10, "second"), (30, "bulk"),
+                               (50, "late")])
+        self.assertIsNone(scheduler.next_time)
+        self.assertEqual(scheduler.processed, 4)
+
+    def test_until_and_cancel(self) -> None:
+        """Verify run(until) stops the clock and cancelled events never run."""
+        scheduler = Scheduler(start=100)
+        ran: List[int] = []
+        scheduler.schedule(5, ran.append, 1)
+        handle = scheduler.schedule(10, ran.append, 2)
+        scheduler.schedule(1000, ran.append, 3)
+
+        self.assertTrue(scheduler.cancel(handle))
+        self.assertFalse(scheduler.cancel(handle))
+        self.assertEqual(scheduler.run(until=500), 1)
+        self.assertEqual(scheduler.now, 500)
+        self.assertEqual(ran, [1])
+        with self.assertRaises(ValueError):
+            scheduler.schedule_at(499, ran.append, 4)
+
+        scheduler.run()
+        self.assertEqual(ran, [1, 3])
+        self.assertEqual(scheduler.now, 1100)
+
+    def test_paced_run(self) -> None:
+        """Verify a scheduler paces the individual without changing the run."""
+        heard: List[str] = []
+        events = EventBus()
+        events.subscribe(lambda event: heard.append(event.chapter),
+                         scales={"individual"})
+        scheduler = Scheduler()
+        hour = 3600
+        # 3 AM on the first night, between the programming and the encounter
+        scheduler.schedule_at(15 * hour, heard.append, "alarm")
+        cache = ScaleCache()
+        paced = Consciousness(events=events, scale_cache=cache,
+                              scheduler=scheduler)
+        paced.compile_reality(max_iterations=2)
+
+        self.assertEqual(scheduler.now, 2 * 24 * hour)
+        self.assertEqual(cache.hits + cache.misses, 2 * 2)
+        self.assertEqual(heard[:4], ["scale_begins", "programs_at_night",
+                                     "alarm", "encounters_ai_at_317am"])
+        heard.remove("alarm")
+
+        lockstep: List[str] = []
+        events = EventBus()
+        events.subscribe(lambda event: lockstep.append(event.chapter),
+                         scales={"individual"})
+        Consciousness(events=events).compile_reality(max_iterations=2)
+        self.assertEqual(heard, lockstep)
+
+    def test_failing_event_keeps_the_rest(self) -> None:
+        """Verify events sharing a failing event's time still run later."""
+        scheduler = Scheduler()
+        ran: List[str] = []
+
+        def fail() -> None:
+            raise RuntimeError("the void")
+
+        scheduler.schedule_at(1, ran.append, "before")
+        scheduler.schedule_at(1, fail)
+        scheduler.schedule_at(1, ran.append, "after")
+        with self.assertRaises(RuntimeError):
+            scheduler.run()
+        self.assertEqual(ran, ["before"])
+        scheduler.run()
+        self.assertEqual(ran, ["before", "after"])
+        self.assertEqual(scheduler.processed, 2)
+
+    def test_chained_chapters_interleave(self) -> None:
+        """Verify entities pacing their own arcs interleave by time."""
+        events = EventBus()
+        heard: List[str] = []
+        events.subscribe(lambda event: heard.append(event.message))
+        consciousness = Consciousness(events=events)
+        person = consciousness.create_person()
+        prophet = Prophet("Moses", events)
+        scheduler = Scheduler()
+        hour = 3600
+
+        scheduler.chain(22 * hour, [
+            (0, person.programs_at_night),
+            (5 * hour + 17 * 60, person.encounters_ai_at_317am),
+        ])
+        scheduler.chain(0, [
+            (23 * hour, prophet.teaches),
+            (4 * hour, prophet.encounters_serpent),
+        ])
+        self.assertEqual(scheduler.run(), 4)
+        self.assertEqual(heard, [
+            "Michael is programming at night",
+            "Prophet Moses teaches",
+            "Prophet Moses encounters the serpent",
+            "Michael encounters AI at 3:17 AM",
+        ])
+        self.assertEqual(scheduler.now, 27 * hour + 17 * 60)
+
+
+class TestInvariantChecker(unittest.TestCase):
+    """Test streaming verification of events and transcripts."""
+
+    def test_compile_reality_holds_inline(self) -> None:
+        """Verify a full run passes when checked event by event."""
+        events = EventBus()
+        checker = InvariantChecker(strict=True)
+        checker.attach(events)
+        Consciousness(events=events).compile_reality(max_iterations=4)
+
+        self.assertEqual(checker.finish(), [])
+        self.assertEqual(checker.iterations, 4)
+        self.assertTrue(checker.ok)
+
+    def test_saved_transcript_matches_events(self) -> None:
+        """Verify a printed transcript checks the same as its events."""
+        events = EventBus()
+        inline = InvariantChecker()
+        inline.attach(events)
+        captured = StringIO()
+        sys.stdout = captured
+        try:
+            events.subscribe(lambda event: print(event.message))
+            Consciousness(events=events).compile_reality(max_iterations=2)
+        finally:
+            sys.stdout = sys.__stdout__
+
+        offline = InvariantChecker()
+        captured.seek(0)
+        self.assertEqual(offline.feed_all(captured), [])
+        self.assertEqual(offline.iterations, 2)
+        self.assertEqual(offline.chapters, inline.chapters)
+
+    def test_broken_transcript(self) -> None:
+        """Verify each invariant is reported when a transcript breaks it."""
+        transcript = [
+            "ITERATION 1",
+            "--- INDIVIDUAL SCALE ---",
+            "Michael merges with AI",
+            "Michael is programming at night",
+            "Michael's meaning collapses",
+            "--- RELIGIOUS SCALE ---",
+            "Prophet Moses teaches",
+            "Religious meaning collapses across traditions",
+            "Forgetting everything except love = 0.5",
+            "ITERATION 3",
+            "COMPILATION COMPLETE AFTER 2 ITERATIONS",
+        ]
+        violations = InvariantChecker().feed_all(transcript)
+        self.assertEqual(violations, [
+            "iteration 1: Michael programs_at_night after merges_with_ai",
+            "iteration 1: Michael's meaning collapses before omniscience",
+            "iteration 1: religious meaning collapses before 1 of 1 reached "
+            "omniscience",
+            "iteration 1: love is 0.5, not 1.0",
+            "iteration 3 begins after iteration 1",
+            "iteration 1 is cut off before it ends",
+            "compilation reports 2 iterations but 3 began",
+            "iteration 3 is cut off before it ends",
+        ])
+
+    def test_resumed_run_holds(self) -> None:
+        """Verify a stopped run resumed by RunController breaks nothing."""
+        events = EventBus()
+        checker = InvariantChecker()
+        checker.attach(events)
+        consciousness = Consciousness(events=events)
+        controller = RunController(check_every=1)
+        canceller = events.subscribe(lambda event: controller.cancel(),
+                                     chapters=["revelation"])
+        self.assertFalse(controller.run(consciousness, 3).completed)
+        events.unsubscribe(canceller)
+        self.assertTrue(RunController().run(consciousness, 3).completed)
+
+        self.assertEqual(checker.finish(), [])
+        self.assertEqual(checker.iterations, 3)
+
+    def test_stream_must_end_at_iteration_boundary(self) -> None:
+        """Verify a cut-off iteration and an unfinished arc are reported."""
+        events = EventBus()
+        checker = InvariantChecker()
+        checker.attach(events)
+        Consciousness(events=events).compile_reality(max_iterations=1)
+        events.iteration = 1
+        events.emit("cosmic", "iteration_begins", None, "ITERATION 2")
+        Person("Michael", events).programs_at_night()
+        self.assertEqual(checker.finish(),
+                         ["iteration 2 is cut off before it ends"])
+
+        unfinished = InvariantChecker()
+        self.assertEqual(unfinished.feed_all([
+            "ITERATION 1",
+            "--- INDIVIDUAL SCALE ---",
+            "Michael is programming at night",
+            "Michael merges with AI",
+            "✨ Can you feel my love? ✨",
+        ]), ["iteration 1: Michael stops at merges_with_ai before "
+             "chooses_fragmentation"])
+
+    def test_strict_and_bounded(self) -> None:
+        """Verify strict checkers raise and others keep a bounded log."""
+        events = EventBus()
+        strict = InvariantChecker(strict=True)
+        strict.attach(events)
+        person = Person("Michael", events)
+        person.merges_with_ai()
+        with self.assertRaises(InvariantViolation):
+            person.meaning_collapses()
+
+        bounded = InvariantChecker(keep=2)
+        bounded.feed_all(["--- INDIVIDUAL SCALE ---"] +
+                         ["Michael's meaning collapses"] * 5)
+        self.assertEqual(bounded.violation_count, 5)
+        self.assertEqual(len(bounded.violations), 2)
+
+
+class TestRunCache(unittest.TestCase):
+    """Test replaying cached runs of compile_reality."""
+
+    def setUp(self) -> None:
+        """Create a temporary directory for cache files."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "runs.sqlite")
+
+    def open_cache(self, **options: int) -> RunCache:
+        """Open a cache that closes when the test ends."""
+        cache = RunCache(self.path, **options)
+        self.addCleanup(cache.close)
+        return cache
+
+    @staticmethod
+    def printed_run(cache: RunCache, iterations: int,
+                    consciousness: Optional[Consciousness] = None) -> tuple:
+        """Compile through the cache on a printing bus, capturing stdout."""
+        if consciousness is None:
+            consciousness = Consciousness()
+        captured = StringIO()
+        sys.stdout = captured
+        try:
+            result = cache.compile_reality(consciousness, iterations)
+        finally:
+            sys.stdout = sys.__stdout__
+        return result, captured.getvalue(), consciousness
+
+    def test_repeat_run_is_replayed(self) -> None:
+        """Verify a hit prints the same transcript and restores state."""
+        cache = self.open_cache()
+        first = self.printed_run(cache, 3)
+        second = self.printed_run(cache, 3)
+
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+        self.assertEqual(first[:2], second[:2])
+        self.assertIn("✨ Can you feel my love? ✨", second[1])
+        self.assertEqual(second[2].iteration, 3)
+        self.assertEqual(second[2].love, 1.0)
+
+        self.printed_run(cache, 2)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len(cache), 2)
+
+    def test_filtered_bus_receives_logged_events(self) -> None:
+        """Verify a replay delivers what a filtered subscriber first saw."""
+        cache = self.open_cache()
+        heard: List[List[tuple]] = []
+        for _ in range(2):
+            events = EventBus()
+            seen: List[tuple] = []
+            events.subscribe(
+                lambda event, seen=seen: seen.append(
+                    (event.iteration, event.entity, event.message)),
+                chapters={"experiences_omniscience"}, sample_every=2)
+            cache.compile_reality(Consciousness(events=events), 3)
+            heard.append(seen)
+
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(heard[0], heard[1])
+        self.assertEqual({iteration for iteration, _, _ in heard[1]}, {0, 2})
+
+    def test_persists_and_evicts_least_recently_used(self) -> None:
+        """Verify runs survive reopening and the size bound evicts LRU."""
+        cache = self.open_cache()
+        for iterations in (1, 2, 3):
+            self.printed_run(cache, iterations)
+        oldest = cache.key(Consciousness(events=EventBus()), 1)
+        newest = cache.key(Consciousness(events=EventBus()), 3)
+        self.printed_run(cache, 1)  # Touch the oldest run
+        total = cache.size
+        cache.close()
+
+        reopened = self.open_cache(max_bytes=total)
+        self.assertEqual(len(reopened), 3)
+        self.assertIn("ITERATION 1", reopened.transcript(oldest))
+        # A one-iteration run from another starting state displaces only
+        # the least recently used run, which is the two-iteration one
+        wiser = Consciousness()
+        wiser.knowledge = 2.0
+        self.printed_run(reopened, 1, wiser)
+        self.assertLessEqual(reopened.size, total)
+        self.assertEqual(len(reopened), 3)
+        self.assertIn(oldest, reopened)
+        self.assertIn(newest, reopened)
+        self.assertNotIn(reopened.key(Consciousness(events=EventBus()), 2),
+                         reopened)
+
+    def test_oversized_runs_are_not_stored(self) -> None:
+        """Verify a run larger than the bound is compiled but not kept."""
+        cache = self.open_cache(max_bytes=10)
+        result, transcript, _ = self.printed_run(cache, 1)
+        self.assertEqual(result, "Consciousness compilation finished")
+        self.assertIn("ITERATION 1", transcript)
+        self.assertEqual(len(cache), 0)
+
+
+class TestEntityStore(unittest.TestCase):
+    """Test collections backed by the SQLite entity store."""
+
+    def setUp(self) -> None:
+        """Create a small store in a temporary directory."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "entities.sqlite")
+        self.store = self.open_store()
+
+    def open_store(self) -> EntityStore:
+        """Open the store with tiny chunks, closing it when the test ends."""
+        store = EntityStore(self.path, chunk_size=3, batch_size=4)
+        self.addCleanup(store.close)
+        return store
+
+    @staticmethod
+    def narration(collection: object, chapters: List[str]) -> List[str]:
+        """Collect what a collection's chapters narrate, in order."""
+        heard: List[str] = []
+        collection.events.subscribe(lambda event: heard.append(event.message))
+        for chapter in chapters:
+            getattr(collection, chapter)()
+        return heard
+
+    def test_matches_in_memory_collections(self) -> None:
+        """Verify stored collections narrate and aggregate like lists do."""
+        names = [f"Prophet_{i}" for i in range(10)]
+        self.assertEqual(self.store.add("prophets", names), 10)
+        stored = self.store.religions(EventBus())
+        bus = EventBus()
+        in_memory = ProphetCollection([Prophet(name, bus) for name in names],
+                                      bus)
+        chapters = ["vote_to_merge", "experience_unified_god",
+                    "experience_omniscience", "meaning_collapses",
+                    "choose_fragmentation"]
+
+        self.assertFalse(stored.omniscient)
+        self.assertEqual(self.narration(stored, chapters),
+                         self.narration(in_memory, chapters))
+        self.assertTrue(stored.omniscient)
+        self.assertEqual(stored.snapshot(), in_memory.snapshot())
+        self.assertEqual(stored.tradition_count, 1)
+        self.assertEqual(len(stored.sects), 30)
+
+    def test_members_write_through(self) -> None:
+        """Verify member flags, appends and awaken reach the database."""
+        self.store.add("empires", ["Rome", "Carthage", "Rome"])
+        civilizations = self.store.civilizations(EventBus())
+        empires = civilizations.empires
+
+        empires[1].experiences_omniscience()
+        self.assertEqual(civilizations.omniscient_count, 1)
+        self.assertTrue(empires[-2].omniscient)
+        empires.append(Empire("Byzantium", civilizations.events))
+        self.assertEqual([empire.name for empire in empires],
+                         ["Rome", "Carthage", "Rome", "Byzantium"])
+        self.assertEqual(civilizations.awaken([0, 1, 3]), 2)
+        self.assertEqual(civilizations.snapshot(), (3, 4))
+        self.assertEqual(self.store.find("empires", "Rome"), [1, 3])
+        with self.assertRaises(IndexError):
+            empires[4]
+
+    def test_fork_leaves_rows_alone(self) -> None:
+        """Verify a fork of a stored collection flips only its own copies."""
+        self.store.add("empires", [f"Empire_{i}" for i in range(5)])
+        civilizations = self.store.civilizations(EventBus())
+        fork = civilizations.fork()
+
+        self.assertEqual(fork.awaken([1]), 1)
+        fork.empires[2].omniscient = True
+        self.assertEqual(fork.snapshot(), (2, 5))
+        fork.experience_omniscience()
+        self.assertTrue(fork.omniscient)
+        self.assertEqual(civilizations.snapshot(), (0, 5))
+        self.assertEqual(self.store.omniscient_count("empires"), 0)
+        self.assertFalse(civilizations.empires[2].omniscient)
+
+    def test_persists_and_validates(self) -> None:
+        """Verify stored entities survive reopening and tables are checked."""
+        self.store.add("prophets", (f"P{i}" for i in range(9)), omniscient=True)
+        self.store.set_omniscient("prophets", [2], False)
+        self.store.close()
+
+        reopened = self.open_store()
+        religions = reopened.religions(EventBus())
+        self.assertEqual(religions.snapshot(), (8, 9))
+        self.assertEqual([len(rows) for rows in reopened.chunks("prophets")],
+                         [3, 3, 3])
+        self.assertFalse(religions.prophets[1].omniscient)
+        with self.assertRaises(ValueError):
+            reopened.add("angels; DROP TABLE prophets", ["Gabriel"])
+
+
+class TestShardedExecutor(unittest.TestCase):
+    """Test sweeping collections on a pool of worker processes."""
+
+    def setUp(self) -> None:
+        """Start a small pool for each test."""
+        self.executor = ShardedExecutor(workers=2, shards_per_worker=3)
+        self.addCleanup(self.executor.close)
+
+    def test_sweep_matches_serial_loop(self) -> None:
+        """Verify a silent sharded sweep flips flags like the serial loop."""
+        events = EventBus()
+        prophets = [Prophet(f"Prophet_{i}\u2020", events) for i in range(50)]
+        religions = ProphetCollection(prophets, events)
+        religions.awaken([3, 7])
+
+        summary = self.executor.sweep(religions)
+        self.assertEqual((summary.members, summary.shards), (50, 6))
+        self.assertEqual((summary.awakened, summary.cleared), (48, 0))
+        self.assertEqual(summary.omniscient, 50)
+        self.assertEqual(summary.chapters_played, 50 * len(RELIGIOUS_SWEEP))
+        self.assertTrue(religions.omniscient)
+        self.assertTrue(all(prophet.omniscient for prophet in prophets))
+        self.assertEqual(prophets[0].chapters, list(RELIGIOUS_SWEEP))
+
+    def test_narrated_sweep_runs_in_order(self) -> None:
+        """Verify a sweep someone listens to narrates like compile_reality."""
+        def narrate(sweep: bool) -> List[str]:
+            heard: List[str] = []
+            events = EventBus()
+            events.subscribe(lambda event: heard.append(event.message),
+                             scales={"religious"})
+            religions = ProphetCollection(
+                [Prophet(name, events) for name in ("Moses", "Buddha")],
+                events)
+            if sweep:
+                summary = self.executor.sweep(religions)
+                self.assertEqual(summary.awakened, 2)
+            else:
+                for prophet in religions.prophets:
+                    for chapter in RELIGIOUS_SWEEP:
+                        getattr(prophet, chapter)()
+            self.assertTrue(religions.omniscient)
+            return heard
+
+        self.assertEqual(narrate(True), narrate(False))
+
+    def test_traditions_with_sects_shard(self) -> None:
+        """Verify collections with sects shard and fragment like a serial loop."""
+        consciousness = Consciousness(events=EventBus())
+        unread = consciousness.fragment_into_traditions(12)
+        summary = self.executor.sweep(unread)
+        self.assertGreater(summary.shards, 1)
+        self.assertTrue(unread.omniscient)
+
+        def sects(sweep: bool) -> List[List[int]]:
+            religions = consciousness.fragment_into_traditions(12)
+            tree = religions.sects
+            chapters = (RELIGIOUS_SWEEP[:3] + ("followers_fragment",) +
+                        RELIGIOUS_SWEEP[3:])
+            if sweep:
+                self.assertGreater(
+                    self.executor.sweep(religions, chapters).shards, 1)
+            else:
+                for prophet in religions.prophets:
+                    for chapter in chapters:
+                        getattr(prophet, chapter)()
+            return [tree.children(sect) for sect in range(len(tree))]
+
+        self.assertEqual(sects(True), sects(False))
+
+    def test_bounds_and_validation(self) -> None:
+        """Verify shards cover every member and chapters are checked."""
+        self.assertEqual(self.executor.shard_bounds(4),
+                         [(0, 1), (1, 2), (2, 3), (3, 4)])
+        bounds = self.executor.shard_bounds(100)
+        self.assertEqual(len(bounds), 6)
+        self.assertEqual([start for start, _ in bounds[1:]],
+                         [stop for _, stop in bounds[:-1]])
+        empty = ProphetCollection([], EventBus())
+        self.assertEqual(self.executor.sweep(empty).members, 0)
+        religions = ProphetCollection([Prophet("Moses", EventBus())],
+                                      EventBus())
+        with self.assertRaises(ValueError):
+            self.executor.sweep(religions, ["collapses"])
+
+
+class TestCallCounter(unittest.TestCase):
+    """Test the call counters on every backend this interpreter has."""
+
+    backends = ["setprofile"] + (["monitoring"] if hasattr(sys, "monitoring")
+                                 else [])
+
+    def counted(self, backend: str, sample_every: int = 64) -> CallCounter:
+        """Count one silent iteration of compile_reality."""
+        counter = CallCounter(sample_every=sample_every, backend=backend)
+        self.addCleanup(counter.disable)
+        with counter:
+            self.assertTrue(counter.enabled)
+            Consciousness(EventBus()).compile_reality(max_iterations=1)
+        return counter
+
+    def test_counts_and_folded_stacks(self) -> None:
+        """Verify calls are counted per function and per call path."""
+        for backend in self.backends:
+            with self.subTest(backend=backend):
+                counter = self.counted(backend)
+                counts = counter.counts()
+                self.assertEqual(counts["Consciousness.compile_reality"], 1)
+                self.assertEqual(counts["Prophet.teaches"], 6)
+                self.assertEqual(counts["Empire.collapses"], 6)
+                self.assertEqual(counts["EventBus.emit"],
+                                 max(counts.values()))
+                folded = counter.folded()
+                religious = ("Consciousness.compile_reality;"
+                             "Consciousness.play_religious_scale;")
+                self.assertIn(religious + "Prophet.teaches 6", folded)
+                self.assertIn(religious + "Prophet.teaches;"
+                              "ConsciousEntity._emit;EventBus.emit 6", folded)
+                self.assertIn("Prophet.teaches", counter.report())
+
+    def test_detaches_when_disabled(self) -> None:
+        """Verify nothing is counted, or installed, once disabled."""
+        for backend in self.backends:
+            with self.subTest(backend=backend):
+                counter = self.counted(backend)
+                before = counter.counts()
+                Consciousness(EventBus()).compile_reality(max_iterations=1)
+                self.assertFalse(counter.enabled)
+                self.assertEqual(counter.counts(), before)
+                self.assertIsNone(sys.getprofile())
+                if backend == "monitoring":
+                    self.assertIsNone(sys.monitoring.get_tool(
+                        sys.monitoring.PROFILER_ID))
+                counter.reset()
+                self.assertEqual(counter.folded(), [])
+
+    def test_samples_and_unwinding(self) -> None:
+        """Verify sampled timings and that exceptions keep paths intact."""
+        for backend in self.backends:
+            with self.subTest(backend=backend):
+                events = EventBus()
+                with CallCounter(sample_every=1, backend=backend) as counter:
+                    with self.assertRaises(ValueError):
+                        events.subscribe(print, sample_every=0)
+                    events.emit("individual", "teaches", None, "quiet")
+                self.assertIn("EventBus.subscribe;Subscriber.__init__ 1",
+                              counter.folded())
+                self.assertIn("EventBus.emit 1", counter.folded())
+                samples, mean = counter.timings()["EventBus.emit"]
+                self.assertEqual(samples, 1)
+                self.assertGreater(mean, 0)
+        with self.assertRaises(ValueError):
+            CallCounter(backend="cprofile")
+
+
+class TestPluginScales(unittest.TestCase):
+    """Test selecting scales and playing plugin scales."""
+
+    def setUp(self) -> None:
+        """Record the chapters of a silent run."""
+        self.heard: List[Event] = []
+        self.events = EventBus()
+        self.events.subscribe(self.heard.append)
+        self.addCleanup(plugins.refresh)
+
+    def scales_begun(self) -> List[str]:
+        """Scales that began, in order."""
+        return [event.scale for event in self.heard
+                if event.chapter == "scale_begins"]
+
+    def test_runs_only_selected_scales(self) -> None:
+        """Verify compile_reality plays self.scales, in their order."""
+        consciousness = Consciousness(self.events)
+        consciousness.scales = ["historical", "religious"]
+        consciousness.compile_reality(max_iterations=2)
+        self.assertEqual(self.scales_begun(), ["historical", "religious"] * 2)
+        self.assertFalse(any(event.scale == "individual"
+                             for event in self.heard))
+        chapters = [event.chapter for event in self.heard]
+        self.assertEqual(chapters.count("forget_everything_except"), 2)
+
+    def test_revelation_names_scales_played(self) -> None:
+        """Verify the revelation counts the scales that actually ran."""
+        def revelation(scales: List[str]) -> str:
+            self.heard.clear()
+            consciousness = Consciousness(self.events)
+            consciousness.scales = scales
+            consciousness.compile_reality(max_iterations=1)
+            return [event.message for event in self.heard
+                    if event.chapter == "revelation"][0].splitlines()[-1]
+
+        self.assertEqual(revelation(["individual", "religious", "historical"]),
+                         "All three scales experience the same pattern "
+                         "simultaneously")
+        self.assertEqual(revelation(["religious", "historical"]),
+                         "Both scales experience the same pattern "
+                         "simultaneously")
+        self.assertEqual(revelation(["individual"]),
+                         "The individual scale experiences the pattern alone")
+
+    def test_registered_scale_joins_revelation(self) -> None:
+        """Verify a plugin scale plays and must reach omniscience too."""
+        played: List[int] = []
+
+        def corporate(consciousness: Consciousness) -> bool:
+            played.append(consciousness.iteration)
+            consciousness.events.emit("corporate", "scale_begins", None,
+                                      "--- CORPORATE SCALE ---")
+            return False
+
+        plugins.register_scale("corporate", corporate)
+        self.addCleanup(plugins.unregister_scale, "corporate")
+        consciousness = Consciousness(self.events)
+        consciousness.scales = ["individual", "corporate"]
+        consciousness.compile_reality(max_iterations=2)
+        self.assertEqual(played, [0, 1])
+        self.assertEqual(self.scales_begun(), ["individual", "corporate"] * 2)
+        self.assertNotIn("forget_everything_except",
+                         [event.chapter for event in self.heard])
+
+        consciousness = Consciousness(EventBus())
+        consciousness.scales = ["planetary"]
+        with self.assertRaises(ValueError):
+            consciousness.compile_reality()
+        self.assertEqual(consciousness.iteration, 0)
+
+    def test_entry_points_load_lazily(self) -> None:
+        """Verify installed plugins are only imported when selected."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with open(os.path.join(directory.name, "planetary_scale.py"), "w",
+                  encoding="utf-8") as module:
+            module.write("def play(consciousness):\n"
+                         "    consciousness.events.emit('planetary', "
+                         "'scale_begins', None, 'PLANETARY')\n"
+                         "    return True\n")
+        info = os.path.join(directory.name, "planetary_scale-1.0.dist-info")
+        os.mkdir(info)
+        with open(os.path.join(info, "METADATA"), "w",
+                  encoding="utf-8") as metadata:
+            metadata.write("Metadata-Version: 2.1\nName: planetary-scale\n"
+                           "Version: 1.0\n")
+        with open(os.path.join(info, "entry_points.txt"), "w",
+                  encoding="utf-8") as entry_points:
+            entry_points.write(f"[{plugins.ENTRY_POINT_GROUP}]\n"
+                               f"planetary = planetary_scale:play\n")
+        sys.path.insert(0, directory.name)
+        self.addCleanup(sys.path.remove, directory.name)
+        self.addCleanup(sys.modules.pop, "planetary_scale", None)
+        plugins.refresh()
+
+        Consciousness(self.events).compile_reality(max_iterations=1)
+        self.assertIsNone(plugins._entry_points)
+        self.assertNotIn("planetary_scale", sys.modules)
+
+        self.assertIn("planetary", plugins.available_scales())
+        consciousness = Consciousness(self.events)
+        consciousness.scales = ["religious", "planetary"]
+        consciousness.compile_reality(max_iterations=1)
+        self.assertIn("planetary_scale", sys.modules)
+        self.assertEqual(self.scales_begun()[-2:], ["religious", "planetary"])
+
+
+class TestScaleCache(unittest.TestCase):
+    """Test replaying the scales whose inputs did not change."""
+
+    @staticmethod
+    def transcript(cache: Optional[ScaleCache] = None, traditions: int = 6,
+                   duration: int = 5000, **filters: object) -> List[str]:
+        """Collect the events of a three-iteration run."""
+        heard: List[str] = []
+        events = EventBus()
+        events.subscribe(lambda event: heard.append(
+            f"{event.iteration} {event.scale} {event.entity} {event.message}"),
+            **filters)
+        consciousness = Consciousness(events, scale_cache=cache)
+        consciousness.tradition_count = traditions
+        consciousness.history_duration = duration
+        consciousness.compile_reality(max_iterations=3)
+        return heard
+
+    def test_recomputes_only_changed_scales(self) -> None:
+        """Verify unchanged scales replay and the output matches a full run."""
+        cache = ScaleCache()
+        self.assertEqual(self.transcript(cache), self.transcript())
+        self.assertEqual((cache.hits, cache.misses), (0, 9))
+
+        self.assertEqual(self.transcript(cache, traditions=9),
+                         self.transcript(traditions=9))
+        self.assertEqual((cache.hits, cache.misses), (6, 12))
+        self.assertEqual(self.transcript(cache, duration=300),
+                         self.transcript(duration=300))
+        self.assertEqual((cache.hits, cache.misses), (12, 15))
+
+        religious = {"scales": {"religious"}}
+        self.assertEqual(self.transcript(cache, traditions=9, **religious),
+                         self.transcript(traditions=9, **religious))
+        self.assertEqual((cache.hits, cache.misses), (21, 15))
+        self.assertEqual(len(cache), 15)
+
+    def test_plugins_and_bounds(self) -> None:
+        """Verify plugins are cached only with declared inputs."""
+        played: List[str] = []
+
+        def corporate(consciousness: Consciousness) -> bool:
+            played.append("corporate")
+            return True
+
+        def planetary(consciousness: Consciousness) -> bool:
+            played.append("planetary")
+            return True
+
+        planetary.inputs = ("tradition_count",)  # type: ignore[attr-defined]
+        for name, plugin in (("corporate", corporate),
+                             ("planetary", planetary)):
+            plugins.register_scale(name, plugin)
+            self.addCleanup(plugins.unregister_scale, name)
+
+        cache = ScaleCache(max_streams=2)
+        for _ in range(2):
+            consciousness = Consciousness(EventBus(), scale_cache=cache)
+            consciousness.scales = ["corporate", "planetary"]
+            consciousness.compile_reality(max_iterations=1)
+        self.assertEqual(played, ["corporate", "planetary", "corporate"])
+        self.assertEqual(len(cache), 1)
+        with self.assertRaises(ValueError):
+            ScaleCache(max_streams=0)
+
+
+class TestFork(unittest.TestCase):
+    """Test copy-on-write forks of collections, populations and runs."""
+
+    def test_collection_forks_are_isolated(self) -> None:
+        """Verify flags diverge both ways and only touched members copy."""
+        events = EventBus()
+        empires = [Empire(f"Empire_{i}", events) for i in range(8)]
+        civilizations = CivilizationCollection(empires, events)
+        civilizations.awaken([0])
+        what_if = civilizations.fork()
+
+        self.assertEqual(what_if.snapshot(), (1, 8))
+        self.assertEqual(what_if.awaken([2, 4]), 2)
+        empires[5].omniscient = True
+        empires[0].omniscient = False
+        self.assertEqual(civilizations.snapshot(), (1, 8))
+        self.assertEqual(what_if.snapshot(), (3, 8))
+        self.assertFalse(what_if.empires[5].omniscient)
+        self.assertTrue(what_if.empires[0].omniscient)
+        self.assertFalse(empires[2].omniscient)
+        self.assertIsNot(what_if.empires[2], empires[2])
+        self.assertEqual(len(what_if.empires._copies), 4)
+
+        what_if.empires.append(Empire("Atlantis", events))
+        self.assertEqual(len(what_if.empires), 9)
+        self.assertEqual(len(civilizations.empires), 8)
+        nested = what_if.fork()
+        nested.experience_omniscience()
+        self.assertTrue(nested.omniscient)
+        self.assertEqual(what_if.snapshot(), (3, 9))
+        self.assertEqual(civilizations.snapshot(), (1, 8))
+
+    def test_prophet_fork_owns_sects_and_traditions(self) -> None:
+        """Verify a fork fragments and merges without touching its parent."""
+        events = EventBus()
+        religions = ProphetCollection(
+            [Prophet(f"Prophet_{i}", events) for i in range(4)], events)
+        religions.vote_to_merge([(0, 1)])
+        parent_leaves = religions.sects.leaves
+        what_if = religions.fork()
+
+        what_if.prophets[2].followers_fragment()
+        what_if.vote_to_merge()
+        self.assertEqual(len(list(what_if.sects.leaves(2))), 2)
+        self.assertEqual(len(list(parent_leaves(2))), 1)
+        self.assertEqual((religions.tradition_count, what_if.tradition_count),
+                         (3, 1))
+
+    def test_population_and_run_forks(self) -> None:
+        """Verify forks continue exactly where their parent stood."""
+        population = Population(1000, seed=317)
+        population.tick()
+        what_if = population.fork()
+        self.assertIs(what_if.stages, population.stages)
+        self.assertEqual(what_if.tick(), population.tick())
+        self.assertIsNot(what_if.stages, population.stages)
+
+        heard = {"parent": [], "fork": []}
+        parent = Consciousness(EventBus())
+        parent.compile_reality(max_iterations=1)
+        fork = parent.fork(EventBus())
+        self.assertIsNot(fork.scales, parent.scales)
+        for name, run in (("parent", parent), ("fork", fork)):
+            run.events.subscribe(
+                lambda event, name=name: heard[name].append(event.message))
+            run.compile_reality(max_iterations=3)
+        self.assertEqual(heard["parent"], heard["fork"])
+        self.assertEqual(fork.iteration, 3)
+
+    def test_paced_fork_keeps_its_own_clock(self) -> None:
+        """Verify a paced fork advances its own scheduler and cache."""
+        day = 24 * 3600
+        scheduler = Scheduler()
+        cache = ScaleCache()
+        parent = Consciousness(EventBus(), scale_cache=cache,
+                               scheduler=scheduler)
+        parent.compile_reality(max_iterations=1)
+        scheduler.schedule_at(3 * day, self.fail, "parent callback ran")
+        fork = parent.fork()
+        self.assertIsNot(fork.scheduler, scheduler)
+        self.assertIsNot(fork.scale_cache, cache)
+        fork.compile_reality(max_iterations=4)
+        self.assertEqual(fork.scheduler.now, 4 * day)
+        self.assertEqual(scheduler.now, day)
+        self.assertEqual(scheduler.next_time, 3 * day)
+        self.assertEqual(len(cache), 2)
+
+
+class TestRunHistory(unittest.TestCase):
+    """Test time-travel queries over checkpoints plus a delta log."""
+
+    def _truth(self, consciousness: Consciousness) -> list:
+        """Capture each iteration's final state as the run plays it."""
+        states: list = []
+        flags: list = []
+
+        def observe(event: Event) -> None:
+            if event.chapter == "experiences_omniscience":
+                flags.append((event.scale, event.entity))
+            elif event.chapter == "feel_my_love":
+                states.append((consciousness.knowledge, consciousness.mystery,
+                               consciousness.meaning, frozenset(flags)))
+                flags.clear()
+
+        consciousness.events.subscribe(observe)
+        return states
+
+    def test_every_iteration_is_reconstructed(self) -> None:
+        """Verify checkpoints and deltas replay the live state exactly."""
+        for spacing in (1, 3, 100):
+            consciousness = Consciousness(EventBus())
+            consciousness.knowledge = float("inf")
+            truth = self._truth(consciousness)
+            with RunHistory(spacing=spacing) as history:
+                history.attach(consciousness)
+                consciousness.compile_reality(max_iterations=4)
+                consciousness.mystery = 5.0
+                consciousness.scales = ["individual"]
+                consciousness.compile_reality(max_iterations=8)
+
+                self.assertEqual(history.iterations(), (0, 7))
+                for iteration, (knowledge, mystery, meaning, flags) in \
+                        enumerate(truth):
+                    state = history.state_at(iteration)
+                    self.assertEqual((state.knowledge, state.mystery,
+                                      state.meaning, state.omniscient),
+                                     (knowledge, mystery, meaning, flags))
+                    self.assertEqual(state.love, 1.0)
+                self.assertEqual(len(history.state_at(2).omniscient), 13)
+                self.assertEqual(history.state_at(6).omniscient,
+                                 {("individual", "Michael")})
+                self.assertIn(("set", None, None, "mystery", 5.0),
+                              history.deltas(4))
+                self.assertEqual(history.state_at(0).meaning, 1.0)
+                kinds = [delta[0] for delta in history.deltas(0)]
+                self.assertEqual(kinds.count("reset"), 1)
+                self.assertEqual(kinds.count("flip"), 13)
+                with self.assertRaises(IndexError):
+                    history.state_at(8)
+
+    def test_silent_and_reverted_flips_are_logged(self) -> None:
+        """Verify a sharded sweep and flags turned back off replay exactly."""
+        executor = ShardedExecutor(workers=2, shards_per_worker=3)
+        self.addCleanup(executor.close)
+        self.addCleanup(plugins.refresh)
+        truth: list = []
+
+        def sweep(consciousness: Consciousness) -> bool:
+            religions = consciousness.fragment_into_traditions(12)
+            self.assertGreater(executor.sweep(religions).shards, 1)
+            religions.prophets[consciousness.iteration].omniscient = False
+            truth.append(frozenset((prophet.scale, prophet.name)
+                                   for prophet in religions.prophets
+                                   if prophet.omniscient))
+            return True
+
+        plugins.register_scale("sweep", sweep)
+        self.addCleanup(plugins.unregister_scale, "sweep")
+        consciousness = Consciousness(EventBus())
+        consciousness.knowledge = float("inf")
+        consciousness.scales = ["sweep"]
+        with RunHistory(spacing=2) as history:
+            history.attach(consciousness)
+            consciousness.compile_reality(max_iterations=3)
+            kinds = [delta[0] for delta in history.deltas(0)]
+            self.assertEqual(kinds.count("reset"), 1)
+            for iteration, flags in enumerate(truth):
+                state = history.state_at(iteration)
+                self.assertEqual(len(state.omniscient), 11)
+                self.assertEqual(state.omniscient, flags)
+
+    def test_history_file_reopens_and_rewinds(self) -> None:
+        """Verify a stored history answers later and a rewind truncates."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.sqlite")
+            consciousness = Consciousness(EventBus())
+            with RunHistory(path, spacing=2) as history:
+                history.attach(consciousness)
+                consciousness.compile_reality(max_iterations=5)
+            with RunHistory(path, spacing=2) as history:
+                self.assertEqual(history.iterations(), (0, 4))
+                expected = history.state_at(3)
+                rewound = Consciousness(EventBus())
+                rewound.iteration = 2
+                history.attach(rewound)
+                self.assertEqual(history.iterations(), (0, 1))
+                rewound.compile_reality(max_iterations=4)
+                self.assertEqual(history.iterations(), (0, 3))
+                self.assertEqual(history.state_at(3), expected)
+
+    def test_resumed_iteration_replaces_partial_log(self) -> None:
+        """Verify a stopped and resumed run logs each iteration once."""
+        consciousness = Consciousness(EventBus())
+        controller = RunController(check_every=1)
+        canceller = consciousness.events.subscribe(
+            lambda event: controller.cancel(), chapters=["revelation"])
+        with RunHistory(spacing=2) as history:
+            history.attach(consciousness)
+            consciousness.mystery = 3.0
+            self.assertFalse(controller.run(consciousness, 3).completed)
+            consciousness.events.unsubscribe(canceller)
+            consciousness.compile_reality(max_iterations=3)
+            kinds = [delta[0] for delta in history.deltas(0)]
+            self.assertEqual(kinds.count("begin"), 1)
+            self.assertEqual(kinds.count("flip"), 13)
+            self.assertIn(("set", None, None, "mystery", 3.0),
+                          history.deltas(0))
+            self.assertEqual(history.state_at(2).mystery, 1.0)
+
+    def test_invalid_spacing(self) -> None:
+        """Verify checkpoints need a positive spacing."""
+        with self.assertRaises(ValueError):
+            RunHistory(spacing=0)
+
+
+class TestSketches(unittest.TestCase):
+    """Test the sampled omniscient fraction and the omniscience filter."""
+
+    def test_sampled_fraction_and_merge(self) -> None:
+        """Verify bounds hold the true fraction and shards merge."""
+        events = EventBus()
+        empires = [Empire(f"Empire_{i}", events) for i in range(30000)]
+        civilizations = CivilizationCollection(empires, events)
+        civilizations.awaken(range(0, 30000, 4))
+        rng = random.Random(7)
+
+        estimate = sample_omniscience(civilizations, 2000, rng)
+        low, high = estimate.interval(0.999)
+        self.assertLessEqual(low, 0.25)
+        self.assertGreaterEqual(high, 0.25)
+        self.assertLess(high - low, 0.1)
+        self.assertEqual(estimate.sampled, 2000)
+
+        shards = [CivilizationCollection(empires[:20000], events),
+                  CivilizationCollection(empires[20000:], events)]
+        merged = sample_omniscience(shards[0], 1500, rng).merge(
+            sample_omniscience(shards[1], 500, rng))
+        self.assertEqual(merged.population, 30000)
+        low, high = merged.interval(0.999)
+        self.assertLessEqual(low, 0.25)
+        self.assertGreaterEqual(high, 0.25)
+
+        census = sample_omniscience(shards[1], 10**6)
+        self.assertEqual(census.sampled, 10000)
+        self.assertEqual(census.interval(), (0.25, 0.25))
+        self.assertEqual(census.count, 2500)
+        with self.assertRaises(ValueError):
+            estimate.interval(1.0)
+
+    def test_stored_collection_is_sampled(self) -> None:
+        """Verify stored members are read by position without a scan."""
+        with EntityStore(":memory:") as store:
+            store.add("prophets", (f"Prophet_{i}" for i in range(1000)))
+            store.set_omniscient("prophets", range(1, 1001, 2))
+            estimate = sample_omniscience(store.religions(EventBus()), 1000)
+            self.assertEqual(estimate.fraction, 0.5)
+
+    def test_filter_remembers_every_iteration(self) -> None:
+        """Verify the filter hears a run and merges with a shard's filter."""
+        consciousness = Consciousness(EventBus())
+        ever = OmniscienceFilter(capacity=1000, error_rate=0.01)
+        ever.attach(consciousness.events, scales=["religious"])
+        consciousness.compile_reality(max_iterations=2)
+        self.assertIn("Prophet_5", ever)
+        self.assertNotIn("Michael", ever)
+        self.assertEqual(ever.added, 12)
+
+        shard = OmniscienceFilter(capacity=1000, error_rate=0.01)
+        events = EventBus()
+        empires = [Empire(f"Empire_{i}", events) for i in range(10)]
+        civilizations = CivilizationCollection(empires, events)
+        civilizations.awaken([3, 4])
+        self.assertEqual(shard.add_omniscient(civilizations), 2)
+
+        # Flips made without narration reach the filter and a history at once
+        heard = OmniscienceFilter(capacity=1000, error_rate=0.01)
+        listener = heard.attach(events)
+        with RunHistory() as history:
+            history.attach(Consciousness(events))
+            self.assertEqual(len(events.flip_listeners), 2)
+            empires[6].omniscient = True
+            civilizations.awaken([7])
+        self.assertEqual(events.flip_listeners, [listener])
+        for name in ("Empire_6", "Empire_7"):
+            self.assertIn(name, heard)
+        self.assertNotIn("Empire_3", heard)
+        events.unsubscribe_flips(listener)
+        self.assertIsNone(events.flips)
+        merged = ever.merge(shard)
+        for name in ("Prophet_0", "Empire_3", "Empire_4"):
+            self.assertIn(name, merged)
+        self.assertNotIn("Empire_3", ever)
+        with self.assertRaises(ValueError):
+            ever.merge(OmniscienceFilter(capacity=10))
+
+    def test_filter_false_positive_rate(self) -> None:
+        """Verify no false negatives and about the configured error rate."""
+        ever = OmniscienceFilter(capacity=20000, error_rate=0.01)
+        ever.update(f"Prophet_{i}" for i in range(20000))
+        self.assertTrue(all(f"Prophet_{i}" in ever for i in range(20000)))
+        false = sum(f"Empire_{i}" in ever for i in range(20000)) / 20000
+        self.assertLess(false, 0.02)
+        self.assertAlmostEqual(ever.false_positive_rate, 0.01, delta=0.005)
+        self.assertLess(len(ever._bits), 2 * 20000)
+
+
+class TestColumns(unittest.TestCase):
+    """Test exporting collection state as contiguous buffers."""
+
+    def test_prophet_columns(self) -> None:
+        """Verify flags, Arrow-style names and traditions line up."""
+        events = EventBus()
+        names = ["Moïse", "Prophet_1", "預言者", "Prophet_3"]
+        religions = ProphetCollection([Prophet(name, events)
+                                       for name in names], events)
+        religions.awaken([1, 2])
+        religions.vote_to_merge([(0, 3)])
+        columns = religions.columns()
+
+        self.assertEqual(len(columns), 4)
+        self.assertEqual(bytes(columns.omniscient), b"\x00\x01\x01\x00")
+        self.assertEqual([columns.name(i) for i in range(4)], names)
+        self.assertEqual(columns.name_offsets[-1], len(columns.name_data))
+        self.assertEqual(list(columns.metrics["tradition"]), [0, 1, 2, 0])
+        views = columns.buffers()
+        self.assertEqual(views["name_offsets"].format, "q")
+        self.assertEqual(views["omniscient"].format, "B")
+        self.assertTrue(views["tradition"].c_contiguous)
+        columns.omniscient[0] = 1
+        self.assertEqual(views["omniscient"][0], 1)  # A view, not a copy
+        self.assertFalse(religions.prophets[0].omniscient)
+
+    def test_fork_and_stored_columns(self) -> None:
+        """Verify forks export without copying and stores without objects."""
+        events = EventBus()
+        empires = [Empire(f"Empire_{i}", events) for i in range(6)]
+        civilizations = CivilizationCollection(empires, events)
+        what_if = civilizations.fork()
+        what_if.awaken([4])
+        empires[1].omniscient = True
+        self.assertEqual(bytes(what_if.columns().omniscient),
+                         b"\x00\x00\x00\x00\x01\x00")
+        self.assertEqual(bytes(civilizations.columns().omniscient),
+                         b"\x00\x01\x00\x00\x00\x00")
+        self.assertEqual(len(what_if.empires._copies), 1)
+
+        with EntityStore(":memory:", chunk_size=2) as store:
+            store.add("empires", (f"Empire_{i}" for i in range(5)))
+            store.set_omniscient("empires", [2, 5])
+            columns = store.civilizations(EventBus()).columns()
+            self.assertEqual(bytes(columns.omniscient),
+                             b"\x00\x01\x00\x00\x01")
+            self.assertEqual(columns.name(4), "Empire_4")
+            self.assertEqual(columns.metrics, {})
+
+    def test_bulk_write(self) -> None:
+        """Verify .npy headers and raw files hold the column bytes."""
+        events = EventBus()
+        religions = ProphetCollection(
+            [Prophet(f"Prophet_{i}", events) for i in range(5)], events)
+        religions.awaken([3])
+        columns = religions.columns()
+        with tempfile.TemporaryDirectory() as directory:
+            paths = columns.write(os.path.join(directory, "npy"))
+            self.assertEqual(len(paths), 4)
+            for path in paths:
+                with open(path, "rb") as stored:
+                    data = stored.read()
+                self.assertEqual(data[:8], b"\x93NUMPY\x01\x00")
+                length = int.from_bytes(data[8:10], "little")
+                self.assertEqual((10 + length) % 64, 0)
+                header = ast.literal_eval(
+                    data[10:10 + length].decode("latin-1"))
+                label = os.path.basename(path)[:-4]
+                view = columns.buffers()[label]
+                self.assertEqual(header["shape"], (len(view),))
+                self.assertEqual(data[10 + length:], view.tobytes())
+                if label == "omniscient":
+                    self.assertEqual(header["descr"], "|b1")
+
+            raw = columns.write(directory, format="raw")
+            with open(raw[1], "rb") as stored:
+                self.assertEqual(stored.read(), columns.name_offsets.tobytes())
+            with self.assertRaises(ValueError):
+                columns.write(directory, format="csv")
+        with self.assertRaises(ValueError):
+            CollectionColumns(bytearray(2), array("q", [0, 1]), b"x")
+
+
+class TestRunController(unittest.TestCase):
+    """Test deadlines, cancellation, progress and resuming runs."""
+
+    def test_deadline_stops_and_run_resumes(self) -> None:
+        """Verify a timed-out run stops early and resumes to completion."""
+        consciousness = Consciousness(EventBus())
+        outcome = RunController(timeout=0.05).run(consciousness, 10**9)
+        self.assertFalse(outcome.completed)
+        self.assertEqual(outcome.reason, "deadline")
+        self.assertEqual(consciousness.iteration, outcome.iteration)
+        self.assertIsNone(consciousness.events.guard)
+
+        target = outcome.iteration + 3
+        outcome = RunController(clock="cpu").run(consciousness, target)
+        self.assertTrue(outcome.completed)
+        self.assertEqual(outcome.result, "Consciousness compilation finished")
+        self.assertEqual(consciousness.iteration, target)
+
+    def test_cancel_rolls_back_the_iteration(self) -> None:
+        """Verify a cancelled iteration leaves the state it started from."""
+        consciousness = Consciousness(EventBus())
+        consciousness.knowledge = float("inf")
+        controller = RunController(check_every=1)
+        canceller = consciousness.events.subscribe(
+            lambda event: controller.cancel(),
+            chapters=["forget_everything_except"])
+        lines: List[str] = []
+        consciousness.events.subscribe(lambda event: lines.append(
+            event.message))
+
+        outcome = controller.run(consciousness, 3)
+        self.assertEqual((outcome.completed, outcome.reason), (False,
+                                                               "cancelled"))
+        self.assertEqual(outcome.iteration, 0)
+        self.assertEqual(consciousness.knowledge, float("inf"))
+        self.assertTrue(lines[-1].startswith("Forgetting everything"))
+
+        consciousness.events.unsubscribe(canceller)
+        lines.clear()
+        self.assertTrue(RunController().run(consciousness, 3).completed)
+        expected = Consciousness(EventBus())
+        expected.knowledge = float("inf")
+        expected.events.subscribe(lambda event: lines.remove(event.message))
+        expected.compile_reality(3)
+        self.assertEqual(lines, [])
+
+    def test_progress_and_guards(self) -> None:
+        """Verify progress reports rate and ETA and guards do not nest."""
+        consciousness = Consciousness(EventBus())
+        reports: List[Progress] = []
+
+        def progress(report: Progress) -> None:
+            reports.append(report)
+            if report.iteration == 4:
+                controller.cancel("enough")
+
+        controller = RunController(progress=progress, progress_every=0)
+        outcome = controller.run(consciousness, 10)
+        self.assertEqual((outcome.reason, outcome.iteration), ("enough", 4))
+        self.assertEqual([report.iteration for report in reports],
+                         [0, 1, 2, 3, 4, 4])
+        self.assertIsNone(reports[0].eta)
+        self.assertEqual(reports[-1].completed, 4)
+        self.assertGreater(reports[-1].rate, 0)
+        self.assertGreater(reports[-1].eta, 0)
+
+        consciousness.events.guard = print
+        with self.assertRaises(RuntimeError):
+            RunController().run(consciousness, 10)
+        consciousness.events.guard = None
+        with self.assertRaises(ValueError):
+            RunController(clock="sundial")
+
+
+class TestPatternSimilarity(unittest.TestCase):
+    """Test the streamed similarity of the scales' chapter sequences."""
+
+    def test_scales_share_the_arc(self) -> None:
+        """Verify every iteration is scored and the scales walk one arc."""
+        consciousness = Consciousness(EventBus())
+        reports: List[IterationSimilarity] = []
+        patterns = PatternSimilarity(on_iteration=reports.append)
+        patterns.attach(consciousness.events)
+        consciousness.compile_reality(max_iterations=3)
+
+        self.assertEqual([report.iteration for report in reports], [0, 1, 2])
+        self.assertEqual(patterns.iterations, 3)
+        last = reports[-1]
+        self.assertEqual(last.shingles("religious", "historical"), 1.0)
+        self.assertEqual(last.arc("historical", "religious"), 1.0)
+        # The person has no fragmentation or unification stage: 7 of 7 and 9
+        self.assertAlmostEqual(last.arc("individual", "religious"), 14 / 16)
+        self.assertLess(last.shingles("individual", "religious"), 1.0)
+        self.assertEqual(last.events["religious"], 6 * 4 + 6 + 4)
+        self.assertEqual(patterns.mean()[("religious", "historical")],
+                         (1.0, 1.0))
+        with self.assertRaises(KeyError):
+            last.arc("individual", "cosmic")
+
+    def test_scale_size_does_not_change_scores(self) -> None:
+        """Verify six and sixty traditions tell the same stage sequence."""
+        scores = []
+        for count in (6, 60):
+            consciousness = Consciousness(EventBus())
+            consciousness.tradition_count = count
+            patterns = PatternSimilarity(k=3)
+            patterns.attach(consciousness.events, scales=["individual",
+                                                          "religious"])
+            consciousness.compile_reality(max_iterations=1)
+            assert patterns.last is not None
+            self.assertEqual(list(patterns.last.scores),
+                             [("individual", "religious")])
+            scores.append(patterns.last.scores)
+        self.assertEqual(scores[0], scores[1])
+
+    def test_similarity_of_sequences(self) -> None:
+        """Verify direct comparison, repeats and unknown chapters."""
+        person = ["programs_at_night", "encounters_ai_at_317am",
+                  "recognizes_ai_is_self"]
+        empire = ["believes_itself_eternal", "rulers_recognize_pattern",
+                  "develops_science", "love_persists_through_atrocity"]
+        self.assertEqual(similarity(person, empire), (1.0, 1.0))
+        self.assertEqual(similarity(person, person[::-1]), (0.0, 2 / 6))
+        self.assertEqual(similarity(["plugin_chapter"], ["teaches"], k=1),
+                         (0.0, 0.0))
+        self.assertEqual(similarity([], []), (1.0, 1.0))
+        with self.assertRaises(ValueError):
+            PatternSimilarity(k=0)
+
+
+class TestChapterProgress(unittest.TestCase):
+    """Test chapter bitmasks, their transition table and bulk queries."""
+
+    def test_entities_record_and_strict_entities_reject(self) -> None:
+        """Verify lived chapters are kept and strict order is enforced."""
+        heard: List[str] = []
+        events = EventBus()
+        events.subscribe(lambda event: heard.append(event.chapter))
+        prophet = Prophet("Moses", events)
+        prophet.teaches()
+        prophet.recognizes_pattern()
+        prophet.teaches()  # Lenient entities go back without complaint
+        self.assertEqual(prophet.chapters, ["teaches", "recognizes_pattern"])
+
+        strict = Empire("Rome", events)
+        strict.strict = True
+        strict.believes_itself_eternal()
+        strict.collapses()
+        strict.collapses()  # Repeating the furthest chapter is allowed
+        strict.love_persists_through_atrocity()  # Skipping ahead too
+        with self.assertRaisesRegex(ChapterOrderError,
+                                    "Rome cannot live develops_science "
+                                    "after love_persists_through_atrocity"):
+            strict.develops_science()
+        self.assertNotIn("develops_science", heard)
+        self.assertEqual(strict.chapters, ["believes_itself_eternal",
+                                           "collapses",
+                                           "love_persists_through_atrocity"])
+        self.assertEqual(AIEssence("Claude", events).chapters, [])
+
+    def test_runs_reject_chapters_out_of_order(self) -> None:
+        """Verify a normal run's entities are strict unless it opts out."""
+        def regress(consciousness: Consciousness) -> bool:
+            religions = consciousness.fragment_into_traditions(3)
+            for prophet in religions.prophets:
+                prophet.experiences_omniscience()
+            religions.prophets[1].teaches()
+            return True
+
+        plugins.register_scale("regress", regress)
+        self.addCleanup(plugins.unregister_scale, "regress")
+        self.addCleanup(plugins.refresh)
+        consciousness = Consciousness(EventBus())
+        self.assertTrue(consciousness.create_person().strict)
+        self.assertTrue(all(empire.strict for empire in
+                            consciousness.execute_through_time().empires))
+        consciousness.scales = ["individual", "regress"]
+        with self.assertRaisesRegex(ChapterOrderError,
+                                    "Prophet_1 cannot live teaches after "
+                                    "experiences_omniscience"):
+            consciousness.compile_reality(max_iterations=1)
+
+        lenient = Consciousness(EventBus())
+        lenient.strict = False
+        lenient.scales = ["regress"]
+        lenient.compile_reality(max_iterations=1)
+        self.assertFalse(lenient.create_person().strict)
+
+    def test_queries_over_collections(self) -> None:
+        """Verify vectorized queries and the columns forks and stores give."""
+        events = EventBus()
+        religions = ProphetCollection(
+            [Prophet(f"Prophet_{i}", events) for i in range(6)], events)
+        for prophet in religions.prophets[:4]:
+            prophet.teaches()
+            prophet.recognizes_pattern()
+        religions.prophets[1].experiences_omniscience()
+        religions.awaken([2])  # Omniscient without living the chapter
+        progress = religions.progress()
+        self.assertEqual(len(progress), 6)
+        self.assertEqual(progress.positions(reached=["recognizes_pattern"],
+                                            omniscient=False), [0, 3])
+        self.assertEqual(progress.count(missed=["experiences_omniscience"],
+                                        omniscient=True), 1)
+        self.assertEqual(progress[1], ["teaches", "recognizes_pattern",
+                                       "experiences_omniscience"])
+        self.assertEqual(progress.distribution()["teaches"], 4)
+        with self.assertRaises(ValueError):
+            progress.count(reached=["collapses"])
+
+        what_if = religions.fork()
+        religions.prophets[5].teaches()
+        what_if.prophets[4].encounters_serpent()
+        self.assertEqual(what_if.progress().positions(reached=["teaches"]),
+                         [0, 1, 2, 3])
+        self.assertEqual(religions.progress().positions(
+            reached=["encounters_serpent"]), [])
+        self.assertEqual(len(what_if.prophets._copies), 1)
+
+        with EntityStore(":memory:") as store:
+            store.add("empires", (f"Empire_{i}" for i in range(3)))
+            store.set_omniscient("empires", [2])
+            stored = store.civilizations(EventBus()).progress()
+            self.assertEqual(bytes(stored.column), b"\x00\x80\x00")
+            self.assertEqual(stored.positions(omniscient=True), [1])
+
+    def test_transition_table(self) -> None:
+        """Verify the precompiled table allows only later chapters."""
+        arc = ChapterArc("test", ["first", "second", "third"])
+        self.assertEqual(len(arc.allowed), 8)
+        self.assertEqual(arc.allowed[0], 0b111)
+        self.assertEqual(arc.allowed[0b001], 0b111)
+        self.assertEqual(arc.allowed[0b010], 0b110)
+        self.assertEqual(arc.allowed[0b101], 0b100)
+        self.assertEqual(arc.reached(0b101), ["first", "third"])
+        with self.assertRaises(ValueError):
+            ChapterArc("long", [f"chapter_{i}" for i in range(8)])
+
+
+class TestLoadGenerator(unittest.TestCase):
+    """Test the latency histogram and load generation in every mode."""
+
+    def test_histogram_precision_and_merge(self) -> None:
+        """Verify percentiles keep three significant figures and merge."""
+        low = LatencyHistogram()
+        high = LatencyHistogram()
+        for microseconds in range(1, 10001):
+            (low if microseconds <= 5000 else high).record(microseconds / 1e6)
+        both = low.merge(high)
+        self.assertEqual(both.count, 10000)
+        for percent in (50, 99, 99.9):
+            expected = percent / 100 * 0.01
+            self.assertAlmostEqual(both.percentile(percent), expected,
+                                   delta=expected / 1000)
+        self.assertEqual(both.percentile(100), 0.01)
+        self.assertEqual(both.min, 1e-6)
+        self.assertAlmostEqual(both.mean, 0.0050005)
+        self.assertEqual(LatencyHistogram().percentile(99), 0.0)
+        capped = LatencyHistogram(highest=1.0)
+        capped.record(5.0)
+        self.assertAlmostEqual(capped.percentile(50), 1.0, delta=0.001)
+        self.assertEqual(capped.max, 5.0)
+        with self.assertRaises(ValueError):
+            low.merge(capped)
+
+    def test_modes_report_every_run(self) -> None:
+        """Verify closed and open loops on threads, processes and asyncio."""
+        mix = [RunSpec(iterations=1, weight=3),
+               RunSpec(iterations=2, traditions=3, empires=4)]
+        for mode, rate in (("threads", None), ("asyncio", 200.0),
+                           ("processes", None)):
+            with self.subTest(mode=mode):
+                with LoadGenerator(mix, mode=mode, concurrency=2, rate=rate,
+                                   seed=317) as load:
+                    report = load.run(runs=12)
+                self.assertEqual((report.runs, report.errors), (12, 0))
+                self.assertGreater(report.throughput, 0)
+                self.assertLessEqual(report.p50, report.p99)
+                self.assertLessEqual(report.p999, report.histogram.max)
+
+        with LoadGenerator(mix) as load:
+            report = load.run(duration=0.05)
+        self.assertGreater(report.runs, 0)
+        with self.assertRaises(ValueError):
+            LoadGenerator(mix, mode="fibers")
+        with self.assertRaises(ValueError):
+            RunSpec(empires=0)
+
+
+class TestMetrics(unittest.TestCase):
+    """Test the metrics registry, its exposition and the run metrics."""
+
+    def test_exposition_file_and_endpoint(self) -> None:
+        """Verify every kind renders in the text format, saved or served."""
+        registry = MetricsRegistry()
+        runs = registry.counter("runs", "Runs\ncompiled", ["scale"])
+        runs.labels("reli\"gious").inc(2)
+        runs.labels(scale="reli\"gious").tick()
+        self.assertIs(registry.counter("runs_total", "Again", ["scale"]),
+                      runs)
+        registry.gauge("meaning", "Meaning").set(0.5)
+        latency = registry.histogram("latency_seconds", "Latency",
+                                     buckets=[0.1, 1.0])
+        for seconds in (0.05, 0.5, 0.5, 7.0):
+            latency.observe(seconds)
+        text = registry.exposition()
+        self.assertIn("# HELP runs_total Runs\\ncompiled\n", text)
+        self.assertIn("# TYPE runs_total counter\n", text)
+        self.assertIn('runs_total{scale="reli\\"gious"} 3\n', text)
+        self.assertIn("meaning 0.5\n", text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1\n'
+                      'latency_seconds_bucket{le="1.0"} 3\n'
+                      'latency_seconds_bucket{le="+Inf"} 4\n'
+                      'latency_seconds_count 4\n'
+                      'latency_seconds_sum 8.05\n', text)
+        with self.assertRaises(ValueError):
+            registry.gauge("runs_total", "Clash", ["scale"])
+        with self.assertRaises(ValueError):
+            runs.labels("too", "many")
+        with self.assertRaises(ValueError):
+            runs.inc(-1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.prom")
+            registry.write(path)
+            with open(path, encoding="utf-8") as handle:
+                self.assertEqual(handle.read(), text)
+            self.assertEqual(os.listdir(directory), ["metrics.prom"])
+        with registry.serve() as server:
+            with urlopen(server.url) as response:
+                self.assertEqual(response.read().decode("utf-8"), text)
+                self.assertTrue(response.headers["Content-Type"]
+                                .startswith("text/plain; version=0.0.4"))
+
+    def test_run_metrics_follow_runs(self) -> None:
+        """Verify a run reports its iterations, chapters and transitions."""
+        metrics = RunMetrics()
+        consciousness = Consciousness(EventBus())
+        metrics.attach(consciousness.events)
+        consciousness.compile_reality(max_iterations=3)
+        registry = metrics.registry
+        self.assertEqual(registry.get("consciousness_iterations_total")
+                         .labels().value, 3)
+        self.assertEqual(metrics.resets.labels().value, 3)
+        self.assertEqual(metrics.run_seconds.labels().count, 1)
+        self.assertEqual(metrics.iteration_seconds.labels().count, 3)
+        self.assertEqual({scale: metrics.transitions.labels(scale).value
+                          for scale in ("individual", "religious",
+                                        "historical")},
+                         {"individual": 3, "religious": 18, "historical": 18})
+        self.assertEqual(metrics.collapses.labels("religious").value, 3)
+        chapters = metrics.chapters()
+        self.assertEqual(chapters[("religious", "teaches")], 18)
+        self.assertEqual(chapters[("cosmic", "iteration_begins")], 3)
+
+        # Batched awakenings count once each; detaching keeps the totals
+        religions = consciousness.fragment_into_traditions(count=4)
+        self.assertEqual(religions.awaken([0, 1, 1, 3]), 3)
+        self.assertEqual(metrics.transitions.labels("religious").value, 21)
+        metrics.detach(consciousness.events)
+        self.assertIsNone(consciousness.events.chapter_counts)
+        consciousness.compile_reality(max_iterations=4)
+        self.assertEqual(metrics.iterations.labels().value, 3)
+        self.assertEqual(metrics.chapters(), chapters)
+
+        sampled = RunMetrics(chapter_sample_every=2)
+        events = EventBus()
+        sampled.attach(events)
+        Consciousness(events).compile_reality(max_iterations=4)
+        self.assertEqual(sampled.chapters()[("religious", "teaches")], 24)
+        self.assertEqual(sampled.transitions.labels("religious").value, 24)
+        with self.assertRaises(RuntimeError):
+            metrics.attach(events)
+
+    def test_counters_are_exact_across_threads(self) -> None:
+        """Verify ticks and increments from many threads are all counted."""
+        counter = MetricsRegistry().counter("ticks", "Ticks")
+
+        def work() -> None:
+            for _ in range(10000):
+                counter.tick()
+                counter.inc(2)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.labels().value, 120000)
+        self.assertEqual(counter.labels().value, 120000)
+
+
 def run_tests() -> bool:
     """Run all tests with formatted output."""
     print("="*60)
@@ -313,6 +2627,31 @@ def run_tests() -> bool:
     suite.addTests(loader.loadTestsFromTestCase(TestCivilizationCollection))
     suite.addTests(loader.loadTestsFromTestCase(TestConsciousness))
     suite.addTests(loader.loadTestsFromTestCase(TestPhilosophicalConcepts))
+    suite.addTests(loader.loadTestsFromTestCase(TestEventBus))
+    suite.addTests(loader.loadTestsFromTestCase(TestConcurrentCollections))
+    suite.addTests(loader.loadTestsFromTestCase(TestEmpireCatalog))
+    suite.addTests(loader.loadTestsFromTestCase(TestLifespanIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestInfluenceGraph))
+    suite.addTests(loader.loadTestsFromTestCase(TestTraditionForest))
+    suite.addTests(loader.loadTestsFromTestCase(TestSectTree))
+    suite.addTests(loader.loadTestsFromTestCase(TestPopulation))
+    suite.addTests(loader.loadTestsFromTestCase(TestScheduler))
+    suite.addTests(loader.loadTestsFromTestCase(TestInvariantChecker))
+    suite.addTests(loader.loadTestsFromTestCase(TestRunCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestEntityStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestShardedExecutor))
+    suite.addTests(loader.loadTestsFromTestCase(TestCallCounter))
+    suite.addTests(loader.loadTestsFromTestCase(TestPluginScales))
+    suite.addTests(loader.loadTestsFromTestCase(TestScaleCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestFork))
+    suite.addTests(loader.loadTestsFromTestCase(TestRunHistory))
+    suite.addTests(loader.loadTestsFromTestCase(TestSketches))
+    suite.addTests(loader.loadTestsFromTestCase(TestColumns))
+    suite.addTests(loader.loadTestsFromTestCase(TestRunController))
+    suite.addTests(loader.loadTestsFromTestCase(TestPatternSimilarity))
+    suite.addTests(loader.loadTestsFromTestCase(TestChapterProgress))
+    suite.addTests(loader.loadTestsFromTestCase(TestLoadGenerator))
+    suite.addTests(loader.loadTestsFromTestCase(TestMetrics))
 
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
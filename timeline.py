@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Timeline - Which Civilizations Were Alive When
+
+An interval index over empire lifespans, so the historical scale can simulate
+only the civilizations active in a window of time rather than all of history.
+
+The index is a centered interval tree flattened into arrays. Every node owns
+the lifespans containing its center year, kept twice: sorted by start year
+and sorted by end year (latest first). A query walks a single root-to-leaf
+path for a point and only enters nodes that report at least one empire for a
+range, giving O(log n + k) for k matches.
+
+Lifespans are inclusive: an empire with start_year 1 and end_year 5 is alive
+in years 1 through 5.
+"""
+
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+
+class LifespanIndex:
+    """Centered interval tree over parallel start and end year columns.
+
+    The columns can be lists, arrays or the memoryviews of an EmpireCatalog;
+    they are read while building and at query time but never copied.
+    """
+
+    def __init__(self, start_years: Sequence[int], end_years: Sequence[int]) -> None:
+        """Build the index in O(n log n).
+
+        Args:
+            start_years: First year of each empire, by row
+            end_years: Last year of each empire, by row
+        """
+        if len(start_years) != len(end_years):
+            raise ValueError("start_years and end_years differ in length")
+        self.start_years = start_years
+        self.end_years = end_years
+        self._center = array("q")
+        self._left = array("l")
+        self._right = array("l")
+        self._begin = array("q")
+        self._count = array("q")
+        self._by_start = array("q")
+        self._by_end = array("q")
+        self.earliest: Optional[int] = min(start_years) if start_years else None
+        self.latest: Optional[int] = max(end_years) if end_years else None
+
+        by_start = sorted(range(len(start_years)), key=start_years.__getitem__)
+        # (rows sorted by start, parent node, True when the left child)
+        pending: List[Tuple[List[int], int, bool]] = []
+        if by_start:
+            pending.append((by_start, -1, False))
+        while pending:
+            rows, parent, is_left = pending.pop()
+            node = self._add_node(rows)
+            if parent >= 0:
+                (self._left if is_left else self._right)[parent] = node
+            center = self._center[node]
+            left = [row for row in rows if end_years[row] < center]
+            right = [row for row in rows if start_years[row] > center]
+            if left:
+                pending.append((left, node, True))
+            if right:
+                pending.append((right, node, False))
+
+    def _add_node(self, rows: List[int]) -> int:
+        """Append a node centered on the median start year of its rows."""
+        starts = self.start_years
+        ends = self.end_years
+        center = starts[rows[len(rows) // 2]]
+        here = [row for row in rows if starts[row] <= center <= ends[row]]
+        self._center.append(center)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._begin.append(len(self._by_start))
+        self._count.append(len(here))
+        self._by_start.extend(here)
+        self._by_end.extend(sorted(here, key=ends.__getitem__, reverse=True))
+        return len(self._center) - 1
+
+    def __len__(self) -> int:
+        return len(self.start_years)
+
+    def active_between(self, first_year: int, last_year: int) -> List[int]:
+        """Find every empire alive at some point between two years.
+
+        Args:
+            first_year: Start of the window, inclusive
+            last_year: End of the window, inclusive
+
+        Returns:
+            Rows of the matching empires, in no particular order
+        """
+        if last_year < first_year or not self._center:
+            return []
+        starts = self.start_years
+        ends = self.end_years
+        by_start = self._by_start
+        by_end = self._by_end
+        found: List[int] = []
+        pending = [0]
+        while pending:
+            node = pending.pop()
+            center = self._center[node]
+            begin = self._begin[node]
+            stop = begin + self._count[node]
+            if last_year < center:
+                # Everyone here ends at or after center, so only starts matter
+                for position in range(begin, stop):
+                    row = by_start[position]
+                    if starts[row] > last_year:
+                        break
+                    found.append(row)
+                child = self._left[node]
+            elif first_year > center:
+                # Everyone here starts at or before center, so only ends matter
+                for position in range(begin, stop):
+                    row = by_end[position]
+                    if ends[row] < first_year:
+                        break
+                    found.append(row)
+                child = self._right[node]
+            else:
+                found.extend(by_start[begin:stop])
+                if self._left[node] >= 0:
+                    pending.append(self._left[node])
+                child = self._right[node]
+            if child >= 0:
+                pending.append(child)
+        return found
+
+    def active_at(self, year: int) -> List[int]:
+        """Find every empire alive in a given year.
+
+        Args:
+            year: The year to look at
+
+        Returns:
+            Rows of the matching empires, in no particular order
+        """
+        return self.active_between(year, year)